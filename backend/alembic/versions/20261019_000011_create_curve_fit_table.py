@@ -0,0 +1,34 @@
+"""create curve_fit table
+
+Revision ID: 20261019_000011
+Revises: 20260129_000010
+Create Date: 2026-10-19 09:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000011"
+down_revision: Union[str, None] = "20260129_000010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+
+    op.create_table(
+        "curve_fit",
+        sa.Column("id", uuid_type, primary_key=True, nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False, unique=True),
+        sa.Column("model", sa.String(length=32), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("curve_fit")
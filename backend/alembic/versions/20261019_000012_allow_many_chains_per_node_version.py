@@ -0,0 +1,59 @@
+"""allow many chains per node version (bulk library import)
+
+Revision ID: 20261019_000012
+Revises: 20261019_000011
+Create Date: 2026-10-19 10:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000012"
+down_revision: Union[str, None] = "20261019_000011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _chain_table(unique: bool) -> sa.Table:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+    return sa.Table(
+        "chain",
+        sa.MetaData(),
+        sa.Column("id", uuid_type, primary_key=True, nullable=False),
+        sa.Column(
+            "node_version_id",
+            uuid_type,
+            sa.ForeignKey("workflow_node_version.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=unique,
+        ),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("sequence", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("chain_node_version_id_key", "chain", type_="unique")
+    else:
+        with op.batch_alter_table("chain", recreate="always", copy_from=_chain_table(unique=False)):
+            pass
+    op.create_index("ix_chain_node_version_id", "chain", ["node_version_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chain_node_version_id", table_name="chain")
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_unique_constraint("chain_node_version_id_key", "chain", ["node_version_id"])
+    else:
+        with op.batch_alter_table("chain", recreate="always", copy_from=_chain_table(unique=True)):
+            pass
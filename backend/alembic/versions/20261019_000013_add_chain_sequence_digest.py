@@ -0,0 +1,47 @@
+"""add indexed sequence digest to chain
+
+Revision ID: 20261019_000013
+Revises: 20261019_000012
+Create Date: 2026-10-19 11:00:00
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000013"
+down_revision: Union[str, None] = "20261019_000012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _digest(sequence: str | None) -> str | None:
+    normalized = re.sub(r"\s+", "", sequence or "").upper()
+    return hashlib.sha256(normalized.encode("ascii", "replace")).hexdigest() if normalized else None
+
+
+def upgrade() -> None:
+    op.add_column("chain", sa.Column("sequence_digest", sa.String(length=64), nullable=True))
+    op.create_index("ix_chain_sequence_digest", "chain", ["sequence_digest"])
+
+    chain = sa.table(
+        "chain",
+        sa.column("id", sa.String()),
+        sa.column("sequence", sa.Text()),
+        sa.column("sequence_digest", sa.String(length=64)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(chain.c.id, chain.c.sequence).where(chain.c.sequence.isnot(None))).all()
+    updates = [{"chain_id": row.id, "digest": _digest(row.sequence)} for row in rows]
+    if updates:
+        bind.execute(
+            chain.update().where(chain.c.id == sa.bindparam("chain_id")).values(sequence_digest=sa.bindparam("digest")),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chain_sequence_digest", table_name="chain")
+    op.drop_column("chain", "sequence_digest")
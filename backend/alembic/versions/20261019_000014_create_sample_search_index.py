@@ -0,0 +1,80 @@
+"""create sample name search index
+
+Revision ID: 20261019_000014
+Revises: 20261019_000013
+Create Date: 2026-10-19 12:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000014"
+down_revision: Union[str, None] = "20261019_000013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    op.create_table(
+        "sample_location",
+        sa.Column("id", uuid_type, primary_key=True, nullable=False),
+        sa.Column("batch_id", uuid_type, sa.ForeignKey("batch.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "node_version_id",
+            uuid_type,
+            sa.ForeignKey("workflow_node_version.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("artifact_id", uuid_type, sa.ForeignKey("artifact.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("plate", sa.String(length=255), nullable=True),
+        sa.Column("well", sa.String(length=8), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_sample_location_batch_id", "sample_location", ["batch_id"])
+    op.create_index("ix_sample_location_node_version_id", "sample_location", ["node_version_id"])
+    if is_postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_sample_location_name_trgm",
+            "sample_location",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+    else:
+        op.create_index("ix_sample_location_name_trgm", "sample_location", ["name"])
+
+    op.create_table(
+        "sample_trigram",
+        sa.Column("trigram", sa.String(length=3), primary_key=True, nullable=False),
+        sa.Column(
+            "location_id",
+            uuid_type,
+            sa.ForeignKey("sample_location.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_sample_trigram_location_id", "sample_trigram", ["location_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sample_trigram_location_id", table_name="sample_trigram")
+    op.drop_table("sample_trigram")
+    op.drop_index("ix_sample_location_name_trgm", table_name="sample_location")
+    op.drop_index("ix_sample_location_node_version_id", table_name="sample_location")
+    op.drop_index("ix_sample_location_batch_id", table_name="sample_location")
+    op.drop_table("sample_location")
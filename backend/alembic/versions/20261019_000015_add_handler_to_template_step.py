@@ -0,0 +1,24 @@
+"""add handler to workflow_template_step
+
+Revision ID: 20261019_000015
+Revises: 20261019_000014
+Create Date: 2026-10-19 13:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000015"
+down_revision: Union[str, None] = "20261019_000014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("workflow_template_step", sa.Column("handler", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workflow_template_step") as batch_op:
+        batch_op.drop_column("handler")
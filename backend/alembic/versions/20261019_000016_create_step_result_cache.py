@@ -0,0 +1,53 @@
+"""create step_result_cache and add artifact digest
+
+Revision ID: 20261019_000016
+Revises: 20261019_000015
+Create Date: 2026-10-19 14:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000016"
+down_revision: Union[str, None] = "20261019_000015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+
+    op.add_column("artifact", sa.Column("digest", sa.String(length=64), nullable=True))
+    op.create_index("ix_artifact_digest", "artifact", ["digest"])
+
+    op.create_table(
+        "step_result_cache",
+        sa.Column("id", uuid_type, primary_key=True, nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False, unique=True),
+        sa.Column("handler", sa.String(length=64), nullable=False),
+        sa.Column(
+            "node_version_id",
+            uuid_type,
+            sa.ForeignKey("workflow_node_version.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("artifact_uri", sa.Text(), nullable=True),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("last_hit_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("step_result_cache")
+    op.drop_index("ix_artifact_digest", table_name="artifact")
+    with op.batch_alter_table("artifact") as batch_op:
+        batch_op.drop_column("digest")
@@ -0,0 +1,55 @@
+"""add step progress columns and step_checkpoint table
+
+Revision ID: 20261019_000017
+Revises: 20261019_000016
+Create Date: 2026-10-19 15:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000017"
+down_revision: Union[str, None] = "20261019_000016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+
+    op.add_column("workflow_node_version", sa.Column("progress_done", sa.Integer(), nullable=True))
+    op.add_column("workflow_node_version", sa.Column("progress_total", sa.Integer(), nullable=True))
+    op.add_column(
+        "workflow_node_version", sa.Column("progress_updated_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    op.create_table(
+        "step_checkpoint",
+        sa.Column("id", uuid_type, primary_key=True, nullable=False),
+        sa.Column(
+            "node_version_id",
+            uuid_type,
+            sa.ForeignKey("workflow_node_version.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("state", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("node_version_id", "chunk_index", name="uq_step_checkpoint_chunk"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("step_checkpoint")
+    with op.batch_alter_table("workflow_node_version") as batch_op:
+        batch_op.drop_column("progress_updated_at")
+        batch_op.drop_column("progress_total")
+        batch_op.drop_column("progress_done")
@@ -0,0 +1,76 @@
+"""create step_version_counter and make node versions unique per step
+
+Revision ID: 20261019_000018
+Revises: 20261019_000017
+Create Date: 2026-10-19 17:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000018"
+down_revision: Union[str, None] = "20261019_000017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _renumber_duplicate_versions(bind) -> None:
+    """Renumber steps whose versions collided under max+1 allocation, keeping their order."""
+    duplicated = bind.execute(
+        sa.text(
+            "SELECT batch_id, step_index FROM workflow_node_version "
+            "GROUP BY batch_id, step_index HAVING COUNT(*) > COUNT(DISTINCT version)"
+        )
+    ).fetchall()
+    for batch_id, step_index in duplicated:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id FROM workflow_node_version "
+                "WHERE batch_id = :batch_id AND step_index = :step_index "
+                "ORDER BY version, created_at, id"
+            ),
+            {"batch_id": batch_id, "step_index": step_index},
+        ).fetchall()
+        for version, (node_version_id,) in enumerate(rows, start=1):
+            bind.execute(
+                sa.text("UPDATE workflow_node_version SET version = :version WHERE id = :id"),
+                {"version": version, "id": node_version_id},
+            )
+
+
+def upgrade() -> None:
+    uuid_type = sa.dialects.postgresql.UUID(as_uuid=True).with_variant(
+        sa.String(length=36), "sqlite"
+    )
+
+    op.create_table(
+        "step_version_counter",
+        sa.Column(
+            "batch_id",
+            uuid_type,
+            sa.ForeignKey("batch.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column("step_index", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("last_version", sa.Integer(), nullable=False),
+    )
+
+    bind = op.get_bind()
+    _renumber_duplicate_versions(bind)
+    op.execute(
+        "INSERT INTO step_version_counter (batch_id, step_index, last_version) "
+        "SELECT batch_id, step_index, MAX(version) FROM workflow_node_version "
+        "GROUP BY batch_id, step_index"
+    )
+    with op.batch_alter_table("workflow_node_version") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_node_version_step_version", ["batch_id", "step_index", "version"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workflow_node_version") as batch_op:
+        batch_op.drop_constraint("uq_node_version_step_version", type_="unique")
+    op.drop_table("step_version_counter")
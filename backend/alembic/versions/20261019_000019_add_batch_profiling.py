@@ -0,0 +1,27 @@
+"""add batch profiling flag
+
+Revision ID: 20261019_000019
+Revises: 20261019_000018
+Create Date: 2026-10-19 18:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000019"
+down_revision: Union[str, None] = "20261019_000018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "batch",
+        sa.Column("profiling", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("batch") as batch_op:
+        batch_op.drop_column("profiling")
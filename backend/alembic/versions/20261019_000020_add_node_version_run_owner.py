@@ -0,0 +1,26 @@
+"""add node version run owner and attempt
+
+Revision ID: 20261019_000020
+Revises: 20261019_000019
+Create Date: 2026-10-19 20:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000020"
+down_revision: Union[str, None] = "20261019_000019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("workflow_node_version", sa.Column("run_owner", sa.String(length=255), nullable=True))
+    op.add_column("workflow_node_version", sa.Column("run_attempt", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workflow_node_version") as batch_op:
+        batch_op.drop_column("run_attempt")
+        batch_op.drop_column("run_owner")
@@ -0,0 +1,97 @@
+import hashlib
+import pathlib
+import shutil
+import uuid
+from typing import Sequence
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.core.config import get_settings
+from app.models import Artifact, LineageEdge, WorkflowNodeVersion
+from app.steps.plate import Plate, dumps_plates, loads_plates
+
+PLATES_CONTENT_TYPE = "application/vnd.antibody.plates"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def artifact_dir(batch_id: uuid.UUID) -> pathlib.Path:
+    path = pathlib.Path(get_settings().artifact_root) / f"batch_{batch_id}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def write_artifact(
+    batch_id: uuid.UUID, node_version_id: uuid.UUID, filename: str, data: bytes
+) -> str:
+    """Write an immutable artifact file for a node version and return its URI.
+
+    Rewriting identical content is a no-op, so a retried step can repeat
+    writes that landed before it failed; different content is an error.
+    """
+    path = artifact_dir(batch_id) / f"{node_version_id}_{filename}"
+    try:
+        with path.open("xb") as handle:
+            handle.write(data)
+    except FileExistsError:
+        if path.read_bytes() != data:
+            raise
+        return str(path)
+    metrics.record_artifact_bytes(len(data))
+    return str(path)
+
+
+def store_artifact_file(
+    batch_id: uuid.UUID, node_version_id: uuid.UUID, filename: str, source: pathlib.Path
+) -> str:
+    """Move an already-written file (e.g. a streamed upload) into artifact storage."""
+    path = artifact_dir(batch_id) / f"{node_version_id}_{filename}"
+    if path.exists():
+        raise FileExistsError(path)
+    shutil.move(str(source), path)
+    metrics.record_artifact_bytes(path.stat().st_size)
+    return str(path)
+
+
+def file_digest(uri: str) -> str:
+    """SHA-256 of an artifact file's content."""
+    with open(uri, "rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def read_artifact(uri: str) -> bytes:
+    return pathlib.Path(uri).read_bytes()
+
+
+def write_plates(
+    batch_id: uuid.UUID, node_version_id: uuid.UUID, name: str, plates: Sequence[Plate]
+) -> str:
+    return write_artifact(batch_id, node_version_id, f"{name}.plates", dumps_plates(plates))
+
+
+def read_plates(uri: str) -> list[Plate]:
+    return loads_plates(read_artifact(uri))
+
+
+def record_artifact(
+    session: Session,
+    node_version: WorkflowNodeVersion,
+    uri: str,
+    content_type: str = "text/plain",
+    relation: str = "artifact",
+) -> Artifact:
+    """Register an artifact file and its lineage edge on the node version."""
+    digest = file_digest(uri) if pathlib.Path(uri).is_file() else None
+    artifact = Artifact(
+        node_version_id=node_version.id, uri=uri, content_type=content_type, digest=digest
+    )
+    session.add(artifact)
+    session.flush()
+    session.add(
+        LineageEdge(
+            source_node_version_id=node_version.id,
+            target_artifact_id=artifact.id,
+            relation=relation,
+        )
+    )
+    return artifact
@@ -0,0 +1,123 @@
+import pathlib
+import uuid
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app import statuses
+from app.activities import sample_index, versions
+from app.activities.artifacts import XLSX_CONTENT_TYPE, record_artifact, store_artifact_file
+from app.db.bulk import bulk_insert
+from app.models import Chain, WorkflowNodeVersion
+from app.steps import chain_library
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+CONTENT_TYPES = {"fasta": "text/x-fasta", "xlsx": XLSX_CONTENT_TYPE}
+
+
+class ChainImportError(ValueError):
+    def __init__(self, errors: list[dict], total: int) -> None:
+        super().__init__(f"{total} invalid chain records")
+        self.errors = errors
+        self.total = total
+
+
+def known_digests(session: Session, digests: Iterable[str | None]) -> set[str]:
+    """Digests among ``digests`` that already belong to a stored chain (index lookup)."""
+    wanted = {digest for digest in digests if digest}
+    if not wanted:
+        return set()
+    return {
+        row[0]
+        for row in session.query(Chain.sequence_digest)
+        .filter(Chain.sequence_digest.in_(wanted))
+        .distinct()
+    }
+
+
+def _records(path: pathlib.Path, fmt: str):
+    if fmt == "fasta":
+        with path.open(encoding="utf-8") as handle:
+            yield from chain_library.parse_fasta(handle)
+    elif fmt == "xlsx":
+        yield from chain_library.parse_xlsx(str(path))
+    else:
+        raise ValueError(f"Unsupported library format {fmt!r}")
+
+
+def import_chain_library(
+    session: Session,
+    batch_id: uuid.UUID,
+    step_index: int,
+    upload_path: pathlib.Path,
+    fmt: str,
+) -> WorkflowNodeVersion:
+    """Load a whole chain library as one completed node version.
+
+    Records are validated and inserted in batches inside a single
+    transaction; any invalid record rolls the whole import back.
+    """
+    node_version = WorkflowNodeVersion(
+        batch_id=batch_id,
+        template_version="v1",
+        step_index=step_index,
+        version=versions.allocate_version(session, batch_id, step_index),
+        status=statuses.COMPLETED,
+    )
+    session.add(node_version)
+    session.flush()
+
+    chain_table = Chain.__table__
+    processed = 0
+    imported = 0
+    errors: list[dict] = []
+    error_count = 0
+    seen: set[str | None] = set()
+    duplicates = 0
+    try:
+        for batch in chain_library.batched(_records(upload_path, fmt), IMPORT_BATCH_SIZE):
+            batch_errors = chain_library.validate_batch(batch, offset=processed)
+            digests = [chain_library.sequence_digest(record.sequence) for record in batch]
+            processed += len(batch)
+            if batch_errors:
+                error_count += len(batch_errors)
+                errors.extend(batch_errors[: MAX_REPORTED_ERRORS - len(errors)])
+            if error_count:
+                continue
+            known = known_digests(session, digests)
+            bulk_insert(
+                session,
+                chain_table,
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "node_version_id": node_version.id,
+                        "name": record.name,
+                        "sequence": record.sequence,
+                        "sequence_digest": digest,
+                    }
+                    for record, digest in zip(batch, digests)
+                ],
+            )
+            sample_index.index_names(session, node_version, (record.name for record in batch), "chain")
+            imported += len(batch)
+            for digest in digests:
+                if digest in seen or digest in known:
+                    duplicates += 1
+                seen.add(digest)
+        if error_count:
+            raise ChainImportError(errors, error_count)
+
+        uri = store_artifact_file(batch_id, node_version.id, f"library.{fmt}", upload_path)
+        record_artifact(session, node_version, uri, CONTENT_TYPES[fmt], relation="upload")
+        node_version.artifact_uri = uri
+        node_version.params = {
+            "import": {"format": fmt, "chains": imported, "duplicate_sequences": duplicates}
+        }
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return node_version
@@ -0,0 +1,103 @@
+"""Step handler registry.
+
+A handler implements one kind of step computation and declares what it
+reads, what it produces and which resource class it needs, so it can be
+benchmarked and routed independently. ``execute_step`` resolves the handler
+for a node version from its ``operation`` param, then the template step's
+``handler`` column, then the legacy default for its ``step_index``.
+"""
+import abc
+import inspect
+from typing import ClassVar, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import WorkflowNodeVersion, WorkflowTemplateStep
+from app.resources import CPU, DB, RESOURCE_CLASSES  # noqa: F401
+
+# Mock behaviour of the original three-step template
+LEGACY_STEP_HANDLERS = {1: "chain", 2: "construct", 3: "construct_consumption"}
+DEFAULT_HANDLER = "noop"
+
+
+class StepHandler(abc.ABC):
+    """Base class; subclasses set the metadata and implement :meth:`run`."""
+
+    name: ClassVar[str]
+    # Bump when the computation changes so memoized results are not reused
+    version: ClassVar[str] = "1"
+    resource_class: ClassVar[str] = DB
+    inputs: ClassVar[tuple[str, ...]] = ()
+    outputs: ClassVar[tuple[str, ...]] = ()
+    # Output depends only on params and the files they reference (no domain rows)
+    memoizable: ClassVar[bool] = False
+    # Calls progress.report/save_checkpoint while running; only these steps get a heartbeat timeout
+    heartbeats: ClassVar[bool] = False
+
+    @abc.abstractmethod
+    def run(
+        self,
+        session: Session,
+        node_version: WorkflowNodeVersion,
+        parent_version: Optional[WorkflowNodeVersion] = None,
+    ) -> Optional[str]:
+        """Compute the step for ``node_version`` and return its primary artifact URI."""
+
+    @classmethod
+    def describe(cls) -> dict:
+        return {
+            "name": cls.name,
+            "version": cls.version,
+            "resource_class": cls.resource_class,
+            "memoizable": cls.memoizable,
+            "heartbeats": cls.heartbeats,
+            "inputs": list(cls.inputs),
+            "outputs": list(cls.outputs),
+        }
+
+
+_REGISTRY: dict[str, type[StepHandler]] = {}
+
+
+def register(handler: type[StepHandler]) -> type[StepHandler]:
+    if inspect.isabstract(handler):
+        missing = ", ".join(sorted(handler.__abstractmethods__))
+        raise TypeError(f"Handler {handler.__name__} does not implement {missing}")
+    if handler.resource_class not in RESOURCE_CLASSES:
+        raise ValueError(f"Handler {handler.name!r} has unknown resource class {handler.resource_class!r}")
+    if handler.name in _REGISTRY and _REGISTRY[handler.name] is not handler:
+        raise ValueError(f"Step handler {handler.name!r} is already registered")
+    _REGISTRY[handler.name] = handler
+    return handler
+
+
+def get_handler(name: str) -> type[StepHandler]:
+    handler = _REGISTRY.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown step handler {name!r}")
+    return handler
+
+
+def registered_handlers() -> dict[str, type[StepHandler]]:
+    return dict(_REGISTRY)
+
+
+def handler_name_for(session: Session, node_version: WorkflowNodeVersion) -> str:
+    operation = (node_version.params or {}).get("operation")
+    if operation is not None:
+        return operation
+    template_handler = (
+        session.query(WorkflowTemplateStep.handler)
+        .filter(
+            WorkflowTemplateStep.template_version == node_version.template_version,
+            WorkflowTemplateStep.step_index == node_version.step_index,
+        )
+        .scalar()
+    )
+    if template_handler:
+        return template_handler
+    return LEGACY_STEP_HANDLERS.get(node_version.step_index, DEFAULT_HANDLER)
+
+
+def resolve_handler(session: Session, node_version: WorkflowNodeVersion) -> StepHandler:
+    return get_handler(handler_name_for(session, node_version))()
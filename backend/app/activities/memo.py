@@ -0,0 +1,195 @@
+"""Content-keyed memoization of step results.
+
+The cache key covers the handler name and version, the params, and the
+content digests of every file the params point at (``*_uri`` and ``*_uris``
+keys), so identical work in another batch or after a rollback maps to the
+same key even though the file paths differ. A hit links the new node
+version to the earlier outputs with ``reuse`` lineage edges; no files or
+artifact rows are copied. The earlier version's sample-search entries are
+copied, so the reusing batch's samples are still found. Carried-forward
+versions (incremental rollback) are linked the same way.
+"""
+import hashlib
+import json
+import pathlib
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.activities import sample_index
+from app.activities.artifacts import file_digest
+from app.activities.handlers import StepHandler
+from app.models import Artifact, LineageEdge, StepResultCache, WorkflowNodeVersion
+
+REUSE_RELATION = "reuse"
+# Incremental rollback: a version that stands in for its unchanged parent
+CARRY_RELATION = "carry"
+
+
+def _uri_digest(session: Session, uri: str) -> str:
+    stored = (
+        session.query(Artifact.digest)
+        .filter(Artifact.uri == uri, Artifact.digest.isnot(None))
+        .limit(1)
+        .scalar()
+    )
+    return stored or file_digest(uri)
+
+
+def _keyed_params(session: Session, params: dict) -> dict:
+    keyed = {}
+    for name, value in params.items():
+        if name.endswith("_uri") and isinstance(value, str):
+            keyed[name] = {"digest": _uri_digest(session, value)}
+        elif name.endswith("_uris") and isinstance(value, list):
+            keyed[name] = [{"digest": _uri_digest(session, uri)} for uri in value]
+        else:
+            keyed[name] = value
+    return keyed
+
+
+def cache_key(session: Session, handler: StepHandler, node_version: WorkflowNodeVersion) -> Optional[str]:
+    """Key for the node version's computation, or None when it must not be cached."""
+    params = node_version.params or {}
+    if not handler.memoizable or params.get("cache") is False:
+        return None
+    try:
+        keyed = _keyed_params(session, params)
+    except FileNotFoundError:
+        return None
+    material = json.dumps(
+        {"handler": handler.name, "version": handler.version, "params": keyed},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def lookup(session: Session, key: str, node_version: WorkflowNodeVersion) -> Optional[StepResultCache]:
+    entry = session.query(StepResultCache).filter(StepResultCache.cache_key == key).one_or_none()
+    if entry is None or entry.node_version_id == node_version.id:
+        return None
+    uris = [
+        row[0] for row in session.query(Artifact.uri).filter(Artifact.node_version_id == entry.node_version_id)
+    ]
+    if not all(pathlib.Path(uri).is_file() for uri in uris):
+        return None
+    return entry
+
+
+def link_outputs(session: Session, source_node_version_id, node_version: WorkflowNodeVersion) -> None:
+    """Point ``node_version`` at another version's outputs, including outputs that version reuses.
+
+    Adds a ``reuse`` edge to each artifact and copies the sample-search
+    entries, so the outputs show up under the new version as if it had
+    written them.
+    """
+    reused = session.query(LineageEdge.target_artifact_id).filter(
+        LineageEdge.source_node_version_id == source_node_version_id,
+        LineageEdge.relation == REUSE_RELATION,
+        LineageEdge.target_artifact_id.isnot(None),
+    )
+    artifact_ids = session.query(Artifact.id).filter(
+        (Artifact.node_version_id == source_node_version_id) | Artifact.id.in_(reused)
+    )
+    for (artifact_id,) in artifact_ids:
+        session.add(
+            LineageEdge(
+                source_node_version_id=node_version.id,
+                target_artifact_id=artifact_id,
+                relation=REUSE_RELATION,
+            )
+        )
+    sample_index.copy_locations(session, source_node_version_id, node_version)
+
+
+def reuse(session: Session, entry: StepResultCache, node_version: WorkflowNodeVersion) -> Optional[str]:
+    """Point ``node_version`` at the cached outputs and count the hit."""
+    session.add(
+        LineageEdge(
+            source_node_version_id=entry.node_version_id,
+            target_node_version_id=node_version.id,
+            relation=REUSE_RELATION,
+        )
+    )
+    link_outputs(session, entry.node_version_id, node_version)
+    # Incremented in SQL so concurrent hits on the same entry are all counted
+    session.execute(
+        update(StepResultCache)
+        .where(StepResultCache.id == entry.id)
+        .values(hit_count=StepResultCache.hit_count + 1, last_hit_at=datetime.now(timezone.utc))
+    )
+    return entry.artifact_uri
+
+
+def store(
+    session: Session, key: str, handler: StepHandler, node_version: WorkflowNodeVersion, artifact_uri: Optional[str]
+) -> None:
+    """Record a fresh result; a concurrent writer of the same key wins silently."""
+    try:
+        with session.begin_nested():
+            session.add(
+                StepResultCache(
+                    cache_key=key,
+                    handler=handler.name,
+                    node_version_id=node_version.id,
+                    artifact_uri=artifact_uri,
+                )
+            )
+    except IntegrityError:
+        pass
+
+
+def output_digests(session: Session, node_version_id) -> Optional[list[tuple[str, str]]]:
+    """Sorted (content type, digest) of a version's outputs, including reused ones.
+
+    Carried-forward versions resolve to the version they carry. None when
+    any output has no digest, so it cannot be compared.
+    """
+    while True:
+        carried_from = (
+            session.query(LineageEdge.source_node_version_id)
+            .filter(
+                LineageEdge.target_node_version_id == node_version_id,
+                LineageEdge.relation == CARRY_RELATION,
+            )
+            .limit(1)
+            .scalar()
+        )
+        if carried_from is None:
+            break
+        node_version_id = carried_from
+    reused = (
+        session.query(LineageEdge.target_artifact_id)
+        .filter(
+            LineageEdge.source_node_version_id == node_version_id,
+            LineageEdge.relation == REUSE_RELATION,
+            LineageEdge.target_artifact_id.isnot(None),
+        )
+    )
+    rows = (
+        session.query(Artifact.content_type, Artifact.digest)
+        .filter((Artifact.node_version_id == node_version_id) | Artifact.id.in_(reused))
+        .all()
+    )
+    if any(digest is None for _, digest in rows):
+        return None
+    return sorted((content_type, digest) for content_type, digest in rows)
+
+
+def cache_stats(session: Session) -> dict:
+    """Each entry is one computation; each hit is one avoided recomputation."""
+    entries, hits = session.query(
+        func.count(StepResultCache.id), func.coalesce(func.sum(StepResultCache.hit_count), 0)
+    ).one()
+    executions = entries + hits
+    return {
+        "entries": entries,
+        "hits": int(hits),
+        "misses": entries,
+        "hit_rate": (hits / executions) if executions else 0.0,
+    }
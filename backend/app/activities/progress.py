@@ -0,0 +1,132 @@
+"""Progress reporting and chunk checkpoints for long-running step handlers.
+
+Handlers that work in chunks call :func:`save_checkpoint` after each chunk.
+It commits the chunk's rows together with its checkpoint, records progress
+on the node version and heartbeats the Temporal activity. A retried
+activity reads :func:`load_checkpoints` and skips the chunks already done.
+
+A retry can start while a timed-out attempt is still running. Each
+``execute_step`` call therefore claims the node version first
+(:func:`claim`), recording its activity and attempt number. Checkpoints and the final result are only
+committed after :func:`fence` confirms the claim still holds. A superseded
+attempt raises :class:`StepSuperseded` and writes nothing more.
+"""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from temporalio import activity
+
+from app import statuses
+from app.models import StepCheckpoint, WorkflowNodeVersion
+
+_CLAIMS = "run_claims"
+
+
+class StepSuperseded(RuntimeError):
+    pass
+
+
+def run_identity() -> tuple[str, int]:
+    """Owner and attempt of the current execution; outside an activity every call is a new owner."""
+    if activity.in_activity():
+        info = activity.info()
+        return f"{info.workflow_run_id}/{info.activity_id}", info.attempt
+    return uuid.uuid4().hex, 1
+
+
+def claim(session: Session, node_version: WorkflowNodeVersion, owner: str, attempt: int) -> bool:
+    """Mark the node version RUNNING for this execution; commits.
+
+    Takes over an IDLE version, or a RUNNING one left by another execution or
+    by an earlier attempt of this one. Returns False when the version has
+    finished or a later attempt holds it.
+    """
+    claimed = session.execute(
+        update(WorkflowNodeVersion)
+        .where(
+            WorkflowNodeVersion.id == node_version.id,
+            or_(
+                WorkflowNodeVersion.status == statuses.IDLE,
+                (WorkflowNodeVersion.status == statuses.RUNNING)
+                & or_(
+                    WorkflowNodeVersion.run_owner.is_(None),
+                    WorkflowNodeVersion.run_owner != owner,
+                    WorkflowNodeVersion.run_attempt < attempt,
+                ),
+            ),
+        )
+        .values(status=statuses.RUNNING, run_owner=owner, run_attempt=attempt)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    if not claimed:
+        return False
+    session.info.setdefault(_CLAIMS, {})[node_version.id] = (owner, attempt)
+    return True
+
+
+def fence(session: Session, node_version: WorkflowNodeVersion) -> None:
+    """Raise StepSuperseded unless this session's claim still holds; locks the row until commit."""
+    held = session.info.get(_CLAIMS, {}).get(node_version.id)
+    if held is None:
+        return
+    owner, attempt = held
+    owned = session.execute(
+        update(WorkflowNodeVersion)
+        .where(
+            WorkflowNodeVersion.id == node_version.id,
+            WorkflowNodeVersion.run_owner == owner,
+            WorkflowNodeVersion.run_attempt == attempt,
+        )
+        .values(run_attempt=attempt)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not owned:
+        session.rollback()
+        raise StepSuperseded(f"Node version {node_version.id} was taken over by a later attempt")
+
+
+def heartbeat(*details) -> None:
+    if activity.in_activity():
+        activity.heartbeat(*details)
+
+
+def report(session: Session, node_version: WorkflowNodeVersion, done: int, total: int) -> None:
+    node_version.progress_done = done
+    node_version.progress_total = total
+    node_version.progress_updated_at = datetime.now(timezone.utc)
+    session.add(node_version)
+    heartbeat({"done": done, "total": total})
+
+
+def load_checkpoints(session: Session, node_version: WorkflowNodeVersion) -> dict[int, dict]:
+    return {
+        checkpoint.chunk_index: checkpoint.state
+        for checkpoint in session.query(StepCheckpoint)
+        .filter(StepCheckpoint.node_version_id == node_version.id)
+        .order_by(StepCheckpoint.chunk_index)
+    }
+
+
+def save_checkpoint(
+    session: Session,
+    node_version: WorkflowNodeVersion,
+    chunk_index: int,
+    state: dict,
+    done: int | None = None,
+    total: int | None = None,
+) -> None:
+    """Durably mark a chunk complete; commits the session."""
+    session.add(StepCheckpoint(node_version_id=node_version.id, chunk_index=chunk_index, state=state))
+    if done is not None and total is not None:
+        report(session, node_version, done, total)
+    fence(session, node_version)
+    session.commit()
+
+
+def clear_checkpoints(session: Session, node_version: WorkflowNodeVersion) -> None:
+    session.query(StepCheckpoint).filter(StepCheckpoint.node_version_id == node_version.id).delete(
+        synchronize_session=False
+    )
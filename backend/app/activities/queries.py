@@ -0,0 +1,91 @@
+"""Hot activity queries, built once at import time.
+
+Each statement is a Core ``select`` over plain columns with bound
+parameters. Reusing the same statement object lets SQLAlchemy skip
+construction and cache-key generation and go straight to its compiled
+cache. Selecting columns instead of entities also skips ORM loading and
+the identity map. Execute with ``session.execute(STATEMENT, params)``.
+"""
+from sqlalchemy import bindparam, select
+
+from app import statuses
+from app.models import Chain, Construct, WorkflowNodeVersion, WorkflowTemplateStep
+
+# Newest first; ties (legacy duplicate versions) broken by recency, then id
+_NEWEST_FIRST = (
+    WorkflowNodeVersion.version.desc(),
+    WorkflowNodeVersion.created_at.desc(),
+    WorkflowNodeVersion.updated_at.desc(),
+    WorkflowNodeVersion.id.desc(),
+)
+
+TEMPLATE_STEP_INDICES = (
+    select(WorkflowTemplateStep.step_index)
+    .where(WorkflowTemplateStep.template_version == bindparam("template_version"))
+    .order_by(WorkflowTemplateStep.step_index)
+)
+
+LATEST_VERSION_ID = (
+    select(WorkflowNodeVersion.id)
+    .where(
+        WorkflowNodeVersion.batch_id == bindparam("batch_id"),
+        WorkflowNodeVersion.step_index == bindparam("step_index"),
+    )
+    .order_by(*_NEWEST_FIRST)
+    .limit(1)
+)
+
+# Idle versions of every template step in one round trip; the first row per
+# step_index is that step's latest idle version
+IDLE_VERSIONS_BY_STEP = (
+    select(WorkflowNodeVersion.step_index, WorkflowNodeVersion.id)
+    .where(
+        WorkflowNodeVersion.batch_id == bindparam("batch_id"),
+        WorkflowNodeVersion.status == statuses.IDLE,
+        WorkflowNodeVersion.step_index.in_(
+            TEMPLATE_STEP_INDICES.with_only_columns(WorkflowTemplateStep.step_index).scalar_subquery()
+        ),
+    )
+    .order_by(WorkflowNodeVersion.step_index, *_NEWEST_FIRST)
+)
+
+BATCH_CHAINS = (
+    select(Chain.id, Chain.node_version_id, Chain.sequence_digest)
+    .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
+    .where(WorkflowNodeVersion.batch_id == bindparam("batch_id"))
+    .order_by(Chain.created_at, Chain.id)
+)
+
+CHAIN_SOURCES_BY_NAME = (
+    select(Chain.node_version_id)
+    .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
+    .where(
+        WorkflowNodeVersion.batch_id == bindparam("batch_id"),
+        Chain.name.in_(bindparam("names", expanding=True)),
+    )
+)
+
+CONSTRUCT_SOURCES_BY_NAME = (
+    select(Construct.node_version_id)
+    .join(WorkflowNodeVersion, Construct.node_version_id == WorkflowNodeVersion.id)
+    .where(
+        WorkflowNodeVersion.batch_id == bindparam("batch_id"),
+        Construct.name.in_(bindparam("names", expanding=True)),
+    )
+)
+
+LATEST_BATCH_CONSTRUCT_ID = (
+    select(Construct.id)
+    .join(WorkflowNodeVersion, Construct.node_version_id == WorkflowNodeVersion.id)
+    .where(
+        WorkflowNodeVersion.batch_id == bindparam("batch_id"),
+        WorkflowNodeVersion.step_index == bindparam("step_index"),
+    )
+    .order_by(
+        WorkflowNodeVersion.version.desc(),
+        WorkflowNodeVersion.created_at.desc(),
+        Construct.created_at.desc(),
+        Construct.id.desc(),
+    )
+    .limit(1)
+)
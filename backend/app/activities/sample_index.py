@@ -0,0 +1,145 @@
+"""Sample-name search index over plate layouts, chains and constructs.
+
+PostgreSQL answers substring queries from a ``pg_trgm`` GIN index on
+``sample_location.name``; other databases use the ``sample_trigram``
+postings table, which is only populated there.
+"""
+import uuid
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.bulk import bulk_insert
+from app.models import Artifact, SampleLocation, SampleTrigram, WorkflowNodeVersion
+from app.steps import ngram
+from app.steps.plate import EMPTY, Plate, well_name
+
+MAX_NAME_LENGTH = 255
+
+
+def _uses_pg_trgm(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def _insert(session: Session, locations: list[dict]) -> None:
+    bulk_insert(session, SampleLocation.__table__, locations)
+    if _uses_pg_trgm(session):
+        return
+    bulk_insert(
+        session,
+        SampleTrigram.__table__,
+        [
+            {"trigram": gram, "location_id": location["id"]}
+            for location in locations
+            for gram in ngram.trigrams(location["name"])
+        ],
+    )
+
+
+def _location(node_version: WorkflowNodeVersion, kind: str, name: str, **extra) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "batch_id": node_version.batch_id,
+        "node_version_id": node_version.id,
+        "artifact_id": extra.get("artifact_id"),
+        "kind": kind,
+        "name": name[:MAX_NAME_LENGTH],
+        "plate": extra.get("plate"),
+        "well": extra.get("well"),
+    }
+
+
+def index_plates(
+    session: Session,
+    node_version: WorkflowNodeVersion,
+    plates: Sequence[Plate],
+    artifact: Artifact | None = None,
+) -> int:
+    """Index every occupied well of ``plates`` under the node version."""
+    artifact_id = artifact.id if artifact is not None else None
+    locations = []
+    for plate in plates:
+        rows, cols = np.nonzero(plate.codes != EMPTY)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            locations.append(
+                _location(
+                    node_version,
+                    "well",
+                    plate.samples[plate.codes[r, c]],
+                    artifact_id=artifact_id,
+                    plate=plate.name,
+                    well=well_name(r, c),
+                )
+            )
+    _insert(session, locations)
+    return len(locations)
+
+
+def index_names(
+    session: Session, node_version: WorkflowNodeVersion, names: Iterable[str | None], kind: str
+) -> int:
+    """Index chain or construct names produced by the node version."""
+    locations = [_location(node_version, kind, name) for name in names if name]
+    _insert(session, locations)
+    return len(locations)
+
+
+def copy_locations(session: Session, source_node_version_id: uuid.UUID, node_version: WorkflowNodeVersion) -> int:
+    """Index ``node_version`` under the same names and wells as an earlier version whose outputs it reuses."""
+    locations = [
+        _location(node_version, kind, name, artifact_id=artifact_id, plate=plate, well=well)
+        for kind, name, artifact_id, plate, well in session.query(
+            SampleLocation.kind,
+            SampleLocation.name,
+            SampleLocation.artifact_id,
+            SampleLocation.plate,
+            SampleLocation.well,
+        ).filter(SampleLocation.node_version_id == source_node_version_id)
+    ]
+    _insert(session, locations)
+    return len(locations)
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_samples(
+    session: Session,
+    text: str,
+    limit: int = 200,
+    batch_id: uuid.UUID | None = None,
+) -> list[SampleLocation]:
+    """Locations whose name contains ``text`` (case-insensitive)."""
+    value = ngram.normalize(text)
+    if not value:
+        return []
+    pattern = f"%{_escape_like(value)}%"
+    query = session.query(SampleLocation)
+    if _uses_pg_trgm(session):
+        query = query.filter(SampleLocation.name.ilike(pattern, escape="\\"))
+    else:
+        query = query.filter(func.lower(SampleLocation.name).like(pattern, escape="\\"))
+        if len(value) >= ngram.GRAM:
+            grams = ngram.trigrams(value)
+            candidates = (
+                session.query(SampleTrigram.location_id)
+                .filter(SampleTrigram.trigram.in_(grams))
+                .group_by(SampleTrigram.location_id)
+                .having(func.count() == len(grams))
+            )
+            query = query.filter(SampleLocation.id.in_(candidates))
+    if batch_id is not None:
+        query = query.filter(SampleLocation.batch_id == batch_id)
+    return (
+        query.order_by(
+            SampleLocation.batch_id,
+            SampleLocation.plate,
+            SampleLocation.well,
+            SampleLocation.name,
+        )
+        .limit(limit)
+        .all()
+    )
@@ -1,9 +1,31 @@
+import abc
+import csv
+import json
 import pathlib
+import re
 import uuid
+from contextlib import nullcontext
 from typing import Optional
 
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from temporalio import activity
 
+from app.activities import handlers, memo, progress, queries, sample_index, versions
+from app.activities.artifacts import (
+    PLATES_CONTENT_TYPE,
+    XLSX_CONTENT_TYPE,
+    read_artifact,
+    read_plates,
+    record_artifact,
+    write_artifact,
+    write_plates,
+)
+from app import metrics, profiling, tracing
+from app.core.config import get_settings
+from app.db import query_budget
 from app.db.session import SessionLocal
 from app.models import (
     Artifact,
@@ -11,15 +33,18 @@ from app.models import (
     Chain,
     Construct,
     ConstructChain,
+    CurveFit,
     LineageEdge,
     WorkflowNodeVersion,
-    WorkflowTemplateStep,
 )
 from app import statuses
+from app.steps import bca, chain_library, cherrypick, pairing, primer_ingest, qubit
+from app.steps.plate import Plate, well_name
+from app.steps.worklist import to_tecan_csv
 
 
 def _mock_artifact_path(batch_id: uuid.UUID, step_index: int) -> str:
-    artifacts_dir = pathlib.Path("/tmp/antibody_artifacts")
+    artifacts_dir = pathlib.Path(get_settings().artifact_root)
     artifacts_dir.mkdir(parents=True, exist_ok=True)
     path = artifacts_dir / f"batch_{batch_id}_step_{step_index}.txt"
     path.write_text(f"Mock artifact for batch {batch_id}, step {step_index}\n", encoding="utf-8")
@@ -38,39 +63,500 @@ def update_batch_status(batch_id: uuid.UUID, status: str) -> None:
 
 
 @activity.defn(name="get_idle_versions")
+@query_budget.limit(1)
 def get_idle_versions(batch_id: uuid.UUID) -> list[dict]:
     """Return latest idle node_version per step_index, ordered by step_index."""
     with SessionLocal() as session:
-        template_step_indices = [
-            row[0]
-            for row in session.query(WorkflowTemplateStep.step_index)
-            .filter(WorkflowTemplateStep.template_version == "v1")
-            .order_by(WorkflowTemplateStep.step_index)
-            .all()
+        pending: dict[int, str] = {}
+        rows = session.execute(
+            queries.IDLE_VERSIONS_BY_STEP, {"batch_id": batch_id, "template_version": "v1"}
+        )
+        for step_index, node_version_id in rows:
+            pending.setdefault(step_index, str(node_version_id))
+        return [
+            {"step_index": step_index, "node_version_id": node_version_id}
+            for step_index, node_version_id in pending.items()
         ]
 
-        pending: list[dict] = []
-        for step_index in template_step_indices:
-            latest = (
-                session.query(WorkflowNodeVersion)
-                .filter(
-                    WorkflowNodeVersion.batch_id == batch_id,
-                    WorkflowNodeVersion.step_index == step_index,
-                    WorkflowNodeVersion.status == "idle",
-                )
-                .order_by(
-                    WorkflowNodeVersion.version.desc(),
-                    WorkflowNodeVersion.created_at.desc(),
-                    WorkflowNodeVersion.updated_at.desc(),
-                    WorkflowNodeVersion.id.desc(),
+
+def _record_plates(
+    session: Session, node_version: WorkflowNodeVersion, uri: str, plates: list[Plate]
+) -> Artifact:
+    artifact = record_artifact(session, node_version, uri, PLATES_CONTENT_TYPE)
+    sample_index.index_plates(session, node_version, plates, artifact)
+    return artifact
+
+
+def _load_layouts(params: dict) -> list[Plate]:
+    if "layout_uri" in params:
+        return read_plates(params["layout_uri"])
+    return [
+        Plate.from_column(layout["samples"], name=layout.get("name", f"plate{i + 1}"))
+        for i, layout in enumerate(params.get("layouts", []))
+    ]
+
+
+def _qubit_concentration(session: Session, node_version: WorkflowNodeVersion) -> str:
+    """SOP 6.6.1: convert Qubit readings for every layout plate to ng/ul."""
+    params = node_version.params or {}
+    layouts = _load_layouts(params)
+    if not layouts:
+        raise ValueError("Qubit step requires at least one layout plate")
+    if "reading_uris" in params:
+        raw_readings = [qubit.parse_asc(read_artifact(uri).decode("utf-8")) for uri in params["reading_uris"]]
+    else:
+        raw_readings = params.get("readings", [])
+    if len(raw_readings) != len(layouts):
+        raise ValueError(f"Expected readings for {len(layouts)} plates, got {len(raw_readings)}")
+
+    if "standards" in params:
+        curve = qubit.fit_standard_curve(
+            params["standards"]["concentrations"], params["standards"]["readings"]
+        )
+    else:
+        curve = qubit.StandardCurve(**params["curve"])
+
+    readings = qubit.stack_readings(raw_readings, size=layouts[0].size)
+    plates, flags = qubit.quantify_plates(
+        layouts, readings, curve, float(params.get("dilution_factor", 1.0))
+    )
+
+    plates_uri = write_plates(node_version.batch_id, node_version.id, "qubit_concentration", plates)
+    report = {
+        "curve": curve.as_dict(),
+        "plates": [plate.name for plate in plates],
+        "flagged_wells": qubit.qc_report(plates, flags),
+    }
+    report_uri = write_artifact(
+        node_version.batch_id,
+        node_version.id,
+        "qubit_qc.json",
+        json.dumps(report).encode("utf-8"),
+    )
+    _record_plates(session, node_version, plates_uri, plates)
+    record_artifact(session, node_version, report_uri, "application/json")
+    return plates_uri
+
+
+def _store_curve_fit(session: Session, digest: str, model: str, params: list[float]) -> list[float]:
+    """Store a fit; when a concurrent run stored the same curve first, use its row."""
+    try:
+        with session.begin_nested():
+            session.add(CurveFit(digest=digest, model=model, params=params))
+    except IntegrityError:
+        return session.scalars(select(CurveFit.params).where(CurveFit.digest == digest)).one()
+    return params
+
+
+def _fit_curves_cached(
+    session: Session, model: str, concentrations: list[float], absorbances: np.ndarray
+) -> tuple[np.ndarray, int]:
+    """Fit standard curves, reusing stored fits for plates whose raw standards are unchanged."""
+    digests = bca.curve_digests(model, np.asarray(concentrations), absorbances)
+    cached = {
+        fit.digest: fit.params
+        for fit in session.query(CurveFit).filter(CurveFit.digest.in_(set(digests))).all()
+    }
+    missing = sorted({i for i, digest in enumerate(digests) if digest not in cached})
+    if missing:
+        fitted = bca.fit_curves(model, concentrations, absorbances[missing])
+        for i, params in zip(missing, fitted.tolist()):
+            if digests[i] not in cached:
+                cached[digests[i]] = _store_curve_fit(session, digests[i], model, params)
+    return np.array([cached[digest] for digest in digests]), len(digests) - len(missing)
+
+
+def _bca_normalization(session: Session, node_version: WorkflowNodeVersion) -> str:
+    """SOP 6.8.1: antibody concentration from BCA absorbance, then normalization worklist."""
+    params = node_version.params or {}
+    layouts = _load_layouts(params)
+    if not layouts:
+        raise ValueError("BCA step requires at least one layout plate")
+    model = params.get("model", bca.QUADRATIC)
+    standards = params["standards"]
+    standard_absorbances = np.atleast_2d(np.asarray(standards["absorbances"], dtype=np.float64))
+    if standard_absorbances.shape[0] == 1 and len(layouts) > 1:
+        standard_absorbances = np.repeat(standard_absorbances, len(layouts), axis=0)
+    if standard_absorbances.shape[0] != len(layouts) or len(params.get("absorbances", [])) != len(layouts):
+        raise ValueError(f"Expected absorbances for {len(layouts)} plates")
+
+    curve_params, cache_hits = _fit_curves_cached(
+        session, model, standards["concentrations"], standard_absorbances
+    )
+    absorbances = qubit.stack_readings(params["absorbances"], size=layouts[0].size)
+    occupied = np.stack([plate.occupied for plate in layouts])
+    concentrations = bca.invert_curves(model, curve_params, absorbances)
+    concentrations = np.where(occupied, concentrations * float(params.get("dilution_factor", 1.0)), np.nan)
+    plates = [plate.with_values(conc) for plate, conc in zip(layouts, concentrations)]
+
+    sample_volumes, diluent_volumes, insufficient = bca.normalization_volumes(
+        concentrations, float(params["target_concentration"]), float(params["final_volume"])
+    )
+    transfers = bca.normalization_worklist(plates, sample_volumes, diluent_volumes)
+
+    batch_id, node_id = node_version.batch_id, node_version.id
+    plates_uri = write_plates(batch_id, node_id, "bca_concentration", plates)
+    worklist_uri = write_artifact(batch_id, node_id, "bca_normalization_worklist.csv", to_tecan_csv(transfers))
+    report = {
+        "model": model,
+        "curves": {plate.name: p for plate, p in zip(plates, curve_params.tolist())},
+        "cached_curves": cache_hits,
+        "off_curve": [
+            {"plate": plates[p].name, "well": well}
+            for p in range(len(plates))
+            for well in _wells(occupied[p] & np.isnan(concentrations[p]))
+        ],
+        "insufficient": [
+            {"plate": plates[p].name, "well": well}
+            for p in range(len(plates))
+            for well in _wells(insufficient[p])
+        ],
+    }
+    report_uri = write_artifact(batch_id, node_id, "bca_report.json", json.dumps(report).encode("utf-8"))
+    _record_plates(session, node_version, plates_uri, plates)
+    record_artifact(session, node_version, worklist_uri, "text/csv")
+    record_artifact(session, node_version, report_uri, "application/json")
+    return plates_uri
+
+
+def _load_pairs(params: dict) -> list[pairing.Pair]:
+    if "pairs_uri" in params:
+        rows = csv.DictReader(read_artifact(params["pairs_uri"]).decode("utf-8-sig").splitlines())
+    else:
+        rows = params.get("pairs", [])
+    return [pairing.Pair(row["antibody"], row["chain_H"], row["chain_L"]) for row in rows]
+
+
+def _in_chunks(values: list, size: int = 500):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _record_inputs(session: Session, node_version: WorkflowNodeVersion, source_ids: set[uuid.UUID]) -> None:
+    for source_id in sorted(source_ids - {node_version.id}, key=str):
+        session.add(
+            LineageEdge(
+                source_node_version_id=source_id,
+                target_node_version_id=node_version.id,
+                relation="input",
+            )
+        )
+
+
+def _transfection_plan(session: Session, node_version: WorkflowNodeVersion) -> str:
+    """SOP 6.7.1: pair heavy/light plasmids per antibody and plan the transfection."""
+    params = node_version.params or {}
+    pairs = _load_pairs(params)
+    plasmid_uris = params.get("plasmid_uris") or [params["plasmid_uri"]]
+    plasmids = pairing.index_plasmids(plate for uri in plasmid_uris for plate in read_plates(uri))
+    result = pairing.match_pairs(pairs, plasmids)
+
+    antibodies = [pair.antibody for pair, _, _ in result.matched]
+    plates = pairing.transfection_plates(antibodies)
+    cells = [cell for plate in plates for cell in pairing.cell_plates(plate)]
+    transfers = pairing.transfection_worklist(
+        result.matched,
+        plates,
+        float(params.get("transfection_ng", 1000.0)),
+        float(params.get("heavy_fraction", 0.5)),
+        float(params.get("default_volume", 1.0)),
+    )
+
+    # Lineage from the Chain and Construct rows of this batch that the plan used
+    chain_names = sorted({name for pair, _, _ in result.matched for name in (pair.chain_h, pair.chain_l)})
+    source_ids: set[uuid.UUID] = set()
+    for chunk in _in_chunks(chain_names):
+        source_ids.update(
+            session.scalars(
+                queries.CHAIN_SOURCES_BY_NAME, {"batch_id": node_version.batch_id, "names": chunk}
+            )
+        )
+    for chunk in _in_chunks(sorted(set(antibodies))):
+        source_ids.update(
+            session.scalars(
+                queries.CONSTRUCT_SOURCES_BY_NAME, {"batch_id": node_version.batch_id, "names": chunk}
+            )
+        )
+    _record_inputs(session, node_version, source_ids)
+
+    batch_id, node_id = node_version.batch_id, node_version.id
+    plates_uri = write_plates(batch_id, node_id, "transfection_plates", plates)
+    cells_uri = write_plates(batch_id, node_id, "cell_plates", cells)
+    worklist_uri = write_artifact(batch_id, node_id, "transfection_worklist.csv", to_tecan_csv(transfers))
+    report = {"pairs": len(pairs), "matched": len(result.matched), "missing": result.missing}
+    report_uri = write_artifact(batch_id, node_id, "transfection_report.json", json.dumps(report).encode("utf-8"))
+    _record_plates(session, node_version, plates_uri, plates)
+    _record_plates(session, node_version, cells_uri, cells)
+    record_artifact(session, node_version, worklist_uri, "text/csv")
+    record_artifact(session, node_version, report_uri, "application/json")
+    return plates_uri
+
+
+def _cherrypick_plan(session: Session, node_version: WorkflowNodeVersion) -> str:
+    """SOP 6.5: order verified clone/plasmid transfers into the destination plates."""
+    params = node_version.params or {}
+    source_uris = params.get("source_uris") or [params["source_uri"]]
+    sources = [plate for uri in source_uris for plate in read_plates(uri)]
+    if "destination_uri" in params:
+        destinations = read_plates(params["destination_uri"])
+    else:
+        destinations = cherrypick.assign_destinations(params.get("picks", []))
+    timing = cherrypick.RobotTiming(**params.get("timing", {}))
+    plan = cherrypick.plan_cherry_pick(sources, destinations, float(params.get("volume", 10.0)), timing)
+
+    batch_id, node_id = node_version.batch_id, node_version.id
+    plates_uri = write_plates(batch_id, node_id, "cherrypick_plates", destinations)
+    worklist_uri = write_artifact(batch_id, node_id, "cherrypick_worklist.csv", to_tecan_csv(plan.transfers))
+    report = {
+        "transfers": len(plan.transfers),
+        "passes": len(plan.passes),
+        "predicted_seconds": plan.predicted_seconds,
+        "unoptimized_seconds": plan.naive_seconds,
+        "missing": plan.missing,
+    }
+    report_uri = write_artifact(batch_id, node_id, "cherrypick_report.json", json.dumps(report).encode("utf-8"))
+    _record_plates(session, node_version, plates_uri, destinations)
+    record_artifact(session, node_version, worklist_uri, "text/csv")
+    record_artifact(session, node_version, report_uri, "application/json")
+    return worklist_uri
+
+
+def _primer_ingest(session: Session, node_version: WorkflowNodeVersion) -> str:
+    """SOP 6.2.1: split a multi-sheet primer return workbook into per-sheet plates.
+
+    Sheets are processed in chunks with a checkpoint after each, so a
+    retried activity resumes after the last completed chunk.
+    """
+    params = node_version.params or {}
+    upload_uri = params["upload_uri"]
+    chunk_size = int(params.get("chunk_sheets") or 8)
+    names = primer_ingest.sheet_names(upload_uri)
+    checkpoints = progress.load_checkpoints(session, node_version)
+
+    if 0 in checkpoints:
+        upload_artifact_id = checkpoints[0]["upload_artifact_id"]
+    else:
+        upload = record_artifact(session, node_version, upload_uri, XLSX_CONTENT_TYPE, relation="upload")
+        upload_artifact_id = str(upload.id)
+        progress.save_checkpoint(
+            session, node_version, 0, {"upload_artifact_id": upload_artifact_id}, 0, len(names)
+        )
+
+    sheets: list[dict] = []
+    for chunk_index, start in enumerate(range(0, len(names), chunk_size), start=1):
+        if chunk_index in checkpoints:
+            sheets.extend(checkpoints[chunk_index]["sheets"])
+            continue
+        chunk_sheets = []
+        plates = primer_ingest.read_sheets(upload_uri, names[start : start + chunk_size])
+        for i, plate in enumerate(plates, start=start):
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", plate.name) or "sheet"
+            uri = write_plates(node_version.batch_id, node_version.id, f"primer_{i + 1}_{slug}", [plate])
+            artifact = _record_plates(session, node_version, uri, [plate])
+            chunk_sheets.append(
+                {"sheet": plate.name, "artifact_id": str(artifact.id), "uri": uri, "samples": len(plate)}
+            )
+        sheets.extend(chunk_sheets)
+        progress.save_checkpoint(
+            session, node_version, chunk_index, {"sheets": chunk_sheets}, len(sheets), len(names)
+        )
+
+    manifest = {"upload_artifact_id": upload_artifact_id, "sheets": sheets}
+    manifest_uri = write_artifact(
+        node_version.batch_id, node_version.id, "primer_ingest.json", json.dumps(manifest).encode("utf-8")
+    )
+    record_artifact(session, node_version, manifest_uri, "application/json")
+    return manifest_uri
+
+
+def _wells(mask: np.ndarray) -> list[str]:
+    rows, cols = np.nonzero(mask)
+    return [well_name(r, c) for r, c in zip(rows.tolist(), cols.tolist())]
+
+
+@handlers.register
+class QubitConcentrationHandler(handlers.StepHandler):
+    name = "qubit_concentration"
+    resource_class = handlers.CPU
+    inputs = ("layouts", "readings", "standards")
+    outputs = (PLATES_CONTENT_TYPE, "application/json")
+    memoizable = True
+
+    def run(self, session, node_version, parent_version=None):
+        return _qubit_concentration(session, node_version)
+
+
+@handlers.register
+class BcaNormalizationHandler(handlers.StepHandler):
+    name = "bca_normalization"
+    resource_class = handlers.CPU
+    inputs = ("layouts", "absorbances", "standards")
+    outputs = (PLATES_CONTENT_TYPE, "text/csv", "application/json")
+    memoizable = True
+
+    def run(self, session, node_version, parent_version=None):
+        return _bca_normalization(session, node_version)
+
+
+@handlers.register
+class TransfectionPlanHandler(handlers.StepHandler):
+    name = "transfection_plan"
+    resource_class = handlers.CPU
+    inputs = ("pairs", "plasmid_plates", "chain", "construct")
+    outputs = (PLATES_CONTENT_TYPE, "text/csv", "application/json")
+
+    def run(self, session, node_version, parent_version=None):
+        return _transfection_plan(session, node_version)
+
+
+@handlers.register
+class CherryPickPlanHandler(handlers.StepHandler):
+    name = "cherrypick_plan"
+    resource_class = handlers.CPU
+    inputs = ("source_plates", "picks")
+    outputs = (PLATES_CONTENT_TYPE, "text/csv", "application/json")
+    memoizable = True
+
+    def run(self, session, node_version, parent_version=None):
+        return _cherrypick_plan(session, node_version)
+
+
+@handlers.register
+class PrimerIngestHandler(handlers.StepHandler):
+    name = "primer_ingest"
+    resource_class = handlers.CPU  # openpyxl parsing is pure Python
+    heartbeats = True  # a checkpoint per chunk of sheets
+    inputs = ("upload",)
+    outputs = (XLSX_CONTENT_TYPE, PLATES_CONTENT_TYPE, "application/json")
+    memoizable = True
+
+    def run(self, session, node_version, parent_version=None):
+        return _primer_ingest(session, node_version)
+
+
+class _MockArtifactHandler(handlers.StepHandler):
+    """Legacy template steps: a mock text artifact plus the step's domain rows."""
+
+    outputs = ("text/plain",)
+
+    def run(self, session, node_version, parent_version=None):
+        artifact_uri = _mock_artifact_path(node_version.batch_id, node_version.step_index)
+        record_artifact(session, node_version, artifact_uri)
+        self.produce(session, node_version, parent_version)
+        return artifact_uri
+
+    @abc.abstractmethod
+    def produce(self, session, node_version, parent_version) -> None:
+        """Write the step's domain rows."""
+
+
+@handlers.register
+class ChainHandler(_MockArtifactHandler):
+    """Creates one chain from the ``sequence`` param."""
+
+    name = "chain"
+    inputs = ("sequence",)
+    outputs = ("text/plain", "chain")
+
+    def produce(self, session, node_version, parent_version) -> None:
+        sequence = (node_version.params or {}).get("sequence")
+        chain = Chain(
+            node_version_id=node_version.id,
+            name=f"chain-{node_version.version}",
+            sequence=sequence,
+            sequence_digest=chain_library.sequence_digest(sequence),
+        )
+        session.add(chain)
+        session.flush()
+        sample_index.index_names(session, node_version, [chain.name], "chain")
+        # Every chain made by re-running from a parent version derives from it
+        if parent_version is not None:
+            session.add(
+                LineageEdge(
+                    source_node_version_id=parent_version.id,
+                    target_node_version_id=node_version.id,
+                    relation="derive",
                 )
-                .first()
             )
-            if latest:
-                pending.append(
-                    {"step_index": step_index, "node_version_id": str(latest.id)}
+
+
+@handlers.register
+class ConstructHandler(_MockArtifactHandler):
+    """Combines the batch's chains into one construct."""
+
+    name = "construct"
+    inputs = ("chain",)
+    outputs = ("text/plain", "construct")
+
+    def produce(self, session, node_version, parent_version) -> None:
+        chains = session.execute(queries.BATCH_CHAINS, {"batch_id": node_version.batch_id})
+        construct = Construct(
+            node_version_id=node_version.id,
+            name=f"construct-{node_version.version}",
+        )
+        session.add(construct)
+        session.flush()
+        sample_index.index_names(session, node_version, [construct.name], "construct")
+        for chain in chains:
+            session.add(
+                ConstructChain(construct_id=construct.id, chain_id=chain.id)
+            )
+            session.add(
+                LineageEdge(
+                    source_node_version_id=chain.node_version_id,
+                    target_construct_id=construct.id,
+                    relation="derive",
                 )
-        return pending
+            )
+        session.add(
+            LineageEdge(
+                source_node_version_id=node_version.id,
+                target_construct_id=construct.id,
+                relation="construct",
+            )
+        )
+
+
+@handlers.register
+class ConstructConsumptionHandler(_MockArtifactHandler):
+    """Consumes a construct; records the exact construct used."""
+
+    name = "construct_consumption"
+    inputs = ("construct",)
+
+    def produce(self, session, node_version, parent_version) -> None:
+        if node_version.input_construct_id:
+            construct = session.get(Construct, node_version.input_construct_id)
+            construct_id = construct.id if construct else None
+        else:
+            construct_id = session.scalar(
+                queries.LATEST_BATCH_CONSTRUCT_ID, {"batch_id": node_version.batch_id, "step_index": 2}
+            )
+            if construct_id:
+                node_version.input_construct_id = construct_id
+                session.add(node_version)
+        if construct_id is None:
+            raise ValueError("No construct available for step 3 consumption")
+
+
+@handlers.register
+class NoopHandler(handlers.StepHandler):
+    """Steps without a computation complete without an artifact."""
+
+    name = handlers.DEFAULT_HANDLER
+
+    def run(self, session, node_version, parent_version=None):
+        return None
+
+
+def _profiled(session: Session, node_version: WorkflowNodeVersion):
+    """Profile the handler when its batch has profiling switched on."""
+    settings = get_settings()
+    if settings.profiling_token:
+        batch = session.get(Batch, node_version.batch_id)
+        if batch is not None and batch.profiling:
+            return profiling.profile_current_thread(settings, str(node_version.id))
+    return nullcontext()
 
 
 @activity.defn(name="execute_step")
@@ -80,126 +566,51 @@ def execute_step(
     node_version_id: uuid.UUID | str,
     parent_node_version_id: uuid.UUID | str | None = None,
 ) -> str:
-    """Mock computation for a template step; updates existing node version."""
+    """Run the computation for a template step; updates existing node version.
+
+    The computation is the registered handler named by the ``operation``
+    param, else by the template step, else the legacy handler for
+    ``step_index`` (see :mod:`app.activities.handlers`).
+    """
     artifact_uri: Optional[str] = None
-    if step_index in (1, 2, 3):
-        artifact_uri = _mock_artifact_path(batch_id, step_index)
 
-    with SessionLocal() as session:
+    with metrics.track_step(step_index) as run, SessionLocal() as session:
         node_uuid = uuid.UUID(str(node_version_id))
         node_version = session.get(WorkflowNodeVersion, node_uuid)
         if node_version is None:
             raise ValueError(f"Node version {node_version_id} not found")
-        if node_version.status != "idle":
+        # RUNNING means an earlier attempt failed or timed out mid-step; handlers
+        # resume from checkpoints, and the claim fences off that attempt's writes
+        if node_version.status not in (statuses.IDLE, statuses.RUNNING) or not progress.claim(
+            session, node_version, *progress.run_identity()
+        ):
+            run.outcome = "skipped"
+            session.refresh(node_version)
             return node_version.artifact_uri or ""
 
         parent_version = None
         if parent_node_version_id:
             parent_version = session.get(WorkflowNodeVersion, uuid.UUID(str(parent_node_version_id)))
 
-        node_version.status = "running"
-        session.add(node_version)
-        session.commit()
-
+        handler = handlers.resolve_handler(session, node_version)
+        progress.heartbeat({"handler": handler.name})
+        key = memo.cache_key(session, handler, node_version)
+        cached = memo.lookup(session, key, node_version) if key else None
+        if cached is not None:
+            artifact_uri = memo.reuse(session, cached, node_version)
+            run.outcome = "cached"
+        else:
+            attributes = {"step.index": step_index, "step.handler": handler.name}
+            with tracing.tracer.start_as_current_span("step_handler.run", attributes=attributes):
+                with _profiled(session, node_version):
+                    artifact_uri = handler.run(session, node_version, parent_version)
+            if key:
+                memo.store(session, key, handler, node_version, artifact_uri)
         node_version.status = "completed"
         node_version.artifact_uri = artifact_uri
         session.add(node_version)
-
-        # create artifact and lineage to artifact
-        artifact = None
-        if artifact_uri:
-            artifact = Artifact(
-                node_version_id=node_version.id,
-                uri=artifact_uri,
-                content_type="text/plain",
-            )
-            session.add(artifact)
-            session.flush()
-            session.add(
-                LineageEdge(
-                    source_node_version_id=node_version.id,
-                    target_artifact_id=artifact.id,
-                    relation="artifact",
-                )
-            )
-
-        # Chain production: step_index 1 assumed to create chain
-        if step_index == 1:
-            chain = Chain(
-                node_version_id=node_version.id,
-                name=f"chain-{node_version.version}",
-                sequence=(node_version.params or {}).get("sequence"),
-            )
-            session.add(chain)
-            session.flush()
-            if parent_version and parent_version.params != node_version.params:
-                session.add(
-                    LineageEdge(
-                        source_node_version_id=parent_version.id,
-                        target_node_version_id=node_version.id,
-                        relation="derive",
-                    )
-                )
-
-        # Construct production: step_index 2 combines existing chains
-        if step_index == 2:
-            chains = (
-                session.query(Chain)
-                .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
-                .filter(WorkflowNodeVersion.batch_id == batch_id)
-                .all()
-            )
-            construct = Construct(
-                node_version_id=node_version.id,
-                name=f"construct-{node_version.version}",
-            )
-            session.add(construct)
-            session.flush()
-            for chain in chains:
-                session.add(
-                    ConstructChain(construct_id=construct.id, chain_id=chain.id)
-                )
-                session.add(
-                    LineageEdge(
-                        source_node_version_id=chain.node_version_id,
-                        target_construct_id=construct.id,
-                        relation="derive",
-                    )
-                )
-            session.add(
-                LineageEdge(
-                    source_node_version_id=node_version.id,
-                    target_construct_id=construct.id,
-                    relation="construct",
-                )
-            )
-
-        # Step 3 consumes a construct; record the exact construct used
-        if step_index == 3:
-            if node_version.input_construct_id:
-                construct = session.get(Construct, node_version.input_construct_id)
-            else:
-                construct = (
-                    session.query(Construct)
-                    .join(WorkflowNodeVersion, Construct.node_version_id == WorkflowNodeVersion.id)
-                    .filter(
-                        WorkflowNodeVersion.batch_id == batch_id,
-                        WorkflowNodeVersion.step_index == 2,
-                    )
-                    .order_by(
-                        WorkflowNodeVersion.version.desc(),
-                        WorkflowNodeVersion.created_at.desc(),
-                        Construct.created_at.desc(),
-                        Construct.id.desc(),
-                    )
-                    .first()
-                )
-                if construct:
-                    node_version.input_construct_id = construct.id
-                    session.add(node_version)
-            if construct is None:
-                raise ValueError("No construct available for step 3 consumption")
-
+        progress.clear_checkpoints(session, node_version)
+        progress.fence(session, node_version)
         session.commit()
 
     return artifact_uri or ""
@@ -231,13 +642,14 @@ def create_node_version(
                 )
                 .first()
             )
-        new_version = ((previous.version if previous else 0) + 1)
+        # A re-run keeps the step's configuration: its params select the handler and key the memo cache
         node_version = WorkflowNodeVersion(
             batch_id=batch_id,
-            template_version="v1",
+            template_version=previous.template_version if previous is not None else "v1",
             step_index=step_index,
-            version=new_version,
+            version=versions.allocate_version(session, batch_id, step_index),
             status=statuses.IDLE,
+            params=previous.params if previous is not None else None,
         )
         session.add(node_version)
         session.flush()
@@ -254,33 +666,91 @@ def create_node_version(
         return str(node_version.id)
 
 
+@activity.defn(name="step_outputs_changed")
+def step_outputs_changed(node_version_id: uuid.UUID | str, parent_node_version_id: uuid.UUID | str | None) -> bool:
+    """Whether a re-executed step produced different outputs than its parent version.
+
+    Handlers that write domain rows (chains, constructs) always count as
+    changed, since their effect is not captured by artifact digests.
+    """
+    if not parent_node_version_id:
+        return True
+    with SessionLocal() as session:
+        node_version = session.get(WorkflowNodeVersion, uuid.UUID(str(node_version_id)))
+        if node_version is None:
+            raise ValueError(f"Node version {node_version_id} not found")
+        if not handlers.get_handler(handlers.handler_name_for(session, node_version)).memoizable:
+            return True
+        current = memo.output_digests(session, node_version.id)
+        previous = memo.output_digests(session, uuid.UUID(str(parent_node_version_id)))
+        return current is None or previous is None or current != previous
+
+
+@activity.defn(name="carry_forward_version")
+def carry_forward_version(
+    batch_id: uuid.UUID, step_index: int, parent_node_version_id: uuid.UUID | str
+) -> str | None:
+    """New completed version that references its parent's outputs instead of recomputing.
+
+    Only a completed parent has outputs to carry. For any other parent (an
+    idle params edit, a failed or running version) nothing is created and
+    None is returned, so the caller executes the step instead.
+    """
+    with SessionLocal() as session:
+        parent = session.get(WorkflowNodeVersion, uuid.UUID(str(parent_node_version_id)))
+        if parent is None:
+            raise ValueError(f"Node version {parent_node_version_id} not found")
+        if parent.status != statuses.COMPLETED:
+            return None
+        node_version = WorkflowNodeVersion(
+            batch_id=batch_id,
+            template_version=parent.template_version,
+            step_index=step_index,
+            version=versions.allocate_version(session, batch_id, step_index),
+            status=statuses.COMPLETED,
+            params=parent.params,
+            artifact_uri=parent.artifact_uri,
+            input_construct_id=parent.input_construct_id,
+        )
+        session.add(node_version)
+        session.flush()
+        session.add(
+            LineageEdge(
+                source_node_version_id=parent.id,
+                target_node_version_id=node_version.id,
+                relation=memo.CARRY_RELATION,
+            )
+        )
+        memo.link_outputs(session, parent.id, node_version)
+        session.commit()
+        return str(node_version.id)
+
+
 @activity.defn(name="get_template_step_indices")
+@query_budget.limit(1)
 def get_template_step_indices() -> list[int]:
     with SessionLocal() as session:
-        return [
-            row[0]
-            for row in session.query(WorkflowTemplateStep.step_index)
-            .filter(WorkflowTemplateStep.template_version == "v1")
-            .order_by(WorkflowTemplateStep.step_index)
-            .all()
-        ]
+        return list(session.scalars(queries.TEMPLATE_STEP_INDICES, {"template_version": "v1"}))
 
 
 @activity.defn(name="get_latest_version_for_step")
+@query_budget.limit(1)
 def get_latest_version_for_step(batch_id: uuid.UUID, step_index: int) -> str | None:
     with SessionLocal() as session:
-        latest = (
-            session.query(WorkflowNodeVersion)
-            .filter(
-                WorkflowNodeVersion.batch_id == batch_id,
-                WorkflowNodeVersion.step_index == step_index,
-            )
-            .order_by(
-                WorkflowNodeVersion.version.desc(),
-                WorkflowNodeVersion.created_at.desc(),
-                WorkflowNodeVersion.updated_at.desc(),
-                WorkflowNodeVersion.id.desc(),
-            )
-            .first()
-        )
-        return str(latest.id) if latest else None
+        latest_id = session.scalar(queries.LATEST_VERSION_ID, {"batch_id": batch_id, "step_index": step_index})
+        return str(latest_id) if latest_id else None
+
+
+def _handler_for(session: Session, node_version_id: uuid.UUID | str) -> type[handlers.StepHandler]:
+    node_version = session.get(WorkflowNodeVersion, uuid.UUID(str(node_version_id)))
+    if node_version is None:
+        raise ValueError(f"Node version {node_version_id} not found")
+    return handlers.get_handler(handlers.handler_name_for(session, node_version))
+
+
+@activity.defn(name="get_step_options")
+def get_step_options(node_version_id: uuid.UUID | str) -> dict:
+    """How the workflow should schedule the node version's ``execute_step``."""
+    with SessionLocal() as session:
+        handler = _handler_for(session, node_version_id)
+        return {"resource_class": handler.resource_class, "heartbeats": handler.heartbeats}
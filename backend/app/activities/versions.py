@@ -0,0 +1,48 @@
+"""Atomic allocation of per-step version numbers.
+
+Each (batch, step) has a row in ``step_version_counter``; allocating a
+version is a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``, so
+concurrent parameter edits and rollbacks serialize on that row instead of
+racing on ``max(version) + 1``. The first allocation for a step, and any
+allocation after versions were inserted directly, starts from the highest
+existing version, so counters never hand out a number that is taken.
+"""
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import StepVersionCounter, WorkflowNodeVersion
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+# Two-argument scalar max; SQLite's max() is the aggregate with one argument
+_GREATEST = {"postgresql": func.greatest, "sqlite": func.max}
+
+
+def allocate_version(session: Session, batch_id: uuid.UUID, step_index: int) -> int:
+    """Reserve and return the next version number for a batch step.
+
+    Runs in the caller's transaction; the counter row stays locked until it
+    commits, and a rollback releases the number again.
+    """
+    dialect = session.get_bind().dialect.name
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise NotImplementedError(f"Version allocation is not supported on {dialect!r}")
+    existing = (
+        select(func.coalesce(func.max(WorkflowNodeVersion.version), 0))
+        .where(WorkflowNodeVersion.batch_id == batch_id, WorkflowNodeVersion.step_index == step_index)
+        .scalar_subquery()
+    )
+    counter = StepVersionCounter.__table__
+    statement = (
+        insert(counter)
+        .values(batch_id=batch_id, step_index=step_index, last_version=existing + 1)
+        .on_conflict_do_update(
+            index_elements=[counter.c.batch_id, counter.c.step_index],
+            set_={"last_version": _GREATEST[dialect](counter.c.last_version, existing) + 1},
+        )
+        .returning(counter.c.last_version)
+    )
+    return session.execute(statement).scalar_one()
@@ -1,16 +1,34 @@
+import pathlib
+import tempfile
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
-from app.db.session import get_db
-from app import statuses
+from app.activities.chain_import import ChainImportError, import_chain_library
+from app.activities import lineage_export
+from app.activities.memo import cache_stats
+from app.activities.sample_index import search_samples
+from app.activities import versions
+from app.api.responses import FastJSONResponse
+from app.db import query_budget
+from app.db.pool import pool_stats
+from app.db.session import get_db, get_engine
+from app import profiling, statuses
+from app.core.config import get_settings
 from app.models import Batch, WorkflowTemplateStep, WorkflowNodeVersion, LineageEdge, Artifact, Chain, Construct
 from app.schemas.params import UpdateParamsRequest, WorkflowNodeVersionResponse, RollbackRequest
-from app.schemas.version_list import NodeVersionListResponse, NodeVersionListItem, LineageRef
-from app.schemas.lineage import LineageResponse, LineageEdgeOut, EntityType
-from app.workflows.runner import start_batch_workflow, send_rollback_signal
+from app.schemas.version_list import NodeVersionListResponse, StepProgress
+from app.schemas.lineage import LineageResponse, EntityType
+from app.schemas.chain_reuse import ChainReuseItem, ChainReuseResponse
+from app.schemas.sample_search import PlateHighlight, SampleHit, SampleSearchResponse
+from app.schemas.profiling import BatchProfilingRequest, BatchProfilingResponse
+from app.schemas.translation import TranslateRequest, TranslateResponse, TranslatedSequence
+from app.steps import translation
 
 api_router = APIRouter(prefix="/api")
 
@@ -66,7 +84,9 @@ async def run_batch(batch_id: uuid.UUID, db: Session = Depends(get_db)):
     if batch.status == statuses.RUNNING:
         raise HTTPException(status_code=409, detail="Batch is already running")
 
-    run_id = await start_batch_workflow(batch_id)
+    from app.workflows import runner  # imports temporalio; deferred to the first run
+
+    run_id = await runner.start_batch_workflow(batch_id)
     # Refresh batch status after workflow completion
     db.refresh(batch)
     return {"run_id": run_id, "batch_id": str(batch_id), "status": batch.status}
@@ -95,7 +115,9 @@ async def rollback_batch(
     if template_step is None:
         raise HTTPException(status_code=404, detail="Step index not found in template")
 
-    await send_rollback_signal(batch_id, payload.from_step_index)
+    from app.workflows import runner
+
+    await runner.send_rollback_signal(batch_id, payload.from_step_index)
     return {
         "batch_id": str(batch_id),
         "from_step_index": payload.from_step_index,
@@ -107,6 +129,7 @@ async def rollback_batch(
     "/batches/{batch_id}/steps/{step_index}/versions",
     response_model=NodeVersionListResponse,
 )
+@query_budget.limit(3)
 def list_step_versions(
     batch_id: uuid.UUID,
     step_index: int,
@@ -126,46 +149,241 @@ def list_step_versions(
         .all()
     )
 
-    def lineage_for(node_id: uuid.UUID) -> list[LineageRef]:
-        edges = db.query(LineageEdge).filter(LineageEdge.target_node_version_id == node_id).all()
-        refs: list[LineageRef] = []
-        for edge in edges:
+    # One query for every listed version's incoming edges
+    edges_by_target: dict[uuid.UUID, list[LineageEdge]] = {}
+    if versions:
+        incoming = db.query(LineageEdge).filter(
+            LineageEdge.target_node_version_id.in_([v.id for v in versions])
+        )
+        for edge in incoming:
+            edges_by_target.setdefault(edge.target_node_version_id, []).append(edge)
+
+    def lineage_for(node_id: uuid.UUID) -> list[dict]:
+        refs: list[dict] = []
+        for edge in edges_by_target.get(node_id, []):
             if edge.target_node_version_id:
-                refs.append(
-                    LineageRef(
-                        id=str(edge.id),
-                        relation=edge.relation,
-                        target_type="node",
-                    )
-                )
+                refs.append({"id": str(edge.id), "relation": edge.relation, "target_type": "node"})
             if edge.target_artifact_id:
-                refs.append(
-                    LineageRef(
-                        id=str(edge.id),
-                        relation=edge.relation,
-                        target_type="artifact",
-                    )
-                )
+                refs.append({"id": str(edge.id), "relation": edge.relation, "target_type": "artifact"})
         return refs
 
-    return NodeVersionListResponse(
-        batch_id=str(batch_id),
-        step_index=step_index,
-        versions=[
-            NodeVersionListItem(
-                id=str(v.id),
-                version=v.version,
-                status=v.status,
-                params=v.params,
-                created_at=v.created_at,
-                lineage=lineage_for(v.id),
+    # Trusted rows: skip per-item validation (see app.api.responses)
+    return FastJSONResponse(
+        {
+            "batch_id": str(batch_id),
+            "step_index": step_index,
+            "versions": [
+                {
+                    "id": str(v.id),
+                    "version": v.version,
+                    "status": v.status,
+                    "params": v.params,
+                    "created_at": v.created_at,
+                    "lineage": lineage_for(v.id),
+                    "progress": _progress(v),
+                }
+                for v in versions
+            ],
+        }
+    )
+
+
+def _progress(node_version: WorkflowNodeVersion) -> dict:
+    return {
+        "done": node_version.progress_done,
+        "total": node_version.progress_total,
+        "updated_at": node_version.progress_updated_at,
+    }
+
+
+@api_router.get("/node-versions/{node_version_id}/progress", response_model=StepProgress)
+def get_step_progress(node_version_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Chunk progress reported by a running step; polled by the UI for long ingests."""
+    node_version = db.get(WorkflowNodeVersion, node_version_id)
+    if node_version is None:
+        raise HTTPException(status_code=404, detail="Node version not found")
+    return _progress(node_version)
+
+
+@api_router.get("/chains/reuse", response_model=ChainReuseResponse)
+def get_chain_reuse(
+    min_count: int = Query(2, ge=1),
+    batch_id: uuid.UUID | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Sequences shared by at least ``min_count`` chains, aggregated over the digest index."""
+    chain_count = func.count(Chain.id)
+    query = (
+        db.query(
+            Chain.sequence_digest,
+            chain_count,
+            func.count(func.distinct(WorkflowNodeVersion.batch_id)),
+            func.min(Chain.name),
+        )
+        .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
+        .filter(Chain.sequence_digest.isnot(None))
+    )
+    if batch_id is not None:
+        batch_digests = (
+            db.query(Chain.sequence_digest)
+            .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
+            .filter(WorkflowNodeVersion.batch_id == batch_id)
+        )
+        query = query.filter(Chain.sequence_digest.in_(batch_digests))
+    rows = (
+        query.group_by(Chain.sequence_digest)
+        .having(chain_count >= min_count)
+        .order_by(chain_count.desc(), Chain.sequence_digest)
+        .limit(limit)
+        .all()
+    )
+    return ChainReuseResponse(
+        min_count=min_count,
+        sequences=[
+            ChainReuseItem(
+                sequence_digest=digest,
+                chain_count=count,
+                batch_count=batches,
+                example_name=name,
             )
-            for v in versions
+            for digest, count, batches, name in rows
         ],
     )
 
 
+@api_router.get("/samples/search", response_model=SampleSearchResponse)
+def search_sample_names(
+    q: str = Query(..., min_length=1, max_length=255),
+    batch_id: uuid.UUID | None = None,
+    limit: int = Query(200, ge=1, le=2000),
+    db: Session = Depends(get_db),
+):
+    """Substring search over indexed sample names, grouped per plate for highlighting."""
+    locations = search_samples(db, q, limit=limit, batch_id=batch_id)
+    hits = [
+        SampleHit(
+            batch_id=str(loc.batch_id),
+            node_version_id=str(loc.node_version_id),
+            artifact_id=str(loc.artifact_id) if loc.artifact_id else None,
+            kind=loc.kind,
+            name=loc.name,
+            plate=loc.plate,
+            well=loc.well,
+        )
+        for loc in locations
+    ]
+    plates: dict[tuple, PlateHighlight] = {}
+    for hit in hits:
+        if hit.plate is None or hit.well is None:
+            continue
+        key = (hit.batch_id, hit.artifact_id, hit.plate)
+        if key not in plates:
+            plates[key] = PlateHighlight(
+                batch_id=hit.batch_id, artifact_id=hit.artifact_id, plate=hit.plate, wells=[]
+            )
+        plates[key].wells.append(hit.well)
+    return SampleSearchResponse(query=q, hits=hits, plates=list(plates.values()))
+
+
+@api_router.post("/translate", response_model=TranslateResponse)
+def translate_sequences(payload: TranslateRequest):
+    """Bulk DNA to amino-acid translation in the requested reading frames."""
+    if payload.names is not None and len(payload.names) != len(payload.sequences):
+        raise HTTPException(status_code=400, detail="names must match sequences one to one")
+    frames = list(dict.fromkeys(payload.frames))
+    try:
+        proteins = translation.translate(payload.sequences, frames)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    names = payload.names or [None] * len(payload.sequences)
+    return TranslateResponse(
+        frames=frames,
+        results=[
+            TranslatedSequence(name=name, proteins={frame: proteins[frame][i] for frame in frames})
+            for i, name in enumerate(names)
+        ],
+    )
+
+
+@api_router.get("/step-cache/stats")
+def get_step_cache_stats(db: Session = Depends(get_db)):
+    return cache_stats(db)
+
+
+def require_profiling_token(x_profile_token: str | None = Header(None)) -> None:
+    settings = get_settings()
+    if not settings.profiling_token:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not profiling.token_matches(settings, x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@api_router.put(
+    "/batches/{batch_id}/profiling",
+    response_model=BatchProfilingResponse,
+    dependencies=[Depends(require_profiling_token)],
+)
+def set_batch_profiling(batch_id: uuid.UUID, payload: BatchProfilingRequest, db: Session = Depends(get_db)):
+    """Switch sampling of this batch's step activities on or off."""
+    batch = db.get(Batch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    batch.profiling = payload.enabled
+    db.commit()
+    return BatchProfilingResponse(batch_id=str(batch_id), profiling=batch.profiling)
+
+
+@api_router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_profiling_token)],
+)
+def get_profile(profile_id: str):
+    """Collapsed stacks of a profiled request or node version, for flamegraph.pl or speedscope."""
+    try:
+        path = profiling.profile_path(get_settings(), profile_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid profile id")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(path.read_text(encoding="utf-8"))
+
+
+@api_router.get("/db/pool")
+def get_db_pool_stats():
+    """Connection pool occupancy and checkout wait times for sizing the pool."""
+    return pool_stats(get_engine())
+
+
+@api_router.get("/batches/{batch_id}/lineage/export")
+def export_batch_lineage(
+    batch_id: uuid.UUID,
+    fmt: Literal["ndjson", "arrow"] = Query("ndjson", alias="format"),
+    entity: list[Literal[lineage_export.ENTITIES]] | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Stream every node version, artifact, chain, construct and edge of a batch.
+
+    NDJSON covers all entity types unless ``entity`` narrows them. Arrow
+    streams carry one schema, so they need exactly one ``entity``.
+    """
+    if db.get(Batch, batch_id) is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    entities = list(dict.fromkeys(entity)) if entity else list(lineage_export.ENTITIES)
+    if fmt == "ndjson":
+        return StreamingResponse(
+            lineage_export.ndjson(batch_id, entities), media_type=lineage_export.NDJSON_MEDIA_TYPE
+        )
+    if len(entities) != 1:
+        raise HTTPException(status_code=400, detail="Arrow export takes exactly one entity")
+    return StreamingResponse(
+        lineage_export.arrow(batch_id, entities[0]), media_type=lineage_export.ARROW_MEDIA_TYPE
+    )
+
+
 @api_router.get("/lineage/{entity_type}/{entity_id}", response_model=LineageResponse)
+@query_budget.limit(lambda depth, **_: 1 + 2 * max(depth, 0))
 def get_lineage(
     entity_type: EntityType,
     entity_id: str,
@@ -201,63 +419,85 @@ def get_lineage(
     start_node_id = resolve_node_version_id(entity_type, entity_id)
 
     visited = set()
-    edges_out: list[LineageEdgeOut] = []
-
-    frontier = [(start_node_id, 0)]
-    while frontier:
-        current_id, d = frontier.pop(0)
-        if d >= depth:
-            continue
-        upstream_edges = (
-            db.query(LineageEdge)
-            .filter(LineageEdge.target_node_version_id == current_id)
-            .all()
-        )
-        for edge in upstream_edges:
-            edges_out.append(
-                LineageEdgeOut(
-                    id=str(edge.id),
-                    relation=edge.relation,
-                    source_node_version_id=str(edge.source_node_version_id),
-                    target_type="node_version",
-                    target_id=str(current_id),
-                    depth=d + 1,
-                )
-            )
-            if edge.source_node_version_id not in visited:
-                visited.add(edge.source_node_version_id)
-                frontier.append((edge.source_node_version_id, d + 1))
-
-        # Also follow edges targeting constructs owned by the current node version
+    edges_out: list[dict] = []
+
+    # Breadth-first, one level at a time: two queries per level rather than per node
+    frontier = [start_node_id]
+    d = 0
+    while frontier and d < depth:
+        upstream_by_node: dict[uuid.UUID, list[LineageEdge]] = {}
+        for edge in db.query(LineageEdge).filter(LineageEdge.target_node_version_id.in_(set(frontier))):
+            upstream_by_node.setdefault(edge.target_node_version_id, []).append(edge)
+        construct_edges_by_node: dict[uuid.UUID, list[LineageEdge]] = {}
         construct_edges = (
-            db.query(LineageEdge)
+            db.query(LineageEdge, Construct.node_version_id)
             .join(Construct, LineageEdge.target_construct_id == Construct.id)
-            .filter(Construct.node_version_id == current_id)
-            .all()
+            .filter(Construct.node_version_id.in_(set(frontier)))
         )
-        for edge in construct_edges:
-            edges_out.append(
-                LineageEdgeOut(
-                    id=str(edge.id),
-                    relation=edge.relation,
-                    source_node_version_id=str(edge.source_node_version_id),
-                    target_type="construct",
-                    target_id=str(edge.target_construct_id),
-                    depth=d + 1,
-                )
+        for edge, owner_id in construct_edges:
+            construct_edges_by_node.setdefault(owner_id, []).append(edge)
+
+        next_frontier = []
+        for current_id in frontier:
+            _collect_lineage_level(
+                current_id,
+                d,
+                upstream_by_node.get(current_id, []),
+                construct_edges_by_node.get(current_id, []),
+                visited,
+                edges_out,
+                next_frontier,
             )
-            if edge.source_node_version_id not in visited:
-                visited.add(edge.source_node_version_id)
-                frontier.append((edge.source_node_version_id, d + 1))
-
-    return LineageResponse(
-        entity_type=entity_type,
-        entity_id=entity_id,
-        depth_limit=depth,
-        edges=edges_out,
+        frontier = next_frontier
+        d += 1
+
+    return FastJSONResponse(
+        {"entity_type": entity_type, "entity_id": entity_id, "depth_limit": depth, "edges": edges_out}
     )
 
 
+def _collect_lineage_level(
+    current_id: uuid.UUID,
+    d: int,
+    upstream_edges: list[LineageEdge],
+    construct_edges: list[LineageEdge],
+    visited: set,
+    edges_out: list[dict],
+    frontier: list[uuid.UUID],
+) -> None:
+    """Emit one node's edges at depth ``d + 1`` and queue their unvisited sources."""
+    for edge in upstream_edges:
+        edges_out.append(
+            {
+                "id": str(edge.id),
+                "relation": edge.relation,
+                "source_node_version_id": str(edge.source_node_version_id),
+                "target_type": "node_version",
+                "target_id": str(current_id),
+                "depth": d + 1,
+            }
+        )
+        if edge.source_node_version_id not in visited:
+            visited.add(edge.source_node_version_id)
+            frontier.append(edge.source_node_version_id)
+
+    # Also follow edges targeting constructs owned by the current node version
+    for edge in construct_edges:
+        edges_out.append(
+            {
+                "id": str(edge.id),
+                "relation": edge.relation,
+                "source_node_version_id": str(edge.source_node_version_id),
+                "target_type": "construct",
+                "target_id": str(edge.target_construct_id),
+                "depth": d + 1,
+            }
+        )
+        if edge.source_node_version_id not in visited:
+            visited.add(edge.source_node_version_id)
+            frontier.append(edge.source_node_version_id)
+
+
 @api_router.patch(
     "/batches/{batch_id}/steps/{step_index}/params",
     response_model=WorkflowNodeVersionResponse,
@@ -284,16 +524,7 @@ def update_step_params(
     if template_step is None:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    current_max_version = (
-        db.query(func.max(WorkflowNodeVersion.version))
-        .filter(
-            WorkflowNodeVersion.batch_id == batch_id,
-            WorkflowNodeVersion.step_index == step_index,
-        )
-        .scalar()
-    ) or 0
-
-    new_version = current_max_version + 1
+    new_version = versions.allocate_version(db, batch_id, step_index)
 
     node_version = WorkflowNodeVersion(
         batch_id=batch_id,
@@ -316,3 +547,60 @@ def update_step_params(
         params=node_version.params,
         template_version=node_version.template_version,
     )
+
+
+@api_router.post(
+    "/batches/{batch_id}/chains/import",
+    response_model=WorkflowNodeVersionResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_chains(
+    batch_id: uuid.UUID,
+    request: Request,
+    fmt: Literal["fasta", "xlsx"] = Query("fasta", alias="format"),
+    step_index: int = 1,
+    db: Session = Depends(get_db),
+):
+    """Bulk-load a chain library sent as the raw request body (FASTA or XLSX)."""
+    batch = db.get(Batch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    template_step = (
+        db.query(WorkflowTemplateStep)
+        .filter(
+            WorkflowTemplateStep.template_version == "v1",
+            WorkflowTemplateStep.step_index == step_index,
+        )
+        .first()
+    )
+    if template_step is None:
+        raise HTTPException(status_code=404, detail="Step not found")
+
+    with tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+    upload_path = pathlib.Path(upload.name)
+
+    try:
+        node_version = await run_in_threadpool(
+            import_chain_library, db, batch_id, step_index, upload_path, fmt
+        )
+    except ChainImportError as exc:
+        raise HTTPException(
+            status_code=422, detail={"invalid_records": exc.total, "errors": exc.errors}
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        upload_path.unlink(missing_ok=True)
+
+    return WorkflowNodeVersionResponse(
+        id=str(node_version.id),
+        batch_id=str(batch_id),
+        step_index=step_index,
+        version=node_version.version,
+        status=node_version.status,
+        params=node_version.params,
+        template_version=node_version.template_version,
+    )
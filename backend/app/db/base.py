@@ -16,7 +16,12 @@ try:
     from app.models.chain import Chain  # noqa: F401
     from app.models.construct import Construct  # noqa: F401
     from app.models.construct_chain import ConstructChain  # noqa: F401
+    from app.models.curve_fit import CurveFit  # noqa: F401
     from app.models.lineage_edge import LineageEdge  # noqa: F401
+    from app.models.sample_index import SampleLocation, SampleTrigram  # noqa: F401
+    from app.models.step_checkpoint import StepCheckpoint  # noqa: F401
+    from app.models.step_result_cache import StepResultCache  # noqa: F401
+    from app.models.step_version_counter import StepVersionCounter  # noqa: F401
     from app.models.workflow_node_version import WorkflowNodeVersion  # noqa: F401
     from app.models.workflow_template_step import (  # noqa: F401  # pylint: disable=unused-import
         WorkflowTemplateStep,
@@ -27,6 +32,12 @@ except Exception:  # pragma: no cover - defensive for initial bootstrap
     Chain = None
     Construct = None
     ConstructChain = None
+    CurveFit = None
     LineageEdge = None
+    SampleLocation = None
+    SampleTrigram = None
+    StepCheckpoint = None
+    StepResultCache = None
+    StepVersionCounter = None
     WorkflowNodeVersion = None
     WorkflowTemplateStep = None
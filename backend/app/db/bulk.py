@@ -0,0 +1,31 @@
+import time
+from typing import Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+from app import metrics
+
+
+def bulk_insert(session: Session, table: Table, rows: Sequence[dict]) -> None:
+    """Insert rows inside the session's transaction.
+
+    PostgreSQL streams them through ``COPY ... FROM STDIN``; other dialects
+    fall back to a single executemany. ``COPY`` runs on the psycopg
+    connection, past SQLAlchemy's cursor events, so its rows are counted
+    in the metrics here.
+    """
+    if not rows:
+        return
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        connection.execute(table.insert(), list(rows))
+        return
+    columns = list(rows[0])
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+    started = time.perf_counter()
+    with connection.connection.driver_connection.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row([row[column] for column in columns])
+    metrics.record_bulk_insert(len(rows), time.perf_counter() - started)
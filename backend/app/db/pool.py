@@ -0,0 +1,143 @@
+"""Connection pool configuration and instrumentation.
+
+Size the pool from the snapshot returned by :func:`pool_stats`. If
+checkouts wait, or connections in use sit at ``size + max_overflow``, the
+API or the worker thread pool is larger than the connection pool.
+"""
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.config import Settings
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters shared by an engine's pool and its event hooks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.in_use_peak = 0
+            self.overflow_peak = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def observe_checkout(self, in_use: int, overflow: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use_peak = max(self.in_use_peak, in_use)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_mean": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "in_use_peak": self.in_use_peak,
+                "overflow_peak": self.overflow_peak,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a free connection."""
+
+    def __init__(self, *args, metrics: PoolMetrics | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """``create_engine`` keyword arguments for the configured database."""
+    options: dict[str, Any] = {"future": True}
+    url = settings.database_url
+    if _is_memory_sqlite(url):
+        # One shared connection, otherwise every thread would see its own empty database
+        options.update({"connect_args": {"check_same_thread": False}, "poolclass": StaticPool})
+        return options
+
+    options.update(
+        {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "pool_recycle": settings.db_pool_recycle,
+        }
+    )
+    if url.startswith("sqlite"):
+        connect_args: dict[str, Any] = {"check_same_thread": False}
+        # SQLite has no statement timeout; the closest is how long to wait for a lock
+        if settings.db_statement_timeout_ms is not None:
+            connect_args["timeout"] = settings.db_statement_timeout_ms / 1000
+        options["connect_args"] = connect_args
+    elif settings.db_statement_timeout_ms is not None and url.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def instrument(engine: Engine) -> None:
+    """Record connections in use and overflow at every checkout."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # noqa: ARG001
+        current = engine.pool
+        current.metrics.observe_checkout(current.checkedout(), max(current.overflow(), 0))
+
+
+def pool_stats(engine: Engine) -> dict[str, Any]:
+    """Current pool occupancy plus the checkout counters since start-up."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool.metrics.snapshot(),
+    }
@@ -0,0 +1,118 @@
+"""Count the SQL statements a request or activity executes, and enforce budgets.
+
+:func:`count_queries` counts every statement executed in the current
+context, on any engine. Nested counters all see a statement.
+
+:func:`limit` declares a budget on an endpoint or an activity function.
+``APP_QUERY_BUDGET_MODE`` decides what happens when the budget is exceeded:
+
+- ``log`` (the default): log a warning.
+- ``raise``: raise :class:`QueryBudgetExceeded`. The test suite runs in
+  this mode.
+- ``off``: do nothing.
+
+Budgets are meant to catch N+1 patterns, where the count grows with the
+data instead of staying constant.
+"""
+import contextvars
+import functools
+import inspect
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class QueryCounter:
+    count: int = 0
+    statements: list[str] = field(default_factory=list)
+
+
+_counters: contextvars.ContextVar[tuple[QueryCounter, ...]] = contextvars.ContextVar("query_counters", default=())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    for counter in _counters.get():
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    token = _counters.set((*_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+def check(name: str, counter: QueryCounter, budget: int) -> None:
+    if counter.count <= budget:
+        return
+    mode = get_settings().query_budget_mode
+    if mode == "off":
+        return
+    message = f"{name} executed {counter.count} SQL statements, budget is {budget}"
+    if mode == "raise":
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(f"{message}:\n{statements}")
+    logger.warning(message)
+
+
+def limit(budget: int | Callable[..., int]):
+    """Declare the most statements one call of the decorated function may run.
+
+    ``budget`` is a number, or a function of the call's arguments for work
+    that legitimately scales with a parameter (e.g. one query per level of
+    a ``depth``). Works on sync and async functions; apply it below
+    ``@activity.defn`` and below the FastAPI route decorator.
+    """
+
+    def decorate(func):
+        name = func.__qualname__
+        signature = inspect.signature(func)
+
+        def allowed(args, kwargs) -> int:
+            if not callable(budget):
+                return budget
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return budget(**bound.arguments)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with count_queries() as counter:
+                    result = await func(*args, **kwargs)
+                check(name, counter, allowed(args, kwargs))
+                return result
+
+            async_wrapper.query_budget = budget
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with count_queries() as counter:
+                result = func(*args, **kwargs)
+            check(name, counter, allowed(args, kwargs))
+            return result
+
+        wrapper.query_budget = budget
+        return wrapper
+
+    return decorate
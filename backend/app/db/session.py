@@ -1,23 +1,46 @@
-from sqlalchemy import create_engine
+"""Engine and session factory, created on first use.
+
+Importing this module does not build the engine, so ``import app.main``
+does not load the database driver. The engine is built by the app's
+lifespan startup, by the first session, or by the first access to
+``engine``.
+"""
+from functools import lru_cache
+
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
+from app import metrics  # noqa: F401  registers the statement counters on every engine
 from app.core.config import get_settings
+from app.db.pool import engine_options, instrument
+
+
+@lru_cache
+def get_engine() -> Engine:
+    from sqlalchemy import create_engine
+
+    settings = get_settings()
+    engine = create_engine(settings.database_url, **engine_options(settings))
+    instrument(engine)
+    return engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """A sessionmaker that binds to :func:`get_engine` when the first session is made."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
 
-settings = get_settings()
+SessionLocal = _LazySessionmaker(autoflush=False, autocommit=False, future=True)
 
-engine_kwargs = {"future": True}
-if settings.database_url.startswith("sqlite"):
-    engine_kwargs.update(
-        {
-            "connect_args": {"check_same_thread": False},
-            "poolclass": StaticPool,
-        }
-    )
 
-engine = create_engine(settings.database_url, **engine_kwargs)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db():
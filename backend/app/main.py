@@ -1,13 +1,55 @@
-from fastapi import FastAPI
+import sys
+from contextlib import asynccontextmanager
+from typing import Optional
 
+from fastapi import FastAPI, Response
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app import metrics, profiling, tracing
 from app.api.router import api_router
+from app.core.config import Settings, get_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the engine at startup instead of import; release connections on shutdown."""
+    from app.db.session import get_engine
+
+    settings = app.state.settings
+    tracing.configure(settings, "antibody-api")
+    engine = get_engine()
+    yield
+    # The runner is only imported once a workflow has been started
+    runner = sys.modules.get("app.workflows.runner")
+    if runner is not None:
+        runner.reset_client()
+    engine.dispose()
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or get_settings()
+    app = FastAPI(title="Antibody Pipeline Backend", lifespan=lifespan)
+    app.state.settings = settings
+    # Innermost, so it sees complete route bodies; the profiling http middleware re-chunks them
+    if settings.gzip_minimum_size is not None:
+        app.add_middleware(
+            GZipMiddleware, minimum_size=settings.gzip_minimum_size, compresslevel=settings.gzip_level
+        )
+    app.add_middleware(metrics.MetricsMiddleware)
+    if settings.profiling_token:
+        app.middleware("http")(profiling.http_middleware)
+    tracing.instrument_app(app, settings)
 
-app = FastAPI(title="Antibody Pipeline Backend")
+    @app.get("/health")
+    def healthcheck():
+        return {"status": "ok"}
 
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return Response(metrics.generate_latest(), media_type=metrics.CONTENT_TYPE_LATEST)
 
-@app.get("/health")
-def healthcheck():
-    return {"status": "ok"}
+    app.include_router(api_router)
+    return app
 
 
-app.include_router(api_router)
+app = create_app()
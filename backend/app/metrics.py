@@ -0,0 +1,179 @@
+"""Prometheus metrics for the API, step activities and the database.
+
+Scraped from ``GET /metrics`` on the API. Workers serve the same metrics
+on ``APP_WORKER_METRICS_PORT``. Under ``--mode cpu`` handlers run in child
+processes, whose samples the parent's registry never sees. For those
+workers, and for an API run with several worker processes, start the
+process with ``PROMETHEUS_MULTIPROC_DIR`` pointing at an empty directory:
+every process then writes its samples there, and :func:`registry` serves
+them aggregated.
+
+Every hook is a counter increment or a histogram observation. Route labels
+use the route template, never the raw path, so label cardinality stays
+bounded.
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram  # noqa: F401
+from prometheus_client import generate_latest as _generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency", ["method", "route", "status"]
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per API request",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 1000),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Database time per API request", ["route"]
+)
+DB_QUERIES = Counter("db_queries_total", "Database statements executed")
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Database statement latency")
+STEP_SECONDS = Histogram(
+    "step_activity_duration_seconds",
+    "execute_step activity duration",
+    ["step_index", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+STEP_OUTCOMES = Counter("step_activity_total", "execute_step activity outcomes", ["step_index", "outcome"])
+STEP_ROWS_WRITTEN = Counter("step_rows_written_total", "Rows inserted by step activities", ["step_index"])
+ARTIFACT_BYTES = Counter("artifact_bytes_written_total", "Bytes written to artifact storage")
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def registry() -> CollectorRegistry:
+    """The registry to serve: this process's, or every process's under ``PROMETHEUS_MULTIPROC_DIR``."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)
+    return aggregated
+
+
+def generate_latest() -> bytes:
+    return _generate_latest(registry())
+
+
+@dataclass
+class _DbUsage:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_db: contextvars.ContextVar[Optional[_DbUsage]] = contextvars.ContextVar("request_db", default=None)
+_step_index: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("step_index", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _record_statement(elapsed: float, inserted_rows: int) -> None:
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.observe(elapsed)
+    usage = _request_db.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.seconds += elapsed
+    step_index = _step_index.get()
+    if step_index is not None and inserted_rows > 0:
+        STEP_ROWS_WRITTEN.labels(step_index).inc(inserted_rows)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    is_insert = statement.lstrip()[:6].upper() == "INSERT"
+    _record_statement(elapsed, cursor.rowcount if is_insert else 0)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement; drop its start time
+    if context.connection is not None and context.statement is not None:
+        started = context.connection.info.get("metrics_started")
+        if started:
+            started.pop()
+
+
+class MetricsMiddleware:
+    """Latency and database usage per route template.
+
+    A plain ASGI middleware: it only wraps ``send`` to see the status, so
+    the response body passes through untouched and no task is added per
+    request.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        usage = _DbUsage()
+        token = _request_db.set(usage)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(usage.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(usage.seconds)
+
+
+class StepRun:
+    """Outcome of one tracked step; handlers' callers set ``outcome`` on early exits."""
+
+    def __init__(self) -> None:
+        self.outcome = "completed"
+
+
+@contextmanager
+def track_step(step_index: int) -> Iterator[StepRun]:
+    """Time an execute_step call and attribute inserted rows to its step."""
+    run = StepRun()
+    label = str(step_index)
+    token = _step_index.set(label)
+    started = time.perf_counter()
+    try:
+        yield run
+    except BaseException:
+        run.outcome = "failed"
+        raise
+    finally:
+        _step_index.reset(token)
+        STEP_SECONDS.labels(label, run.outcome).observe(time.perf_counter() - started)
+        STEP_OUTCOMES.labels(label, run.outcome).inc()
+
+
+def record_bulk_insert(rows: int, seconds: float) -> None:
+    """Count an insert made on the raw driver connection, which the cursor events do not see."""
+    _record_statement(seconds, rows)
+
+
+def record_artifact_bytes(size: int) -> None:
+    ARTIFACT_BYTES.inc(size)
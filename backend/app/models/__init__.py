@@ -3,7 +3,12 @@ from app.models.artifact import Artifact
 from app.models.chain import Chain
 from app.models.construct import Construct
 from app.models.construct_chain import ConstructChain
+from app.models.curve_fit import CurveFit
 from app.models.lineage_edge import LineageEdge
+from app.models.sample_index import SampleLocation, SampleTrigram
+from app.models.step_checkpoint import StepCheckpoint
+from app.models.step_result_cache import StepResultCache
+from app.models.step_version_counter import StepVersionCounter
 from app.models.workflow_node_version import WorkflowNodeVersion
 from app.models.workflow_template_step import WorkflowTemplateStep
 
@@ -13,7 +18,13 @@ __all__ = [
     "Chain",
     "Construct",
     "ConstructChain",
+    "CurveFit",
     "LineageEdge",
+    "SampleLocation",
+    "SampleTrigram",
+    "StepCheckpoint",
+    "StepResultCache",
+    "StepVersionCounter",
     "WorkflowTemplateStep",
     "WorkflowNodeVersion",
 ]
@@ -13,10 +13,11 @@ class Chain(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     node_version_id: Mapped[uuid.UUID] = mapped_column(
-        GUID(), ForeignKey("workflow_node_version.id", ondelete="CASCADE"), unique=True, nullable=False
+        GUID(), ForeignKey("workflow_node_version.id", ondelete="CASCADE"), index=True, nullable=False
     )
     name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     sequence: Mapped[str | None] = mapped_column(Text, nullable=True)
+    sequence_digest: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.types import GUID
+
+
+class SampleLocation(Base):
+    """One searchable sample name: a plate well, or a chain/construct row."""
+
+    __tablename__ = "sample_location"
+    __table_args__ = (
+        Index(
+            "ix_sample_location_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    batch_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("batch.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    node_version_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("workflow_node_version.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    artifact_id: Mapped[uuid.UUID | None] = mapped_column(
+        GUID(), ForeignKey("artifact.id", ondelete="CASCADE"), nullable=True
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    plate: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    well: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class SampleTrigram(Base):
+    """Portable trigram postings for databases without ``pg_trgm``."""
+
+    __tablename__ = "sample_trigram"
+
+    trigram: Mapped[str] = mapped_column(String(3), primary_key=True)
+    location_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("sample_location.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.types import GUID
+
+
+class StepCheckpoint(Base):
+    """State of one completed chunk of a step, so a retried activity can resume."""
+
+    __tablename__ = "step_checkpoint"
+    __table_args__ = (
+        UniqueConstraint("node_version_id", "chunk_index", name="uq_step_checkpoint_chunk"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    node_version_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("workflow_node_version.id", ondelete="CASCADE"), nullable=False
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
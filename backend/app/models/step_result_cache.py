@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.types import GUID
+
+
+class StepResultCache(Base):
+    """Completed step output keyed by handler, handler version, params and input digests."""
+
+    __tablename__ = "step_result_cache"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    cache_key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    handler: Mapped[str] = mapped_column(String(64), nullable=False)
+    node_version_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("workflow_node_version.id", ondelete="CASCADE"), nullable=False
+    )
+    artifact_uri: Mapped[str | None] = mapped_column(Text, nullable=True)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_hit_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
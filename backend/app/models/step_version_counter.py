@@ -0,0 +1,19 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.db.types import GUID
+
+
+class StepVersionCounter(Base):
+    """Last version number handed out for a batch step (see ``app.activities.versions``)."""
+
+    __tablename__ = "step_version_counter"
+
+    batch_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("batch.id", ondelete="CASCADE"), primary_key=True
+    )
+    step_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_version: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, JSON, CheckConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, JSON, CheckConstraint, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -14,6 +14,8 @@ class WorkflowNodeVersion(Base):
     __table_args__ = (
         CheckConstraint("step_index >= 1", name="ck_node_version_step_index_positive"),
         CheckConstraint("version >= 1", name="ck_node_version_version_positive"),
+        # Versions are allocated by app.activities.versions.allocate_version
+        UniqueConstraint("batch_id", "step_index", "version", name="uq_node_version_step_version"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
@@ -31,6 +33,13 @@ class WorkflowNodeVersion(Base):
     )
     params: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     artifact_uri: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Items done / total reported by long-running handlers
+    progress_done: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    progress_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    progress_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Activity execution currently running the step (see app.activities.progress.claim)
+    run_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    run_attempt: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,159 @@
+"""On-demand sampling profiler for single requests and step activities.
+
+Profiling is available only when ``APP_PROFILING_TOKEN`` is set. Without
+it, the middleware is not installed and activities never check, so the
+feature has no cost when off.
+
+To profile a request, send the token in the ``X-Profile-Token`` header or
+as ``?profile=<token>``. To profile a batch's activities, enable it through
+``PUT /api/batches/{id}/profiling``.
+
+A background thread samples the interpreter stacks every
+``APP_PROFILING_INTERVAL`` seconds. For a request it samples two kinds of
+thread:
+
+- the event loop thread;
+- any thread currently running the matched route's endpoint. Sync
+  endpoints run in the threadpool.
+
+Concurrent requests to the same endpoint can show up in each other's
+profiles.
+
+Profiles are stored as collapsed stacks under ``APP_PROFILING_DIR``, keyed
+by request ID or node version ID. This is the input format of
+``flamegraph.pl`` and speedscope. ``GET /api/profiles/{id}`` returns a
+stored profile.
+"""
+import hmac
+import pathlib
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from app.core.config import Settings, get_settings
+
+TOKEN_HEADER = "X-Profile-Token"
+TOKEN_PARAM = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}"
+
+
+def _folded_stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Periodically records the stacks of the threads ``include`` selects."""
+
+    def __init__(self, interval: float, include: Callable[[int, object], bool]) -> None:
+        self.interval = interval
+        self.include = include
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own and self.include(thread_id, frame):
+                    self.samples[_folded_stack(frame)] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _runs_code(frame, code) -> bool:
+    while frame is not None:
+        if frame.f_code is code:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def profile_path(settings: Settings, profile_id: str) -> pathlib.Path:
+    if not _PROFILE_ID.match(profile_id):
+        raise ValueError(f"Invalid profile id {profile_id!r}")
+    return pathlib.Path(settings.profiling_dir) / f"{profile_id}.folded"
+
+
+def store(settings: Settings, profile_id: str, sampler: StackSampler) -> pathlib.Path:
+    path = profile_path(settings, profile_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sampler.collapsed(), encoding="utf-8")
+    return path
+
+
+def token_matches(settings: Settings, supplied: Optional[str]) -> bool:
+    return bool(settings.profiling_token and supplied) and hmac.compare_digest(
+        supplied.encode("utf-8"), settings.profiling_token.encode("utf-8")
+    )
+
+
+def _endpoint_code(scope: dict):
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    while hasattr(endpoint, "__wrapped__"):
+        endpoint = endpoint.__wrapped__
+    return getattr(endpoint, "__code__", None)
+
+
+async def http_middleware(request, call_next):
+    """Profile the request when it carries the profiling token; install only when a token is configured."""
+    settings = get_settings()
+    supplied = request.headers.get(TOKEN_HEADER) or request.query_params.get(TOKEN_PARAM)
+    if not token_matches(settings, supplied):
+        return await call_next(request)
+
+    # The request ID names the stored file; anything else gets a fresh ID
+    request_id = request.headers.get("X-Request-ID")
+    profile_id = request_id if request_id and _PROFILE_ID.match(request_id) else uuid.uuid4().hex
+    loop_thread = threading.get_ident()
+    scope = request.scope
+
+    def include(thread_id, frame) -> bool:
+        if thread_id == loop_thread:
+            return True
+        code = _endpoint_code(scope)
+        return code is not None and _runs_code(frame, code)
+
+    sampler = StackSampler(settings.profiling_interval, include).start()
+    try:
+        response = await call_next(request)
+    finally:
+        sampler.stop()
+        store(settings, profile_id, sampler)
+    response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+
+@contextmanager
+def profile_current_thread(settings: Settings, profile_id: str) -> Iterator[StackSampler]:
+    """Sample the calling thread until the block exits, then store the profile."""
+    target = threading.get_ident()
+    sampler = StackSampler(settings.profiling_interval, lambda thread_id, _frame: thread_id == target).start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        store(settings, profile_id, sampler)
@@ -0,0 +1,3 @@
+CPU = "cpu"
+DB = "db"
+RESOURCE_CLASSES = (CPU, DB)
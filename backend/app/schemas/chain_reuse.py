@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ChainReuseItem(BaseModel):
+    sequence_digest: str
+    chain_count: int
+    batch_count: int
+    example_name: Optional[str]
+
+
+class ChainReuseResponse(BaseModel):
+    min_count: int
+    sequences: List[ChainReuseItem]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class BatchProfilingRequest(BaseModel):
+    enabled: bool
+
+
+class BatchProfilingResponse(BaseModel):
+    batch_id: str
+    profiling: bool
@@ -0,0 +1,26 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class SampleHit(BaseModel):
+    batch_id: str
+    node_version_id: str
+    artifact_id: str | None
+    kind: str  # "well", "chain" or "construct"
+    name: str
+    plate: str | None
+    well: str | None
+
+
+class PlateHighlight(BaseModel):
+    batch_id: str
+    artifact_id: str | None
+    plate: str
+    wells: List[str]
+
+
+class SampleSearchResponse(BaseModel):
+    query: str
+    hits: List[SampleHit]
+    plates: List[PlateHighlight]
@@ -0,0 +1,21 @@
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+MAX_SEQUENCES = 200_000
+
+
+class TranslateRequest(BaseModel):
+    sequences: List[str] = Field(..., max_length=MAX_SEQUENCES)
+    names: List[str] | None = None
+    frames: List[int] = Field(default_factory=lambda: [1], min_length=1, max_length=6)
+
+
+class TranslatedSequence(BaseModel):
+    name: str | None
+    proteins: Dict[int, str]
+
+
+class TranslateResponse(BaseModel):
+    frames: List[int]
+    results: List[TranslatedSequence]
@@ -10,6 +10,12 @@ class LineageRef(BaseModel):
     target_type: str  # "node" or "artifact"
 
 
+class StepProgress(BaseModel):
+    done: Optional[int] = None
+    total: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+
 class NodeVersionListItem(BaseModel):
     id: str
     version: int
@@ -17,6 +23,7 @@ class NodeVersionListItem(BaseModel):
     params: dict | None
     created_at: datetime
     lineage: List[LineageRef]
+    progress: StepProgress
 
 
 class NodeVersionListResponse(BaseModel):
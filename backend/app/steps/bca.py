@@ -0,0 +1,170 @@
+"""BCA antibody quantification and normalization (SOP 6.8.1).
+
+Standard curves for all plates are fitted together: the quadratic model is a
+single least-squares solve with one right-hand side per plate, and the 4PL
+model runs Levenberg-Marquardt on a ``(plates, 4)`` parameter array.
+"""
+import hashlib
+from typing import Sequence
+
+import numpy as np
+
+from app.steps.plate import Plate, well_name
+from app.steps.worklist import Transfer
+
+QUADRATIC = "quadratic"
+FOUR_PL = "4pl"
+MODELS = (QUADRATIC, FOUR_PL)
+
+_LM_ITERATIONS = 200
+_EPS = 1e-12
+
+
+def curve_digests(model: str, concentrations: np.ndarray, absorbances: np.ndarray) -> list[str]:
+    """Content digest of each plate's standard series; identical raw data hashes identically."""
+    prefix = hashlib.sha256(model.encode() + np.ascontiguousarray(concentrations, dtype="<f8").tobytes())
+    digests = []
+    for row in np.ascontiguousarray(absorbances, dtype="<f8"):
+        digest = prefix.copy()
+        digest.update(row.tobytes())
+        digests.append(digest.hexdigest())
+    return digests
+
+
+def _fit_quadratic(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    design = np.stack([np.ones_like(x), x, x * x], axis=1)
+    coefficients, *_ = np.linalg.lstsq(design, y.T, rcond=None)
+    return coefficients.T
+
+
+def _four_pl(params: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Evaluate 4PL response and Jacobian; params is (plates, 4) = a, b, c, d."""
+    a, b, c, d = (params[:, i : i + 1] for i in range(4))
+    ratio = np.maximum(x[None, :], 0.0) / c
+    log_ratio = np.log(np.where(ratio > 0, ratio, 1.0))
+    u = np.where(ratio > 0, np.exp(b * log_ratio), 0.0)
+    den = 1.0 + u
+    response = d + (a - d) / den
+    jacobian = np.stack(
+        [
+            1.0 / den,
+            -(a - d) * u * log_ratio / den**2,
+            (a - d) * u * b / (c * den**2),
+            u / den,
+        ],
+        axis=-1,
+    )
+    return response, jacobian
+
+
+def _fit_four_pl(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    plates = y.shape[0]
+    positive = x[x > 0]
+    params = np.column_stack(
+        [
+            y[:, np.argmin(x)],
+            np.ones(plates),
+            np.full(plates, np.median(positive) if positive.size else 1.0),
+            y.max(axis=1) * 1.5,
+        ]
+    )
+    damping = np.full(plates, 1e-3)
+    response, jacobian = _four_pl(params, x)
+    sse = np.sum((y - response) ** 2, axis=1)
+    identity = np.eye(4)
+    for _ in range(_LM_ITERATIONS):
+        jtj = np.einsum("pki,pkj->pij", jacobian, jacobian)
+        jtr = np.einsum("pki,pk->pi", jacobian, y - response)
+        lhs = jtj + damping[:, None, None] * (jtj * identity + _EPS * identity)
+        step = np.linalg.solve(lhs, jtr[..., None])[..., 0]
+        trial = params + step
+        trial[:, 1] = np.maximum(trial[:, 1], _EPS)
+        trial[:, 2] = np.maximum(trial[:, 2], _EPS)
+        trial_response, trial_jacobian = _four_pl(trial, x)
+        trial_sse = np.sum((y - trial_response) ** 2, axis=1)
+        improved = trial_sse < sse
+        params = np.where(improved[:, None], trial, params)
+        response = np.where(improved[:, None], trial_response, response)
+        jacobian = np.where(improved[:, None, None], trial_jacobian, jacobian)
+        sse = np.where(improved, trial_sse, sse)
+        damping = np.where(improved, damping / 3.0, damping * 3.0)
+        if np.all(np.abs(step) <= 1e-10 * (np.abs(params) + 1e-10)):
+            break
+    return params
+
+
+def fit_curves(model: str, concentrations: Sequence[float], absorbances: np.ndarray) -> np.ndarray:
+    """Fit absorbance = f(concentration) for every plate; returns (plates, n_params)."""
+    x = np.asarray(concentrations, dtype=np.float64)
+    y = np.atleast_2d(np.asarray(absorbances, dtype=np.float64))
+    if y.shape[1] != x.size:
+        raise ValueError("Each plate needs one absorbance per standard concentration")
+    if model == QUADRATIC:
+        if x.size < 3:
+            raise ValueError("Quadratic fit needs at least three standards")
+        return _fit_quadratic(x, y)
+    if model == FOUR_PL:
+        if x.size < 4:
+            raise ValueError("4PL fit needs at least four standards")
+        return _fit_four_pl(x, y)
+    raise ValueError(f"Unsupported curve model {model!r}")
+
+
+def invert_curves(model: str, params: np.ndarray, absorbances: np.ndarray) -> np.ndarray:
+    """Concentrations for ``(plates, rows, cols)`` absorbances; NaN where off-curve."""
+    shape = (params.shape[0],) + (1,) * (absorbances.ndim - 1)
+    if model == QUADRATIC:
+        q0, q1, q2 = (params[:, i].reshape(shape) for i in range(3))
+        discriminant = q1 * q1 + 4.0 * q2 * (absorbances - q0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = 2.0 * (absorbances - q0) / (q1 + np.sqrt(discriminant))
+        return np.where(discriminant >= 0, result, np.nan)
+    if model == FOUR_PL:
+        a, b, c, d = (params[:, i].reshape(shape) for i in range(4))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = c * ((a - d) / (absorbances - d) - 1.0) ** (1.0 / b)
+        return np.where(np.isfinite(result), result, np.nan)
+    raise ValueError(f"Unsupported curve model {model!r}")
+
+
+def normalization_volumes(
+    concentrations: np.ndarray, target_concentration: float, final_volume: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sample and diluent volumes to reach the target; third array marks samples too dilute.
+
+    Wells at or below the blank (concentration <= 0) are insufficient and get
+    no volumes, so they are left out of the worklist like off-curve wells.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sample = target_concentration * final_volume / concentrations
+        below_blank = concentrations <= 0
+    insufficient = ~(sample <= final_volume) | below_blank
+    sample = np.where(insufficient, final_volume, sample)
+    sample = np.where(np.isnan(concentrations) | below_blank, np.nan, sample)
+    return sample, final_volume - sample, insufficient & ~np.isnan(concentrations)
+
+
+def normalization_worklist(
+    plates: Sequence[Plate],
+    sample_volumes: np.ndarray,
+    diluent_volumes: np.ndarray,
+    destination_prefix: str = "norm",
+    diluent_label: str = "Buffer",
+) -> list[Transfer]:
+    """Diluent first, then sample, into the same well of a per-plate destination."""
+    transfers: list[Transfer] = []
+    for p, plate in enumerate(plates):
+        destination = f"{destination_prefix}-{p + 1}"
+        rows, cols = np.nonzero(plate.occupied & ~np.isnan(sample_volumes[p]))
+        order = np.lexsort((rows, cols))
+        for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+            well = well_name(r, c)
+            sample = plate.samples[plate.codes[r, c]]
+            if diluent_volumes[p, r, c] > 0:
+                transfers.append(
+                    Transfer(diluent_label, "1", destination, well, float(diluent_volumes[p, r, c]), sample)
+                )
+            transfers.append(
+                Transfer(plate.name, well, destination, well, float(sample_volumes[p, r, c]), sample)
+            )
+    return transfers
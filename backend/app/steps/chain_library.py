@@ -0,0 +1,99 @@
+"""Antibody chain library parsing and validation (SOP 6.1.1 inputs).
+
+Libraries arrive either as FASTA or as the ``id, VH, VL`` workbook, which
+expands to one ``{id}_H`` and one ``{id}_L`` chain per antibody. Records are
+yielded lazily so uploads never need to be held in memory as a whole.
+"""
+import hashlib
+import re
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+
+# IUPAC amino acids (incl. ambiguity codes and stop) also cover A/C/G/T/U/N nucleotides
+_VALID_SEQUENCE = re.compile(r"[ACDEFGHIKLMNPQRSTVWYBJZXUO*]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ChainRecord(NamedTuple):
+    name: str
+    sequence: str
+
+
+def normalize_sequence(sequence: str) -> str:
+    return _WHITESPACE.sub("", sequence).upper()
+
+
+def sequence_digest(sequence: str | None) -> str | None:
+    """SHA-256 of the normalized sequence; identical chains share a digest."""
+    if not sequence:
+        return None
+    normalized = normalize_sequence(sequence)
+    return hashlib.sha256(normalized.encode("ascii", "replace")).hexdigest() if normalized else None
+
+
+def parse_fasta(handle: TextIO) -> Iterator[ChainRecord]:
+    name: str | None = None
+    parts: list[str] = []
+    for line in handle:
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith(">"):
+            if name is not None:
+                yield ChainRecord(name, normalize_sequence("".join(parts)))
+            header = line[1:].split()
+            name, parts = (header[0] if header else ""), []
+            continue
+        parts.append(line)
+    if name is not None:
+        yield ChainRecord(name, normalize_sequence("".join(parts)))
+
+
+def parse_xlsx(path: str) -> Iterator[ChainRecord]:
+    """Read ``id, VH, VL`` (antibody) or ``name, sequence`` (chain) columns from the first sheet."""
+    from openpyxl import load_workbook  # only needed for XLSX uploads
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        if {"id", "VH", "VL"} <= set(header):
+            columns = [header.index(c) for c in ("id", "VH", "VL")]
+            for row in rows:
+                antibody, heavy, light = (row[i] if i < len(row) else None for i in columns)
+                if antibody is None:
+                    continue
+                yield ChainRecord(f"{antibody}_H", normalize_sequence(str(heavy or "")))
+                yield ChainRecord(f"{antibody}_L", normalize_sequence(str(light or "")))
+        elif {"name", "sequence"} <= set(header):
+            name_col, seq_col = header.index("name"), header.index("sequence")
+            for row in rows:
+                if row[name_col] is None:
+                    continue
+                yield ChainRecord(str(row[name_col]).strip(), normalize_sequence(str(row[seq_col] or "")))
+        else:
+            raise ValueError("Workbook header must contain 'id, VH, VL' or 'name, sequence'")
+    finally:
+        workbook.close()
+
+
+def batched(records: Iterable[ChainRecord], size: int) -> Iterator[list[ChainRecord]]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def validate_batch(records: list[ChainRecord], offset: int = 0) -> list[dict]:
+    """Return one error dict per invalid record (positions are 1-based across the upload)."""
+    errors = []
+    for position, record in enumerate(records, start=offset + 1):
+        if not record.name:
+            errors.append({"record": position, "name": record.name, "error": "missing name"})
+        elif not record.sequence:
+            errors.append({"record": position, "name": record.name, "error": "empty sequence"})
+        elif len(record.name) > 255:
+            errors.append({"record": position, "name": record.name[:32], "error": "name too long"})
+        elif not _VALID_SEQUENCE.fullmatch(record.sequence):
+            errors.append({"record": position, "name": record.name, "error": "invalid residues"})
+    return errors
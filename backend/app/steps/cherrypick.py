@@ -0,0 +1,164 @@
+"""Cherry-pick transfer planning (SOP 6.5).
+
+Transfers are ordered for an 8-channel fixed-tip head: one pass aspirates
+from a single source column with at most one tip per row, and tips whose
+destination rows line up with their source rows dispense together. Passes
+are grouped by source plate to avoid labware moves.
+"""
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from app.steps.plate import EMPTY, Plate, well_name
+from app.steps.worklist import Transfer
+
+CHANNELS = 8
+
+
+class RobotTiming(NamedTuple):
+    """Seconds per robot operation used for the time prediction."""
+
+    aspirate: float = 6.0
+    dispense: float = 5.0
+    tip_change: float = 12.0
+    source_swap: float = 20.0
+    destination_swap: float = 10.0
+
+
+class Move(NamedTuple):
+    source_plate: int
+    source_row: int
+    source_col: int
+    destination_plate: int
+    destination_row: int
+    destination_col: int
+    sample: str
+
+
+class CherryPickPlan(NamedTuple):
+    transfers: list[Transfer]
+    passes: list[list[Move]]
+    predicted_seconds: float
+    naive_seconds: float
+    missing: list[str]
+
+
+def assign_destinations(picks: Sequence[str], heavy_suffix: str = "_H") -> list[Plate]:
+    """SOP 6.5.1: heavy clones go to cherry-H, light clones to cherry-L, all on cherry-H if < 96."""
+    if len(picks) < 96:
+        return [Plate.from_column(list(picks), name="cherry-H")]
+    heavy = [p for p in picks if heavy_suffix in p]
+    light = [p for p in picks if heavy_suffix not in p]
+    return [
+        Plate.from_column(names, name=name)
+        for name, names in (("cherry-H", heavy), ("cherry-L", light))
+        if names
+    ]
+
+
+def _moves(sources: Sequence[Plate], destinations: Sequence[Plate]) -> tuple[list[Move], list[str]]:
+    index: dict[str, tuple[int, int, int]] = {}
+    for p, plate in enumerate(sources):
+        rows, cols = np.nonzero(plate.codes != EMPTY)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            index.setdefault(plate.samples[plate.codes[r, c]], (p, r, c))
+    moves = []
+    missing = []
+    for d, plate in enumerate(destinations):
+        rows, cols = np.nonzero(plate.codes != EMPTY)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            sample = plate.samples[plate.codes[r, c]]
+            source = index.get(sample)
+            if source is None:
+                missing.append(sample)
+                continue
+            moves.append(Move(*source, d, r, c, sample))
+    return moves, missing
+
+
+def _dispense_groups(moves: Sequence[Move]) -> int:
+    return len({(m.destination_plate, m.destination_col, m.destination_row - m.source_row) for m in moves})
+
+
+def predict_seconds(passes: Sequence[Sequence[Move]], timing: RobotTiming) -> float:
+    total = 0.0
+    current_source = current_destinations = None
+    for moves in passes:
+        total += timing.tip_change + timing.aspirate + timing.dispense * _dispense_groups(moves)
+        source = moves[0].source_plate
+        destinations = frozenset(m.destination_plate for m in moves)
+        if source != current_source:
+            total += timing.source_swap
+            current_source = source
+        if destinations != current_destinations:
+            total += timing.destination_swap * len(destinations - (current_destinations or frozenset()))
+            current_destinations = destinations
+    return total
+
+
+def optimize(moves: Sequence[Move]) -> list[list[Move]]:
+    """Group moves into channel-compatible passes.
+
+    Within a source column each row gets its own pass queue, so the pass
+    count equals the busiest row (the minimum for fixed tips). Moves are
+    pre-sorted by destination column and row offset so aligned tips land in
+    the same pass and dispense together.
+    """
+    ordered = sorted(
+        moves,
+        key=lambda m: (
+            m.source_plate,
+            m.source_col,
+            m.destination_plate,
+            m.destination_col,
+            m.destination_row - m.source_row,
+            m.source_row,
+        ),
+    )
+    passes: list[list[Move]] = []
+    column_key = None
+    column_passes: list[list[Move]] = []
+    row_fill: dict[int, int] = {}
+    for move in ordered:
+        key = (move.source_plate, move.source_col)
+        if key != column_key:
+            passes.extend(column_passes)
+            column_key, column_passes, row_fill = key, [], {}
+        slot = row_fill.get(move.source_row, 0)
+        while slot < len(column_passes) and len(column_passes[slot]) >= CHANNELS:
+            slot += 1
+        if slot == len(column_passes):
+            column_passes.append([])
+        column_passes[slot].append(move)
+        row_fill[move.source_row] = slot + 1
+    passes.extend(column_passes)
+    return passes
+
+
+def plan_cherry_pick(
+    sources: Sequence[Plate],
+    destinations: Sequence[Plate],
+    volume: float,
+    timing: RobotTiming = RobotTiming(),
+) -> CherryPickPlan:
+    moves, missing = _moves(sources, destinations)
+    passes = optimize(moves)
+    transfers = [
+        Transfer(
+            sources[m.source_plate].name,
+            well_name(m.source_row, m.source_col),
+            destinations[m.destination_plate].name,
+            well_name(m.destination_row, m.destination_col),
+            volume,
+            m.sample,
+        )
+        for moves_in_pass in passes
+        for m in moves_in_pass
+    ]
+    return CherryPickPlan(
+        transfers,
+        passes,
+        predict_seconds(passes, timing),
+        predict_seconds([[m] for m in moves], timing),
+        missing,
+    )
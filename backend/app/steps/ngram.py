@@ -0,0 +1,16 @@
+"""Character trigrams for substring search over sample names.
+
+A name matches a query only if it contains every trigram of the query, so
+the trigram table narrows candidates before the final substring check.
+"""
+
+GRAM = 3
+
+
+def normalize(text: str) -> str:
+    return text.strip().lower()
+
+
+def trigrams(text: str) -> set[str]:
+    value = normalize(text)
+    return {value[i : i + GRAM] for i in range(len(value) - GRAM + 1)}
@@ -0,0 +1,125 @@
+"""Heavy/light plasmid pairing for transfection (SOP 6.7.1).
+
+The Pairs table is joined to the verified plasmid plates through a hash index
+on chain name, so planning is linear in the number of pairs and plasmids.
+"""
+import re
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+from app.steps.plate import EMPTY, Plate, well_name
+from app.steps.worklist import Transfer
+
+_CLONE_SUFFIX = re.compile(r"-\d+$")
+
+
+class Pair(NamedTuple):
+    antibody: str
+    chain_h: str
+    chain_l: str
+
+
+class PlasmidStock(NamedTuple):
+    plate: str
+    well: str
+    concentration: float | None
+
+
+class PairingResult(NamedTuple):
+    matched: list[tuple[Pair, PlasmidStock, PlasmidStock]]
+    missing: list[dict]
+
+
+def chain_key(sample: str) -> str:
+    """Plasmid wells are named ``{chain}-{clone}``; the chain name is the join key."""
+    return _CLONE_SUFFIX.sub("", sample.strip())
+
+
+def index_plasmids(plates: Iterable[Plate]) -> dict[str, PlasmidStock]:
+    """Hash index chain name -> first stock well, preferring wells with a concentration."""
+    index: dict[str, PlasmidStock] = {}
+    for plate in plates:
+        rows, cols = np.nonzero(plate.codes != EMPTY)
+        order = np.lexsort((rows, cols))
+        values = plate.values
+        for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+            key = chain_key(plate.samples[plate.codes[r, c]])
+            conc = None if values is None or np.isnan(values[r, c]) else float(values[r, c])
+            current = index.get(key)
+            if current is None or (current.concentration is None and conc is not None):
+                index[key] = PlasmidStock(plate.name, well_name(r, c), conc)
+    return index
+
+
+def match_pairs(pairs: Iterable[Pair], plasmids: dict[str, PlasmidStock]) -> PairingResult:
+    matched = []
+    missing = []
+    for pair in pairs:
+        heavy = plasmids.get(pair.chain_h)
+        light = plasmids.get(pair.chain_l)
+        if heavy is None or light is None:
+            missing.append(
+                {
+                    "antibody": pair.antibody,
+                    "missing": [
+                        chain
+                        for chain, stock in ((pair.chain_h, heavy), (pair.chain_l, light))
+                        if stock is None
+                    ],
+                }
+            )
+            continue
+        matched.append((pair, heavy, light))
+    return PairingResult(matched, missing)
+
+
+def transfection_plates(antibodies: Sequence[str], prefix: str = "transfection") -> list[Plate]:
+    """Place antibodies column-first on as many 96-well plates as needed."""
+    return [
+        Plate.from_column(antibodies[start : start + 96], name=f"{prefix}-{start // 96 + 1}")
+        for start in range(0, len(antibodies), 96)
+    ]
+
+
+_CELL_QUADRANTS = (
+    (slice(0, 4), slice(0, 6)),
+    (slice(0, 4), slice(6, 12)),
+    (slice(4, 8), slice(0, 6)),
+    (slice(4, 8), slice(6, 12)),
+)
+
+
+def cell_plates(plate: Plate) -> list[Plate]:
+    """Split a 96-well transfection plate into its four 24-well cell-culture plates."""
+    return [
+        Plate(plate.codes[rows, cols], plate.samples, name=f"{plate.name}-cells-{quadrant + 1}")
+        for quadrant, (rows, cols) in enumerate(_CELL_QUADRANTS)
+    ]
+
+
+def _volume(mass_ng: float, stock: PlasmidStock, default_volume: float) -> float:
+    if stock.concentration is None or stock.concentration <= 0:
+        return default_volume
+    return mass_ng / stock.concentration
+
+
+def transfection_worklist(
+    matched: Sequence[tuple[Pair, PlasmidStock, PlasmidStock]],
+    plates: Sequence[Plate],
+    transfection_ng: float,
+    heavy_fraction: float = 0.5,
+    default_volume: float = 1.0,
+) -> list[Transfer]:
+    """Heavy-chain transfers for every well, then light-chain transfers."""
+    destinations = [(plate.name, well) for plate in plates for well in plate.well_names()]
+    heavy_ng = transfection_ng * heavy_fraction
+    light_ng = transfection_ng - heavy_ng
+    heavy = []
+    light = []
+    for (pair, h_stock, l_stock), (dest_plate, dest_well) in zip(matched, destinations):
+        heavy_volume = _volume(heavy_ng, h_stock, default_volume)
+        light_volume = _volume(light_ng, l_stock, default_volume)
+        heavy.append(Transfer(h_stock.plate, h_stock.well, dest_plate, dest_well, heavy_volume, pair.chain_h))
+        light.append(Transfer(l_stock.plate, l_stock.well, dest_plate, dest_well, light_volume, pair.chain_l))
+    return heavy + light
@@ -0,0 +1,359 @@
+"""Array-backed microplate maps shared by the step activities.
+
+A plate stores one int code per well pointing into a vocabulary of sample
+names (``EMPTY`` for unused wells) and an optional float value per well
+(concentration, reading, volume...). All layout transforms operate on the
+code arrays, so they stay vectorized regardless of plate size.
+"""
+import struct
+from typing import Iterable, Sequence
+
+import numpy as np
+
+PLATE_SHAPES: dict[int, tuple[int, int]] = {
+    16: (4, 4),
+    24: (4, 6),
+    96: (8, 12),
+    384: (16, 24),
+}
+ROW_LABELS = "ABCDEFGHIJKLMNOP"
+EMPTY = -1
+
+_ORDERS = {"column": "F", "row": "C"}
+
+_PLATE_MAGIC = b"APL1"
+_PLATESET_MAGIC = b"APS1"
+# magic, rows, cols, flags, name length, vocabulary byte length
+_PLATE_HEADER = struct.Struct("<4sHHBHI")
+_PLATESET_HEADER = struct.Struct("<4sI")
+_LENGTH = struct.Struct("<I")
+_FLAG_VALUES = 0x01
+_FLAG_WIDE_CODES = 0x02
+
+
+def well_name(row: int, col: int) -> str:
+    return f"{ROW_LABELS[row]}{col + 1}"
+
+
+def parse_well(well: str) -> tuple[int, int]:
+    well = well.strip().upper()
+    row = ROW_LABELS.find(well[:1])
+    if row < 0 or not well[1:].isdigit():
+        raise ValueError(f"Invalid well name {well!r}")
+    return row, int(well[1:]) - 1
+
+
+def numpy_order(order: str) -> str:
+    """Translate a well order ("column"/"row") to a NumPy memory order."""
+    try:
+        return _ORDERS[order]
+    except KeyError:
+        raise ValueError(f"Unsupported well order {order!r}") from None
+
+
+def _shape_for(size: int) -> tuple[int, int]:
+    try:
+        return PLATE_SHAPES[size]
+    except KeyError:
+        raise ValueError(f"Unsupported plate size {size}") from None
+
+
+class Plate:
+    """A 16-, 24-, 96- or 384-well plate map (any 2-D geometry of those sizes)."""
+
+    __slots__ = ("name", "samples", "codes", "values", "_index")
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        samples: Sequence[str],
+        values: np.ndarray | None = None,
+        name: str = "",
+    ) -> None:
+        codes = np.asarray(codes, dtype=np.int32)
+        if codes.ndim != 2 or codes.size not in PLATE_SHAPES:
+            raise ValueError(f"Unsupported plate shape {codes.shape}")
+        samples = tuple(samples)
+        if codes.size and (codes.min() < EMPTY or codes.max() >= len(samples)):
+            raise ValueError("Well codes out of range for sample vocabulary")
+        if values is not None:
+            values = np.asarray(values, dtype=np.float64)
+            if values.shape != codes.shape:
+                raise ValueError("Values shape does not match plate shape")
+        self.name = name
+        self.samples = samples
+        self.codes = codes
+        self.values = values
+        self._index: dict[str, int] | None = None
+
+    @classmethod
+    def empty(cls, size: int = 96, name: str = "", with_values: bool = False) -> "Plate":
+        shape = _shape_for(size)
+        values = np.full(shape, np.nan) if with_values else None
+        return cls(np.full(shape, EMPTY, dtype=np.int32), (), values, name)
+
+    @classmethod
+    def from_grid(
+        cls,
+        grid: Sequence[Sequence[str | None]],
+        values: Sequence[Sequence[float | None]] | None = None,
+        name: str = "",
+    ) -> "Plate":
+        """Build a plate from a rows x cols grid of sample names (None/"" = empty)."""
+        index: dict[str, int] = {}
+        codes = np.array(
+            [
+                [index.setdefault(cell, len(index)) if cell else EMPTY for cell in row]
+                for row in grid
+            ],
+            dtype=np.int32,
+        )
+        value_array = None
+        if values is not None:
+            value_array = np.array(
+                [[np.nan if v is None else v for v in row] for row in values],
+                dtype=np.float64,
+            )
+        return cls(codes, tuple(index), value_array, name)
+
+    @classmethod
+    def from_column(
+        cls,
+        names: Sequence[str | None],
+        size: int = 96,
+        order: str = "column",
+        values: Sequence[float | None] | None = None,
+        name: str = "",
+    ) -> "Plate":
+        """Lay a flat sample list (e.g. a 96x1 sheet) out on a plate, column-first by default."""
+        rows, cols = _shape_for(size)
+        if len(names) > size:
+            raise ValueError(f"{len(names)} samples do not fit a {size}-well plate")
+        index: dict[str, int] = {}
+        flat = np.full(size, EMPTY, dtype=np.int32)
+        flat[: len(names)] = [index.setdefault(n, len(index)) if n else EMPTY for n in names]
+        value_array = None
+        if values is not None:
+            flat_values = np.full(size, np.nan)
+            flat_values[: len(values)] = [np.nan if v is None else v for v in values]
+            value_array = flat_values.reshape((rows, cols), order=numpy_order(order))
+        return cls(flat.reshape((rows, cols), order=numpy_order(order)), tuple(index), value_array, name)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def size(self) -> int:
+        return self.codes.size
+
+    @property
+    def occupied(self) -> np.ndarray:
+        return self.codes != EMPTY
+
+    @property
+    def index(self) -> dict[str, int]:
+        if self._index is None:
+            self._index = {sample: i for i, sample in enumerate(self.samples)}
+        return self._index
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.occupied))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Plate):
+            return NotImplemented
+        if self.shape != other.shape or self.name != other.name:
+            return False
+        if self.to_grid() != other.to_grid():
+            return False
+        if (self.values is None) != (other.values is None):
+            return False
+        return self.values is None or bool(np.array_equal(self.values, other.values, equal_nan=True))
+
+    def __repr__(self) -> str:
+        return f"Plate(name={self.name!r}, size={self.size}, occupied={len(self)})"
+
+    def _names(self) -> np.ndarray:
+        lookup = np.array(self.samples + (None,), dtype=object)
+        return lookup[self.codes]
+
+    def to_grid(self) -> list[list[str | None]]:
+        return self._names().tolist()
+
+    def to_column(self, order: str = "column") -> list[str | None]:
+        return self._names().ravel(order=numpy_order(order)).tolist()
+
+    def well_names(self, order: str = "column") -> list[str]:
+        rows, cols = np.indices(self.shape)
+        return [
+            well_name(r, c)
+            for r, c in zip(rows.ravel(order=numpy_order(order)), cols.ravel(order=numpy_order(order)))
+        ]
+
+    def sample_at(self, well: str) -> str | None:
+        row, col = parse_well(well)
+        code = int(self.codes[row, col])
+        return None if code == EMPTY else self.samples[code]
+
+    def value_at(self, well: str) -> float | None:
+        if self.values is None:
+            return None
+        row, col = parse_well(well)
+        value = float(self.values[row, col])
+        return None if np.isnan(value) else value
+
+    def with_values(self, values: np.ndarray) -> "Plate":
+        return Plate(self.codes, self.samples, values, self.name)
+
+    def reshape(self, rows: int, cols: int, order: str = "column") -> "Plate":
+        """Re-flow wells onto a plate of another geometry, preserving well order."""
+        if rows * cols != self.size:
+            raise ValueError(f"Cannot reshape {self.size} wells into {rows}x{cols}")
+        o = numpy_order(order)
+        codes = self.codes.ravel(order=o).reshape((rows, cols), order=o)
+        values = None
+        if self.values is not None:
+            values = self.values.ravel(order=o).reshape((rows, cols), order=o)
+        return Plate(codes, self.samples, values, self.name)
+
+    def transpose(self) -> "Plate":
+        values = None if self.values is None else self.values.T.copy()
+        return Plate(self.codes.T.copy(), self.samples, values, self.name)
+
+    def _combined(self, other: "Plate") -> tuple[tuple[str, ...], np.ndarray]:
+        """Merge vocabularies; return (samples, remap array for other's codes)."""
+        index = dict(self.index)
+        remap = np.array(
+            [index.setdefault(sample, len(index)) for sample in other.samples] + [EMPTY],
+            dtype=np.int32,
+        )
+        return tuple(index), remap
+
+    def stamp(
+        self,
+        source: "Plate",
+        row_offset: int = 0,
+        col_offset: int = 0,
+        row_step: int = 1,
+        col_step: int = 1,
+    ) -> "Plate":
+        """Copy ``source`` onto this plate starting at an offset.
+
+        A step of 2 interleaves wells, which is how four 96-well plates are
+        stamped into the quadrants of a 384-well plate.
+        """
+        rows, cols = source.shape
+        row_stop = row_offset + (rows - 1) * row_step + 1
+        col_stop = col_offset + (cols - 1) * col_step + 1
+        if row_offset < 0 or col_offset < 0 or row_stop > self.shape[0] or col_stop > self.shape[1]:
+            raise ValueError("Stamped plate does not fit the destination")
+        target = (slice(row_offset, row_stop, row_step), slice(col_offset, col_stop, col_step))
+
+        incoming = source.occupied
+        if np.any(self.occupied[target] & incoming):
+            raise ValueError("Stamp would overwrite occupied wells")
+
+        samples, remap = self._combined(source)
+        codes = self.codes.copy()
+        codes[target] = np.where(incoming, remap[source.codes], codes[target])
+        values = self.values
+        if values is not None or source.values is not None:
+            values = np.full(self.shape, np.nan) if values is None else values.copy()
+            if source.values is not None:
+                values[target] = np.where(incoming, source.values, values[target])
+        return Plate(codes, samples, values, self.name)
+
+    def merge(self, other: "Plate") -> "Plate":
+        """Union of two same-shaped plates; conflicting wells raise ValueError."""
+        if other.shape != self.shape:
+            raise ValueError("Cannot merge plates of different shapes")
+        samples, remap = self._combined(other)
+        other_codes = remap[other.codes]
+        both = self.occupied & other.occupied
+        if np.any(self.codes[both] != other_codes[both]):
+            raise ValueError("Plates disagree on occupied wells")
+        codes = np.where(self.occupied, self.codes, other_codes)
+        values = self.values
+        if other.values is not None:
+            values = other.values if values is None else np.where(np.isnan(values), other.values, values)
+        return Plate(codes, samples, values, self.name)
+
+    def lookup(self, sample: str) -> list[str]:
+        return self.lookup_many([sample]).get(sample, [])
+
+    def lookup_many(self, samples: Iterable[str]) -> dict[str, list[str]]:
+        """Map each requested sample to its wells (column order); absent samples are omitted."""
+        wanted = {self.index[s]: s for s in samples if s in self.index}
+        if not wanted:
+            return {}
+        flat = self.codes.ravel(order="F")
+        positions = np.flatnonzero(np.isin(flat, np.fromiter(wanted, dtype=np.int32)))
+        rows, cols = np.unravel_index(positions, self.shape, order="F")
+        hits: dict[str, list[str]] = {}
+        for code, r, c in zip(flat[positions].tolist(), rows.tolist(), cols.tolist()):
+            hits.setdefault(wanted[code], []).append(well_name(r, c))
+        return hits
+
+    def to_bytes(self) -> bytes:
+        name = self.name.encode("utf-8")
+        vocab = "\x00".join(self.samples).encode("utf-8")
+        wide = len(self.samples) >= np.iinfo(np.int16).max
+        flags = (_FLAG_VALUES if self.values is not None else 0) | (_FLAG_WIDE_CODES if wide else 0)
+        header = _PLATE_HEADER.pack(_PLATE_MAGIC, *self.shape, flags, len(name), len(vocab))
+        parts = [header, name, vocab, self.codes.astype("<i4" if wide else "<i2").tobytes()]
+        if self.values is not None:
+            parts.append(self.values.astype("<f8").tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> "Plate":
+        plate, _ = _read_plate(memoryview(data), 0)
+        return plate
+
+
+def _read_plate(buf: memoryview, offset: int) -> tuple[Plate, int]:
+    magic, rows, cols, flags, name_len, vocab_len = _PLATE_HEADER.unpack_from(buf, offset)
+    if magic != _PLATE_MAGIC:
+        raise ValueError("Not a serialized plate")
+    offset += _PLATE_HEADER.size
+    name = bytes(buf[offset : offset + name_len]).decode("utf-8")
+    offset += name_len
+    vocab = bytes(buf[offset : offset + vocab_len]).decode("utf-8")
+    offset += vocab_len
+    samples = tuple(vocab.split("\x00")) if vocab_len else ()
+    count = rows * cols
+    dtype = np.dtype("<i4" if flags & _FLAG_WIDE_CODES else "<i2")
+    codes = np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(rows, cols)
+    offset += count * dtype.itemsize
+    values = None
+    if flags & _FLAG_VALUES:
+        values = np.frombuffer(buf, dtype="<f8", count=count, offset=offset).reshape(rows, cols).copy()
+        offset += count * 8
+    return Plate(codes, samples, values, name), offset
+
+
+def dumps_plates(plates: Sequence[Plate]) -> bytes:
+    """Serialize several plates into one artifact payload."""
+    parts = [_PLATESET_HEADER.pack(_PLATESET_MAGIC, len(plates))]
+    for plate in plates:
+        data = plate.to_bytes()
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def loads_plates(data: bytes | memoryview) -> list[Plate]:
+    buf = memoryview(data)
+    magic, count = _PLATESET_HEADER.unpack_from(buf, 0)
+    if magic != _PLATESET_MAGIC:
+        raise ValueError("Not a serialized plate set")
+    offset = _PLATESET_HEADER.size
+    plates = []
+    for _ in range(count):
+        (length,) = _LENGTH.unpack_from(buf, offset)
+        offset += _LENGTH.size
+        plate, _ = _read_plate(buf[offset : offset + length], 0)
+        plates.append(plate)
+        offset += length
+    return plates
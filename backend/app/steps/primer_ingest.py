@@ -0,0 +1,106 @@
+"""Primer synthesis return-table ingest (SOP 6.2.1).
+
+Each sheet of the vendor workbook holds two 8x12 grids: the sample layout
+and the matching concentrations. Sheets are read in openpyxl's streaming
+read-only mode and the grids are located in a single pass over the rows.
+"""
+from typing import Any, Iterable, Sequence
+
+from openpyxl import load_workbook
+
+from app.steps.plate import PLATE_SHAPES, ROW_LABELS, Plate
+
+_ROWS, _COLS = PLATE_SHAPES[96]
+_HEADER = tuple(range(1, _COLS + 1))
+
+
+def _as_int(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)) and float(value).is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def _header_start(row: Sequence[Any]) -> int | None:
+    """Column index of a ``1..12`` header run, if the row has one."""
+    for start in range(0, len(row) - _COLS + 1):
+        if _as_int(row[start]) == 1 and tuple(_as_int(v) for v in row[start : start + _COLS]) == _HEADER:
+            return start
+    return None
+
+
+def scan_grids(rows: Iterable[Sequence[Any]]) -> list[list[list[Any]]]:
+    """Collect every 8x12 grid (header ``1..12``, row labels ``A..H``) in one pass."""
+    grids: list[list[list[Any]]] = []
+    start: int | None = None
+    current: list[list[Any]] = []
+    for row in rows:
+        row = tuple(row)
+        if start is not None:
+            label = row[start - 1] if start > 0 and len(row) >= start else None
+            expected = ROW_LABELS[len(current)]
+            if isinstance(label, str) and label.strip().upper() == expected:
+                cells = list(row[start : start + _COLS])
+                current.append(cells + [None] * (_COLS - len(cells)))
+                if len(current) == _ROWS:
+                    grids.append(current)
+                    start, current = None, []
+                continue
+            start, current = None, []
+        start = _header_start(row)
+    return grids
+
+
+def _is_numeric_grid(grid: list[list[Any]]) -> bool:
+    cells = [cell for row in grid for cell in row if cell not in (None, "")]
+    return bool(cells) and all(isinstance(cell, (int, float)) for cell in cells)
+
+
+def plate_from_grids(grids: list[list[list[Any]]], name: str) -> Plate:
+    layouts = [g for g in grids if not _is_numeric_grid(g)]
+    concentrations = [g for g in grids if _is_numeric_grid(g)]
+    if len(layouts) != 1 or len(concentrations) != 1:
+        raise ValueError(f"Sheet {name!r} must contain one layout grid and one concentration grid")
+    layout = [[str(cell).strip() if cell not in (None, "") else None for cell in row] for row in layouts[0]]
+    values = [[float(cell) if cell not in (None, "") else None for cell in row] for row in concentrations[0]]
+    return Plate.from_grid(layout, values=values, name=name)
+
+
+def read_sheet(path: str, sheet_name: str) -> Plate:
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        return plate_from_grids(scan_grids(rows), sheet_name)
+    finally:
+        workbook.close()
+
+
+def sheet_names(path: str) -> list[str]:
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def read_sheets(path: str, names: Sequence[str]) -> list[Plate]:
+    """Read the named sheets into layout+concentration plates from one read-only workbook.
+
+    Parsing is pure Python, so threads would not run sheets in parallel, and
+    opening the workbook per sheet re-parses its shared strings each time.
+    """
+    if not names:
+        return []
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return [plate_from_grids(scan_grids(workbook[name].iter_rows(values_only=True)), name) for name in names]
+    finally:
+        workbook.close()
+
+
+def ingest_workbook(path: str) -> list[Plate]:
+    """Read every sheet of the workbook (see :func:`read_sheets`)."""
+    return read_sheets(path, sheet_names(path))
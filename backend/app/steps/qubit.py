@@ -0,0 +1,145 @@
+"""Qubit plasmid quantification (SOP 6.6.1).
+
+Readings for any number of 96-well plates are stacked into one
+``(plates, 8, 12)`` array and converted with a single linear standard curve.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from app.steps.plate import PLATE_SHAPES, Plate, numpy_order, well_name
+
+QC_MISSING = 0x01
+QC_BELOW_RANGE = 0x02
+QC_ABOVE_RANGE = 0x04
+QC_NEGATIVE = 0x08
+QC_EMPTY_WELL_SIGNAL = 0x10
+
+QC_LABELS = {
+    QC_MISSING: "missing_reading",
+    QC_BELOW_RANGE: "below_standard_range",
+    QC_ABOVE_RANGE: "above_standard_range",
+    QC_NEGATIVE: "negative_concentration",
+    QC_EMPTY_WELL_SIGNAL: "signal_in_empty_well",
+}
+
+
+class StandardCurve:
+    """Linear fit ``concentration = slope * reading + intercept``."""
+
+    __slots__ = ("slope", "intercept", "r_squared", "reading_min", "reading_max")
+
+    def __init__(
+        self,
+        slope: float,
+        intercept: float,
+        r_squared: float = 1.0,
+        reading_min: float = -np.inf,
+        reading_max: float = np.inf,
+    ) -> None:
+        self.slope = slope
+        self.intercept = intercept
+        self.r_squared = r_squared
+        self.reading_min = reading_min
+        self.reading_max = reading_max
+
+    def as_dict(self) -> dict:
+        return {
+            "slope": self.slope,
+            "intercept": self.intercept,
+            "r_squared": self.r_squared,
+            "reading_min": None if np.isinf(self.reading_min) else self.reading_min,
+            "reading_max": None if np.isinf(self.reading_max) else self.reading_max,
+        }
+
+
+def fit_standard_curve(
+    concentrations: Sequence[float], readings: Sequence[float]
+) -> StandardCurve:
+    x = np.asarray(readings, dtype=np.float64)
+    y = np.asarray(concentrations, dtype=np.float64)
+    if x.shape != y.shape or x.size < 2:
+        raise ValueError("Standard curve needs at least two paired standards")
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = y - (slope * x + intercept)
+    total = np.sum((y - y.mean()) ** 2)
+    r_squared = 1.0 - float(np.sum(residual**2) / total) if total else 1.0
+    return StandardCurve(float(slope), float(intercept), r_squared, float(x.min()), float(x.max()))
+
+
+def parse_asc(text: str) -> np.ndarray:
+    """Read the first numeric column of a plate-reader ``.asc`` export."""
+    values = []
+    for line in text.splitlines():
+        fields = line.replace(",", "\t").split()
+        if not fields:
+            continue
+        try:
+            values.append(float(fields[0]))
+        except ValueError:
+            continue
+    return np.asarray(values, dtype=np.float64)
+
+
+def stack_readings(readings: Sequence[Sequence[float]], size: int = 96, order: str = "column") -> np.ndarray:
+    """Pad per-plate reading lists to ``size`` and fold them into ``(plates, rows, cols)``."""
+    stacked = np.full((len(readings), size), np.nan)
+    for i, plate_readings in enumerate(readings):
+        values = np.asarray(plate_readings, dtype=np.float64)[:size]
+        stacked[i, : values.size] = values
+    rows, cols = PLATE_SHAPES[size]
+    return stacked.reshape((len(readings), rows, cols), order=numpy_order(order))
+
+
+def compute_concentrations(
+    readings: np.ndarray, curve: StandardCurve, dilution_factor: float = 1.0
+) -> np.ndarray:
+    return (curve.slope * readings + curve.intercept) * dilution_factor
+
+
+def qc_flags(
+    readings: np.ndarray, concentrations: np.ndarray, curve: StandardCurve, occupied: np.ndarray
+) -> np.ndarray:
+    flags = np.zeros(readings.shape, dtype=np.uint8)
+    missing = np.isnan(readings)
+    flags[missing & occupied] |= QC_MISSING
+    flags[(readings < curve.reading_min) & occupied] |= QC_BELOW_RANGE
+    flags[(readings > curve.reading_max) & occupied] |= QC_ABOVE_RANGE
+    flags[(concentrations < 0) & occupied] |= QC_NEGATIVE
+    flags[~missing & ~occupied & (readings > curve.reading_min)] |= QC_EMPTY_WELL_SIGNAL
+    return flags
+
+
+def quantify_plates(
+    layouts: Sequence[Plate],
+    readings: np.ndarray,
+    curve: StandardCurve,
+    dilution_factor: float = 1.0,
+) -> tuple[list[Plate], np.ndarray]:
+    """Return concentration plates (values in ng/ul) and per-well QC flag bits."""
+    if readings.shape[0] != len(layouts) or any(p.shape != readings.shape[1:] for p in layouts):
+        raise ValueError("Readings do not match the plate layouts")
+    occupied = np.stack([plate.occupied for plate in layouts])
+    concentrations = compute_concentrations(readings, curve, dilution_factor)
+    flags = qc_flags(readings, concentrations, curve, occupied)
+    concentrations = np.where(occupied, concentrations, np.nan)
+    plates = [plate.with_values(conc) for plate, conc in zip(layouts, concentrations)]
+    return plates, flags
+
+
+def qc_report(plates: Sequence[Plate], flags: np.ndarray) -> list[dict]:
+    """Summarize non-zero QC flags as ``{plate, well, sample, flags}`` records."""
+    report = []
+    for p, r, c in zip(*np.nonzero(flags)):
+        plate = plates[p]
+        bits = int(flags[p, r, c])
+        code = int(plate.codes[r, c])
+        report.append(
+            {
+                "plate": plate.name,
+                "well": well_name(r, c),
+                "sample": plate.samples[code] if code >= 0 else None,
+                "flags": [label for bit, label in QC_LABELS.items() if bits & bit],
+            }
+        )
+    return report
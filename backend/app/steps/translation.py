@@ -0,0 +1,105 @@
+"""Nucleotide to amino-acid translation (SOP 6.9.3).
+
+Sequences are concatenated into one ``uint8`` buffer of base codes
+(A=0, C=1, G=2, T/U=3, anything else=4). Codon indices are computed for the
+whole buffer at once and translated per codon phase by table lookup; every
+reading frame of every sequence is then a slice of one of those three
+proteins, so no Python code runs per codon. Frames are numbered 1..3 on the
+forward strand and -1..-3 on the reverse complement.
+"""
+from typing import Iterable, Sequence
+
+import numpy as np
+
+FRAMES = (1, 2, 3, -1, -2, -3)
+UNKNOWN_BASE = 4
+# Standard genetic code, codons ordered AAA, AAC, AAG, AAT, ACA, ... (base-4 on ACGT)
+STANDARD_CODE = "KNKNTTTTRSRSIIMIQHQHPPPPRRRRLLLLEDEDAAAAGGGGVVVV*Y*YSSSS*CWCLFLF"
+
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+_BASE_CODES = bytearray([UNKNOWN_BASE]) * 256
+for _base, _code in (("A", 0), ("C", 1), ("G", 2), ("T", 3), ("U", 3)):
+    _BASE_CODES[ord(_base)] = _BASE_CODES[ord(_base.lower())] = _code
+_BASE_CODES = bytes(_BASE_CODES)
+_COMPLEMENT = bytes([3, 2, 1, 0]) + bytes([UNKNOWN_BASE]) * 252
+
+# Codon lookup on base-5 indices (25*b1 + 5*b2 + b3) so unknown bases map straight to "X"
+_CODON_TABLE = bytearray(b"X") * 256
+for _i, _amino in enumerate(STANDARD_CODE):
+    _CODON_TABLE[25 * (_i >> 4) + 5 * ((_i >> 2) & 3) + (_i & 3)] = ord(_amino)
+_CODON_TABLE = bytes(_CODON_TABLE)
+
+
+def encode(sequences: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate sequences into base codes; returns ``(codes, offsets)``.
+
+    ``offsets`` has one more entry than there are sequences, so sequence
+    ``i`` is ``codes[offsets[i]:offsets[i + 1]]``. Whitespace is dropped.
+    """
+    sequences = list(sequences)
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    # "replace" keeps one byte per character, so offsets stay valid
+    raw = "".join(sequences).encode("ascii", "replace")
+    codes = np.frombuffer(raw.translate(_BASE_CODES, _WHITESPACE), dtype=np.uint8)
+    if codes.size != len(raw):
+        whitespace = np.isin(np.frombuffer(raw, dtype=np.uint8), np.frombuffer(_WHITESPACE, dtype=np.uint8))
+        dropped = np.concatenate(([0], np.cumsum(whitespace)))
+        offsets = offsets - dropped[offsets]
+    return codes, offsets
+
+
+def _phase_proteins(codes: np.ndarray) -> list[str]:
+    """Translate the buffer from offsets 0, 1 and 2; one protein string per phase.
+
+    The codon index at every position is computed in one vectorized pass;
+    a phase is every third index, mapped to amino acids by table lookup.
+    """
+    if codes.size < 3:
+        return ["", "", ""]
+    index = codes[:-2] * np.uint8(25)
+    index += codes[1:-1] * np.uint8(5)
+    index += codes[2:]
+    return [
+        index[phase::3].tobytes().translate(_CODON_TABLE).decode("ascii") for phase in range(3)
+    ]
+
+
+def _slice_frame(phases: list[str], starts: np.ndarray, lengths: np.ndarray, shift: int) -> list[str]:
+    # A sequence whose first codon sits at buffer position p occupies a
+    # contiguous run of the phase ``p % 3`` protein starting at ``p // 3``.
+    first = (starts + shift).tolist()
+    counts = (np.maximum(lengths - shift, 0) // 3).tolist()
+    return [
+        phases[p % 3][p // 3 : p // 3 + count] if count else ""
+        for p, count in zip(first, counts)
+    ]
+
+
+def translate(sequences: Sequence[str], frames: Iterable[int] = (1,)) -> dict[int, list[str]]:
+    """Translate every sequence in each requested frame; returns ``{frame: proteins}``."""
+    frames = tuple(frames)
+    invalid = [frame for frame in frames if frame not in FRAMES]
+    if invalid:
+        raise ValueError(f"Unknown reading frames: {invalid}")
+    codes, offsets = encode(sequences)
+    lengths = np.diff(offsets)
+    results: dict[int, list[str]] = {}
+    if any(frame > 0 for frame in frames):
+        forward = _phase_proteins(codes)
+        for frame in (f for f in frames if f > 0):
+            results[frame] = _slice_frame(forward, offsets[:-1], lengths, frame - 1)
+    if any(frame < 0 for frame in frames):
+        # The reverse complement of the concatenation is the concatenation of
+        # reverse complements in reverse order, so one pass covers every sequence.
+        complement = codes[::-1].tobytes().translate(_COMPLEMENT)
+        reverse = _phase_proteins(np.frombuffer(complement, dtype=np.uint8))
+        reverse_starts = codes.size - offsets[1:]
+        for frame in (f for f in frames if f < 0):
+            results[frame] = _slice_frame(reverse, reverse_starts, lengths, -frame - 1)
+    return {frame: results[frame] for frame in frames}
+
+
+def translate_one(sequence: str, frame: int = 1) -> str:
+    return translate([sequence], (frame,))[frame][0]
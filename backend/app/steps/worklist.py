@@ -0,0 +1,39 @@
+"""Liquid-handler worklists shared by the transfer-producing steps."""
+import csv
+import io
+from typing import Iterable, NamedTuple
+
+TECAN_COLUMNS = (
+    "Source_label",
+    "Source_position",
+    "Destination_label",
+    "Destination_position",
+    "Volume",
+)
+
+
+class Transfer(NamedTuple):
+    source_label: str
+    source_position: str
+    destination_label: str
+    destination_position: str
+    volume: float
+    sample: str | None = None
+
+
+def to_tecan_csv(transfers: Iterable[Transfer]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(TECAN_COLUMNS + ("Sample",))
+    for t in transfers:
+        writer.writerow(
+            (
+                t.source_label,
+                t.source_position,
+                t.destination_label,
+                t.destination_position,
+                f"{t.volume:.2f}",
+                t.sample or "",
+            )
+        )
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,100 @@
+"""OpenTelemetry tracing from HTTP request through Temporal activities to SQL.
+
+Disabled unless ``APP_TRACING_EXPORTER`` is set. The options are:
+
+- ``otlp``: send to a collector at ``APP_TRACING_OTLP_ENDPOINT``.
+- ``file``: append one JSON span per line to ``APP_TRACING_FILE``.
+- ``console``: print spans.
+
+When tracing is enabled, FastAPI routes and SQLAlchemy statements get
+spans. The Temporal client also gets ``TracingInterceptor``. The
+interceptor writes the current trace context into workflow and activity
+headers, so a request's trace continues through the workflow run and
+every activity. Workers connect with the same interceptor.
+"""
+import threading
+from typing import Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+
+from app.core.config import Settings
+
+EXPORTERS = ("otlp", "file", "console")
+
+tracer = trace.get_tracer("app")
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def enabled(settings: Settings) -> bool:
+    return settings.tracing_exporter is not None
+
+
+def build_provider(settings: Settings, service_name: str) -> Optional[TracerProvider]:
+    if not enabled(settings):
+        return None
+    if settings.tracing_exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter {settings.tracing_exporter!r}; expected one of {EXPORTERS}")
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if settings.tracing_exporter == "otlp":
+        # Only needed when exporting to a collector
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)))
+    elif settings.tracing_exporter == "file":
+        provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(settings.tracing_file)))
+    else:
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    return provider
+
+
+def configure(settings: Settings, service_name: str) -> None:
+    """Install the global tracer provider and trace the application's engine."""
+    provider = build_provider(settings, service_name)
+    if provider is None:
+        return
+    trace.set_tracer_provider(provider)
+
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    from app.db.session import get_engine
+
+    SQLAlchemyInstrumentor().instrument(engine=get_engine(), tracer_provider=provider)
+
+
+def instrument_app(app, settings: Settings) -> None:
+    if not enabled(settings):
+        return
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="health,metrics")
+
+
+def temporal_interceptors(settings: Settings) -> list:
+    """Client interceptors; workers built from the client inherit them."""
+    if not enabled(settings):
+        return []
+    from temporalio.contrib.opentelemetry import TracingInterceptor
+
+    return [TracingInterceptor()]
@@ -1,9 +1,28 @@
+"""Temporal worker entry point.
+
+``--mode all`` (the default) serves the workflow and every activity on
+``temporal_task_queue``. With ``APP_TEMPORAL_ROUTE_BY_RESOURCE`` enabled the
+workflow routes activities to one queue per resource class, and each is
+served by its own worker process:
+
+    python -m app.workers.batch_worker --mode workflow
+    python -m app.workers.batch_worker --mode cpu   # process pool
+    python -m app.workers.batch_worker --mode db    # thread pool, bookkeeping activities
+
+Without routing only ``--mode all`` serves the queue the workflow uses, so
+the other modes refuse to start.
+"""
+import argparse
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
+from prometheus_client import start_http_server
 from temporalio.client import Client
-from temporalio.worker import Worker
+from temporalio.worker import SharedStateManager, Worker
 
+from app import metrics, resources, tracing
 from app.activities.step_activities import (
     execute_step,
     get_idle_versions,
@@ -11,24 +30,84 @@ from app.activities.step_activities import (
     create_node_version,
     get_template_step_indices,
     get_latest_version_for_step,
+    get_step_options,
+    step_outputs_changed,
+    carry_forward_version,
 )
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 from app.workflows.batch_workflow import BatchWorkflow
 
+MODES = ("all", "workflow", *resources.RESOURCE_CLASSES)
+BOOKKEEPING_ACTIVITIES = [
+    update_batch_status,
+    get_idle_versions,
+    create_node_version,
+    get_template_step_indices,
+    get_latest_version_for_step,
+    get_step_options,
+    step_outputs_changed,
+    carry_forward_version,
+]
+
 
-async def main() -> None:
-    settings = get_settings()
-    client = await Client.connect(settings.temporal_address, namespace=settings.temporal_namespace)
-    activity_executor = ThreadPoolExecutor()
-    worker = Worker(
+def _executor(mode: str, settings: Settings) -> tuple[Executor, int]:
+    if mode == resources.CPU:
+        processes = settings.worker_cpu_processes or os.cpu_count() or 1
+        # spawn, so children open their own database connections
+        return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")), processes
+    return ThreadPoolExecutor(settings.worker_db_threads), settings.worker_db_threads
+
+
+def check_mode(mode: str, settings: Settings) -> None:
+    """Refuse a mode whose queues the workflow would never use, or that leaves its activities unserved."""
+    if mode != "all" and not settings.temporal_route_by_resource:
+        raise ValueError(f"--mode {mode} needs APP_TEMPORAL_ROUTE_BY_RESOURCE; without it use --mode all")
+
+
+def build_worker(client: Client, mode: str, settings: Settings) -> Worker:
+    if mode == "all":
+        return Worker(
+            client,
+            task_queue=settings.temporal_task_queue,
+            workflows=[BatchWorkflow],
+            activities=[execute_step, *BOOKKEEPING_ACTIVITIES],
+            activity_executor=ThreadPoolExecutor(),
+        )
+    if mode == "workflow":
+        return Worker(client, task_queue=settings.temporal_task_queue, workflows=[BatchWorkflow])
+
+    executor, concurrency = _executor(mode, settings)
+    activities = [execute_step]
+    if mode == resources.DB:
+        activities.extend(BOOKKEEPING_ACTIVITIES)
+    shared_state_manager = None
+    if isinstance(executor, ProcessPoolExecutor):
+        shared_state_manager = SharedStateManager.create_from_multiprocessing(multiprocessing.Manager())
+    return Worker(
         client,
-        task_queue=settings.temporal_task_queue,
-        workflows=[BatchWorkflow],
-        activities=[execute_step, update_batch_status, get_idle_versions, create_node_version, get_template_step_indices, get_latest_version_for_step],
-        activity_executor=activity_executor,
+        task_queue=settings.resource_task_queues()[mode],
+        activities=activities,
+        activity_executor=executor,
+        max_concurrent_activities=concurrency,
+        shared_state_manager=shared_state_manager,
+    )
+
+
+async def main(mode: str = "all") -> None:
+    settings = get_settings()
+    check_mode(mode, settings)
+    if settings.worker_metrics_port:
+        start_http_server(settings.worker_metrics_port, registry=metrics.registry())
+    tracing.configure(settings, f"antibody-worker-{mode}")
+    client = await Client.connect(
+        settings.temporal_address,
+        namespace=settings.temporal_namespace,
+        interceptors=tracing.temporal_interceptors(settings),
     )
-    await worker.run()
+    await build_worker(client, mode, settings).run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run a batch workflow worker.")
+    parser.add_argument("--mode", choices=MODES, default="all")
+    asyncio.run(main(parser.parse_args().mode))
@@ -3,24 +3,68 @@ from datetime import timedelta
 
 from temporalio import workflow
 
-from app import statuses
+from app import resources, statuses
+
+# Long steps (e.g. large workbook ingests) heartbeat per chunk; a silent
+# worker is detected by the heartbeat timeout and the retry resumes from
+# the step's last checkpoint. Handlers that never heartbeat get no
+# heartbeat timeout, only the start-to-close one.
+STEP_TIMEOUT = timedelta(hours=2)
+STEP_HEARTBEAT_TIMEOUT = timedelta(minutes=2)
 
 
 @workflow.defn(name="batch_workflow")
 class BatchWorkflow:
     def __init__(self) -> None:
         self.rollback_from: int | None = None
+        self.task_queues: dict[str, str] = {}
+
+    def _queue(self, resource_class: str) -> str | None:
+        """Task queue for a resource class; None keeps the workflow's own queue."""
+        return self.task_queues.get(resource_class)
+
+    async def _execute_step(self, args: list) -> None:
+        """Run ``execute_step`` with ``args``; (batch, step index, node version[, parent])."""
+        if not workflow.patched("step-options"):
+            # Histories from before resource routing and heartbeats
+            await workflow.execute_activity(
+                "execute_step",
+                args=args,
+                schedule_to_close_timeout=timedelta(seconds=30),
+            )
+            return
+        options = await workflow.execute_activity(
+            "get_step_options",
+            args=[args[2]],
+            task_queue=self._queue(resources.DB),
+            schedule_to_close_timeout=timedelta(seconds=30),
+        )
+        await workflow.execute_activity(
+            "execute_step",
+            args=args,
+            task_queue=self._queue(options["resource_class"]),
+            start_to_close_timeout=STEP_TIMEOUT,
+            heartbeat_timeout=STEP_HEARTBEAT_TIMEOUT if options["heartbeats"] else None,
+        )
 
     @workflow.signal
     async def rollback(self, from_step_index: int) -> None:
         self.rollback_from = from_step_index
 
     @workflow.run
-    async def run(self, batch_id: str, wait_for_signal: bool = False) -> str:
+    async def run(
+        self,
+        batch_id: str,
+        wait_for_signal: bool = False,
+        task_queues: dict[str, str] | None = None,
+    ) -> str:
+        """``task_queues`` maps resource class (cpu/db) to an activity task queue."""
         batch_uuid = uuid.UUID(batch_id)
+        self.task_queues = dict(task_queues or {})
         await workflow.execute_activity(
             "update_batch_status",
             args=[batch_uuid, statuses.RUNNING],
+            task_queue=self._queue(resources.DB),
             schedule_to_close_timeout=timedelta(seconds=30),
         )
 
@@ -33,45 +77,69 @@ class BatchWorkflow:
             idle_versions = await workflow.execute_activity(
                 "get_idle_versions",
                 args=[batch_uuid],
+                task_queue=self._queue(resources.DB),
                 schedule_to_close_timeout=timedelta(seconds=30),
             )
             for item in idle_versions:
                 step_index = item["step_index"]
                 node_version_id = item["node_version_id"]
-                await workflow.execute_activity(
-                    "execute_step",
-                    args=[batch_uuid, step_index, node_version_id],
-                    schedule_to_close_timeout=timedelta(seconds=30),
-                )
+                await self._execute_step([batch_uuid, step_index, node_version_id])
         else:
             # Rollback path: create new versions from rollback_from to end and execute
             template_steps = await workflow.execute_activity(
                 "get_template_step_indices",
                 args=[],
+                task_queue=self._queue(resources.DB),
                 schedule_to_close_timeout=timedelta(seconds=30),
             )
+            # Incremental rollback: once a re-executed step reproduces its parent's
+            # outputs, downstream steps are carried forward instead of recomputed.
+            # Handlers do not declare which earlier steps they read, so a step is
+            # only carried forward when no step re-executed before it changed.
+            incremental = workflow.patched("incremental-rollback")
+            changed_steps: set[int] = set()
+            dirty = True
             for step_index in template_steps:
                 if step_index < self.rollback_from:
                     continue
                 parent_id = await workflow.execute_activity(
                     "get_latest_version_for_step",
                     args=[batch_uuid, step_index],
+                    task_queue=self._queue(resources.DB),
                     schedule_to_close_timeout=timedelta(seconds=30),
                 )
+                if incremental and not dirty and parent_id is not None:
+                    # None when the latest version is not completed; the step runs instead
+                    carried_id = await workflow.execute_activity(
+                        "carry_forward_version",
+                        args=[batch_uuid, step_index, parent_id],
+                        task_queue=self._queue(resources.DB),
+                        schedule_to_close_timeout=timedelta(seconds=30),
+                    )
+                    if carried_id is not None:
+                        continue
                 node_version_id = await workflow.execute_activity(
                     "create_node_version",
                     args=[batch_uuid, step_index, parent_id, "rollback"],
+                    task_queue=self._queue(resources.DB),
                     schedule_to_close_timeout=timedelta(seconds=30),
                 )
-                await workflow.execute_activity(
-                    "execute_step",
-                    args=[batch_uuid, step_index, node_version_id, parent_id],
-                    schedule_to_close_timeout=timedelta(seconds=30),
-                )
+                await self._execute_step([batch_uuid, step_index, node_version_id, parent_id])
+                if incremental:
+                    step_changed = await workflow.execute_activity(
+                        "step_outputs_changed",
+                        args=[node_version_id, parent_id],
+                        task_queue=self._queue(resources.DB),
+                        schedule_to_close_timeout=timedelta(seconds=30),
+                    )
+                    if step_changed:
+                        changed_steps.add(step_index)
+                    dirty = bool(changed_steps)
 
         await workflow.execute_activity(
             "update_batch_status",
             args=[batch_uuid, statuses.COMPLETED],
+            task_queue=self._queue(resources.DB),
             schedule_to_close_timeout=timedelta(seconds=30),
         )
 
@@ -3,12 +3,15 @@ from typing import Optional
 
 from temporalio.client import Client
 
+from app import tracing
 from app.core.config import get_settings
 from app.workflows.batch_workflow import BatchWorkflow
 
 settings = get_settings()
 
 _client_override: Optional[Client] = None
+# Connected on first use and reused; the API's lifespan drops it on shutdown
+_client: Optional[Client] = None
 
 
 def set_client_override(client: Optional[Client]) -> None:
@@ -17,25 +20,48 @@ def set_client_override(client: Optional[Client]) -> None:
 
 
 async def get_temporal_client() -> Client:
+    global _client
     if _client_override is not None:
         return _client_override
-    return await Client.connect(settings.temporal_address, namespace=settings.temporal_namespace)
+    if _client is None:
+        _client = await Client.connect(
+            settings.temporal_address,
+            namespace=settings.temporal_namespace,
+            interceptors=tracing.temporal_interceptors(settings),
+        )
+    return _client
+
+
+def reset_client() -> None:
+    global _client
+    _client = None
+
+
+def _task_queues() -> dict[str, str] | None:
+    return settings.resource_task_queues() if settings.temporal_route_by_resource else None
 
 
 async def start_batch_workflow(batch_id: uuid.UUID, wait_for_result: bool = True) -> str:
-    client = await get_temporal_client()
-    handle = await client.start_workflow(
-        BatchWorkflow.run,
-        id=f"batch-workflow-{batch_id}",
-        task_queue=settings.temporal_task_queue,
-        args=[str(batch_id), False],
-    )
-    if wait_for_result:
-        await handle.result()
-    return handle.id
+    with tracing.tracer.start_as_current_span("start_batch_workflow", attributes={"batch.id": str(batch_id)}):
+        client = await get_temporal_client()
+        handle = await client.start_workflow(
+            BatchWorkflow.run,
+            id=f"batch-workflow-{batch_id}",
+            task_queue=settings.temporal_task_queue,
+            args=[str(batch_id), False, _task_queues()],
+        )
+        if wait_for_result:
+            await handle.result()
+        return handle.id
 
 
 async def send_rollback_signal(batch_id: uuid.UUID, from_step_index: int) -> str:
+    attributes = {"batch.id": str(batch_id), "rollback.from_step_index": from_step_index}
+    with tracing.tracer.start_as_current_span("send_rollback_signal", attributes=attributes):
+        return await _send_rollback_signal(batch_id, from_step_index)
+
+
+async def _send_rollback_signal(batch_id: uuid.UUID, from_step_index: int) -> str:
     client = await get_temporal_client()
     workflow_id = f"batch-workflow-{batch_id}"
     handle = client.get_workflow_handle(workflow_id)
@@ -48,7 +74,7 @@ async def send_rollback_signal(batch_id: uuid.UUID, from_step_index: int) -> str
             BatchWorkflow.run,
             id=workflow_id,
             task_queue=settings.temporal_task_queue,
-            args=[str(batch_id), True],
+            args=[str(batch_id), True, _task_queues()],
         )
         await handle.signal("rollback", from_step_index)
         return handle.id
@@ -0,0 +1,179 @@
+"""CPU time of the hot bookkeeping queries, rebuilt ORM queries vs. precompiled statements.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_activity_queries --iterations 2000
+
+Uses an in-memory SQLite database, so the numbers are dominated by Python
+time (statement construction, compilation lookup and ORM loading), which is
+what the precompiled statements in ``app.activities.queries`` remove.
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import statuses
+from app.activities import queries
+from app.db.base import Base
+from app.models import Batch, Chain, WorkflowNodeVersion, WorkflowTemplateStep
+
+
+def _seed(session: Session, versions: int, chains: int) -> uuid.UUID:
+    session.add_all(
+        WorkflowTemplateStep(template_version="v1", step_index=i, name=f"Step {i}") for i in (1, 2, 3)
+    )
+    batch = Batch(name="Benchmark")
+    session.add(batch)
+    session.flush()
+    for step_index in (1, 2, 3):
+        session.add_all(
+            WorkflowNodeVersion(
+                batch_id=batch.id,
+                template_version="v1",
+                step_index=step_index,
+                version=version,
+                status=statuses.IDLE if version % 2 else statuses.COMPLETED,
+            )
+            for version in range(1, versions + 1)
+        )
+    session.flush()
+    node_version_id = session.query(WorkflowNodeVersion.id).filter_by(step_index=1).limit(1).scalar()
+    session.add_all(
+        Chain(node_version_id=node_version_id, name=f"chain-{i}", sequence="QVQL", sequence_digest=f"{i % 50:064d}")
+        for i in range(chains)
+    )
+    session.commit()
+    return batch.id
+
+
+def _newest_first():
+    return (
+        WorkflowNodeVersion.version.desc(),
+        WorkflowNodeVersion.created_at.desc(),
+        WorkflowNodeVersion.updated_at.desc(),
+        WorkflowNodeVersion.id.desc(),
+    )
+
+
+def _orm_latest(session, batch_id):
+    latest = (
+        session.query(WorkflowNodeVersion)
+        .filter(WorkflowNodeVersion.batch_id == batch_id, WorkflowNodeVersion.step_index == 2)
+        .order_by(*_newest_first())
+        .first()
+    )
+    return latest.id
+
+
+def _orm_indices(session):
+    return [
+        row[0]
+        for row in session.query(WorkflowTemplateStep.step_index)
+        .filter(WorkflowTemplateStep.template_version == "v1")
+        .order_by(WorkflowTemplateStep.step_index)
+        .all()
+    ]
+
+
+def _orm_idle(session, batch_id):
+    pending = []
+    for step_index in _orm_indices(session):
+        latest = (
+            session.query(WorkflowNodeVersion)
+            .filter(
+                WorkflowNodeVersion.batch_id == batch_id,
+                WorkflowNodeVersion.step_index == step_index,
+                WorkflowNodeVersion.status == statuses.IDLE,
+            )
+            .order_by(*_newest_first())
+            .first()
+        )
+        if latest:
+            pending.append((step_index, latest.id))
+    return pending
+
+
+def _orm_chains(session, batch_id):
+    return (
+        session.query(Chain)
+        .join(WorkflowNodeVersion, Chain.node_version_id == WorkflowNodeVersion.id)
+        .filter(WorkflowNodeVersion.batch_id == batch_id)
+        .order_by(Chain.created_at, Chain.id)
+        .all()
+    )
+
+
+def _compiled_latest(session, batch_id):
+    return session.scalar(queries.LATEST_VERSION_ID, {"batch_id": batch_id, "step_index": 2})
+
+
+def _compiled_indices(session):
+    return list(session.scalars(queries.TEMPLATE_STEP_INDICES, {"template_version": "v1"}))
+
+
+def _compiled_idle(session, batch_id):
+    pending = {}
+    for step_index, node_version_id in session.execute(
+        queries.IDLE_VERSIONS_BY_STEP, {"batch_id": batch_id, "template_version": "v1"}
+    ):
+        pending.setdefault(step_index, node_version_id)
+    return list(pending.items())
+
+
+def _compiled_chains(session, batch_id):
+    return session.execute(queries.BATCH_CHAINS, {"batch_id": batch_id}).all()
+
+
+def _ids(result):
+    if isinstance(result, list):
+        return [getattr(item, "id", item) for item in result]
+    return result
+
+
+def _cpu_per_call(engine, call, iterations: int) -> float:
+    # A fresh session per call, like an activity
+    start = time.process_time()
+    for _ in range(iterations):
+        with Session(engine) as session:
+            call(session)
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--versions", type=int, default=20)
+    parser.add_argument("--chains", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        batch_id = _seed(session, args.versions, args.chains)
+
+    cases = [
+        ("latest version for step", lambda s: _orm_latest(s, batch_id), lambda s: _compiled_latest(s, batch_id)),
+        ("template step indices", _orm_indices, _compiled_indices),
+        ("idle versions per step", lambda s: _orm_idle(s, batch_id), lambda s: _compiled_idle(s, batch_id)),
+        ("chains per batch", lambda s: _orm_chains(s, batch_id), lambda s: _compiled_chains(s, batch_id)),
+    ]
+    print(f"{args.iterations} calls each; CPU microseconds per call")
+    print(f"{'query':<26} {'orm':>10} {'compiled':>10} {'saved':>8}")
+    for label, orm_call, compiled_call in cases:
+        with Session(engine) as session:
+            # Same answers, and both paths warmed before timing
+            orm_result, compiled_result = orm_call(session), compiled_call(session)
+            assert _ids(orm_result) == _ids(compiled_result), f"{label}: results differ"
+        orm = _cpu_per_call(engine, orm_call, args.iterations)
+        compiled = _cpu_per_call(engine, compiled_call, args.iterations)
+        print(f"{label:<26} {orm * 1e6:10.1f} {compiled * 1e6:10.1f} {1 - compiled / orm:8.0%}")
+
+
+if __name__ == "__main__":
+    main()
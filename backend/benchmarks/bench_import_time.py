@@ -0,0 +1,72 @@
+"""Cold import time of the API, from ``python -X importtime``.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_import_time --runs 5
+
+Imports ``app.main`` in fresh interpreters and reports the fastest total,
+the slowest modules by cumulative time, and the heavy modules that should
+only load on first use. It exits non-zero if the total exceeds ``--budget``
+or if a deferred module was imported, so the budget can be checked in CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Kept out of ``import app.main``; each is loaded by the code path that needs it
+DEFERRED_MODULES = ("temporalio", "openpyxl", "psycopg")
+BUDGET_SECONDS = 1.5
+
+
+def _import_profile(module: str) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        timings[name] = (int(self_us), int(cumulative_us))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return timings, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="seconds")
+    args = parser.parse_args()
+
+    runs = [_import_profile(args.module) for _ in range(args.runs)]
+    timings, loaded = min(runs, key=lambda run: run[0][args.module][1])
+    total = timings[args.module][1] / 1e6
+
+    print(f"import {args.module}: {total:.3f} s (best of {args.runs}, budget {args.budget:.3f} s)")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, (self_us, cumulative_us) in sorted(timings.items(), key=lambda item: -item[1][1])[: args.top]:
+        print(f"{cumulative_us / 1e3:14.1f} {self_us / 1e3:8.1f}  {name}")
+
+    failures = []
+    if total > args.budget:
+        failures.append(f"import took {total:.3f} s, budget is {args.budget:.3f} s")
+    if loaded:
+        failures.append(f"deferred modules imported eagerly: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
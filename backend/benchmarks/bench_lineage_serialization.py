@@ -0,0 +1,88 @@
+"""Serialization cost of a large lineage response, validated models vs. the fast path.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_lineage_serialization --edges 50000
+
+The "models" column reproduces the old route. It builds validated
+``LineageEdgeOut`` objects, then runs FastAPI's ``serialize_response`` and
+``JSONResponse``. The "fast" column is ``FastJSONResponse`` over plain
+dicts (see ``app.api.responses``). The database is not involved: both
+sides start from the same edge dicts. Also reports the gzip ratio and
+cost at ``APP_GZIP_LEVEL``, the level GZipMiddleware uses.
+"""
+import argparse
+import asyncio
+import gzip
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.responses import FastJSONResponse
+from app.core.config import get_settings
+from app.schemas.lineage import LineageEdgeOut, LineageResponse
+
+
+def _edges(count: int) -> list[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "relation": "derived_from",
+            "source_node_version_id": str(uuid.uuid4()),
+            "target_type": "node_version",
+            "target_id": str(uuid.uuid4()),
+            "depth": i % 5 + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def _best_of(call, runs: int) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = call()
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    edges = _edges(args.edges)
+    field = create_model_field(name="response", type_=LineageResponse, mode="serialization")
+
+    def models() -> bytes:
+        response = LineageResponse(
+            entity_type="node_version",
+            entity_id="x",
+            depth_limit=5,
+            edges=[LineageEdgeOut(**edge) for edge in edges],
+        )
+        content = asyncio.run(serialize_response(field=field, response_content=response, is_coroutine=False))
+        return JSONResponse(content).body
+
+    def fast() -> bytes:
+        payload = {"entity_type": "node_version", "entity_id": "x", "depth_limit": 5, "edges": [dict(e) for e in edges]}
+        return FastJSONResponse(payload).body
+
+    models_seconds, models_body = _best_of(models, args.runs)
+    fast_seconds, fast_body = _best_of(fast, args.runs)
+    assert LineageResponse.model_validate_json(fast_body) == LineageResponse.model_validate_json(models_body)
+    level = get_settings().gzip_level
+    gzip_seconds, compressed = _best_of(lambda: gzip.compress(fast_body, compresslevel=level), args.runs)
+
+    print(f"{args.edges} edges, best of {args.runs}")
+    print(f"models  {models_seconds * 1e3:8.1f} ms")
+    print(f"fast    {fast_seconds * 1e3:8.1f} ms  ({models_seconds / fast_seconds:.1f}x)")
+    print(f"gzip -{level} {gzip_seconds * 1e3:8.1f} ms  {len(fast_body) / 1e6:.1f} MB -> {len(compressed) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Primer workbook ingest: one workbook per sheet on threads vs. one shared workbook.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_primer_ingest --sheets 24
+
+Writes a synthetic return workbook (full 96-well layout and concentration
+grids per sheet), then times reading every sheet two ways. The "threads"
+column is the previous implementation: each sheet on a thread with its
+own ``load_workbook`` call. The "shared" column is
+:func:`app.steps.primer_ingest.read_sheets`: one read-only workbook, sheets
+read in order. Both produce the same plates.
+"""
+import argparse
+import pathlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openpyxl import Workbook
+
+from app.steps import primer_ingest
+from app.steps.plate import ROW_LABELS
+
+
+def _write_grid(sheet, top: int, cell) -> None:
+    for col in range(12):
+        sheet.cell(row=top, column=col + 2, value=col + 1)
+    for r, label in enumerate(ROW_LABELS[:8]):
+        sheet.cell(row=top + r + 1, column=1, value=label)
+        for col in range(12):
+            sheet.cell(row=top + r + 1, column=col + 2, value=cell(r, col))
+
+
+def _workbook(path: pathlib.Path, sheets: int) -> None:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for s in range(sheets):
+        sheet = workbook.create_sheet(f"Order {s + 1}")
+        _write_grid(sheet, 2, lambda r, c: f"S{s}-P{c * 8 + r}")  # noqa: B023
+        _write_grid(sheet, 13, lambda r, c: 50.0 + c * 8 + r)
+    workbook.save(path)
+
+
+def _threads(path: str, names: list[str]) -> list:
+    with ThreadPoolExecutor(max_workers=min(len(names), 8)) as executor:
+        return list(executor.map(lambda name: primer_ingest.read_sheet(path, name), names))
+
+
+def _best_of(call, runs: int) -> tuple[float, list]:
+    best, result = float("inf"), []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sheets", type=int, default=24)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "primers.xlsx"
+        _workbook(path, args.sheets)
+        names = primer_ingest.sheet_names(str(path))
+        threads, threaded_plates = _best_of(lambda: _threads(str(path), names), args.runs)
+        shared, shared_plates = _best_of(lambda: primer_ingest.read_sheets(str(path), names), args.runs)
+    assert threaded_plates == shared_plates
+
+    print(f"{args.sheets} sheets, best of {args.runs}")
+    print(f"threads {threads * 1e3:8.1f} ms")
+    print(f"shared  {shared * 1e3:8.1f} ms  ({threads / shared:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Translation throughput on synthetic antibody-length sequences.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_translation --count 100000
+
+Compares the vectorized translator against a per-codon dictionary loop
+(on a sample, since the loop is far slower) and checks they agree.
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from app.steps import translation
+
+_CODON_TABLE = {
+    "".join(codon): amino
+    for codon, amino in zip(itertools.product("ACGT", repeat=3), translation.STANDARD_CODE)
+}
+
+
+def _random_sequences(count: int, min_length: int, max_length: int, seed: int) -> list[str]:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(min_length, max_length + 1, size=count)
+    bases = np.frombuffer(b"ACGT", dtype=np.uint8)[rng.integers(0, 4, size=int(lengths.sum()))]
+    text = bases.tobytes().decode("ascii")
+    bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+    return [text[bounds[i] : bounds[i + 1]] for i in range(count)]
+
+
+def _naive(sequence: str) -> str:
+    return "".join(_CODON_TABLE.get(sequence[i : i + 3], "X") for i in range(0, len(sequence) - 2, 3))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--min-length", type=int, default=330)
+    parser.add_argument("--max-length", type=int, default=1400)
+    parser.add_argument("--baseline-sample", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sequences = _random_sequences(args.count, args.min_length, args.max_length, args.seed)
+    bases = sum(map(len, sequences))
+
+    start = time.perf_counter()
+    forward = translation.translate(sequences, (1,))[1]
+    one_frame = time.perf_counter() - start
+
+    start = time.perf_counter()
+    translation.translate(sequences, translation.FRAMES)
+    six_frames = time.perf_counter() - start
+
+    sample = sequences[: args.baseline_sample]
+    start = time.perf_counter()
+    expected = [_naive(sequence) for sequence in sample]
+    naive = (time.perf_counter() - start) * len(sequences) / max(len(sample), 1)
+    assert forward[: len(sample)] == expected, "vectorized and per-codon translations differ"
+
+    print(f"{len(sequences)} sequences, {bases / 1e6:.1f} Mbases")
+    print(f"vectorized, frame 1:   {one_frame:8.3f} s  ({bases / one_frame / 1e6:.1f} Mbases/s)")
+    print(f"vectorized, 6 frames:  {six_frames:8.3f} s")
+    print(f"per-codon loop (est.): {naive:8.3f} s  ({naive / one_frame:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
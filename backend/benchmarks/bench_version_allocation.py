@@ -0,0 +1,108 @@
+"""Step version allocation throughput: ``max(version) + 1`` vs. the counter row.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_version_allocation --workers 8 --edits 50
+
+Each edit is one transaction that allocates a version for the same batch
+step, inserts the node version and commits, the way ``update_step_params``
+does. Runs against a file-backed SQLite database (or ``--database-url``)
+so every thread has its own connection and the transactions contend.
+
+The "max + 1" row is the previous allocation. Under the unique constraint
+on (batch, step, version) concurrent edits collide, and the benchmark
+retries them; the retries are reported next to the throughput. The
+"counter" row is :func:`app.activities.versions.allocate_version`.
+"""
+import argparse
+import pathlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import statuses
+from app.activities.versions import allocate_version
+from app.db.base import Base
+from app.models import Batch, WorkflowNodeVersion
+
+
+def _max_plus_one(session, batch_id, step_index: int) -> int:
+    latest = session.scalar(
+        select(func.coalesce(func.max(WorkflowNodeVersion.version), 0)).where(
+            WorkflowNodeVersion.batch_id == batch_id, WorkflowNodeVersion.step_index == step_index
+        )
+    )
+    return latest + 1
+
+
+def _run(Session, allocate, workers: int, edits: int) -> tuple[float, int]:
+    with Session() as session:
+        batch = Batch(name="Allocation Benchmark")
+        session.add(batch)
+        session.commit()
+        batch_id = batch.id
+
+    def edit(_worker: int) -> int:
+        retries = 0
+        for _ in range(edits):
+            while True:
+                with Session() as session:
+                    try:
+                        version = allocate(session, batch_id, 1)
+                        session.add(
+                            WorkflowNodeVersion(
+                                batch_id=batch_id,
+                                template_version="v1",
+                                step_index=1,
+                                version=version,
+                                status=statuses.IDLE,
+                            )
+                        )
+                        session.commit()
+                        break
+                    except (IntegrityError, OperationalError):
+                        session.rollback()
+                        retries += 1
+        return retries
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        retries = sum(executor.map(edit, range(workers)))
+    elapsed = time.perf_counter() - start
+
+    with Session() as session:
+        versions = session.scalars(
+            select(WorkflowNodeVersion.version).where(WorkflowNodeVersion.batch_id == batch_id)
+        ).all()
+    assert sorted(versions) == list(range(1, workers * edits + 1))
+    return workers * edits / elapsed, retries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=50, help="edits per worker")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+pysqlite:///{pathlib.Path(tmp) / 'versions.db'}"
+        connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+        engine = create_engine(url, connect_args=connect_args)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{args.workers} workers x {args.edits} edits on {engine.dialect.name}")
+        for label, allocate in (("max + 1", _max_plus_one), ("counter", allocate_version)):
+            for workers in (1, args.workers):
+                rate, retries = _run(Session, allocate, workers, args.edits)
+                print(f"{label:8} {workers:3} workers {rate:9.0f} allocations/s  {retries:6} retries")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
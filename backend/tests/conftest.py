@@ -1,6 +1,7 @@
 import os
 import pathlib
 import sys
+from contextlib import contextmanager
 from typing import Generator
 
 import pytest
@@ -12,8 +13,11 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Ensure tests run against an isolated SQLite database
 os.environ.setdefault("APP_DATABASE_URL", "sqlite+pysqlite:///:memory:")
+# Endpoints and activities that exceed their declared query budget fail the test
+os.environ.setdefault("APP_QUERY_BUDGET_MODE", "raise")
 
 from app.db.base import Base  # noqa: E402  pylint: disable=wrong-import-position
+from app.db.query_budget import count_queries  # noqa: E402  pylint: disable=wrong-import-position
 from app.db.session import SessionLocal, engine  # noqa: E402  pylint: disable=wrong-import-position
 from app.models.workflow_template_step import (  # noqa: E402  pylint: disable=wrong-import-position
     WorkflowTemplateStep,
@@ -41,6 +45,21 @@ def db_session() -> Generator[Session, None, None]:
         db.close()
 
 
+@pytest.fixture()
+def query_budget():
+    """``with query_budget(n): ...`` fails the test if the block runs more than ``n`` statements."""
+
+    @contextmanager
+    def assert_within(budget: int):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= budget, (
+            f"{counter.count} SQL statements, budget is {budget}:\n" + "\n".join(counter.statements)
+        )
+
+    return assert_within
+
+
 def _seed_template_steps() -> None:
     session = SessionLocal()
     try:
@@ -0,0 +1,61 @@
+from app import statuses
+from app.activities.step_activities import (
+    execute_step,
+    get_idle_versions,
+    get_latest_version_for_step,
+    get_template_step_indices,
+)
+from app.models import Batch, ConstructChain, WorkflowNodeVersion
+
+
+def _version(batch_id, step_index: int, version: int, status: str = statuses.IDLE, **params):
+    return WorkflowNodeVersion(
+        batch_id=batch_id,
+        template_version="v1",
+        step_index=step_index,
+        version=version,
+        status=status,
+        params=params or None,
+    )
+
+
+def test_bookkeeping_queries(db_session):
+    batch = Batch(name="Query Batch")
+    db_session.add(batch)
+    db_session.commit()
+    s1v1 = _version(batch.id, 1, 1, statuses.COMPLETED)
+    s1v2 = _version(batch.id, 1, 2)
+    s2v1 = _version(batch.id, 2, 1)
+    s2v2 = _version(batch.id, 2, 2, statuses.COMPLETED)
+    outside_template = _version(batch.id, 9, 1)
+    db_session.add_all([s1v1, s1v2, s2v1, s2v2, outside_template])
+    db_session.commit()
+
+    assert get_template_step_indices() == [1, 2, 3]
+    assert get_latest_version_for_step(batch.id, 2) == str(s2v2.id)
+    assert get_latest_version_for_step(batch.id, 3) is None
+    assert get_idle_versions(batch.id) == [
+        {"step_index": 1, "node_version_id": str(s1v2.id)},
+        {"step_index": 2, "node_version_id": str(s2v1.id)},
+    ]
+
+
+def test_construct_steps_use_batch_chains(db_session):
+    batch = Batch(name="Query Batch")
+    db_session.add(batch)
+    db_session.commit()
+    chain_v1 = _version(batch.id, 1, 1, sequence="QVQL")
+    chain_v2 = _version(batch.id, 1, 2, sequence="qvql")
+    construct_step = _version(batch.id, 2, 1)
+    consumption = _version(batch.id, 3, 1)
+    db_session.add_all([chain_v1, chain_v2, construct_step, consumption])
+    db_session.commit()
+
+    for nv in (chain_v1, chain_v2, construct_step, consumption):
+        execute_step(batch.id, nv.step_index, nv.id)
+
+    db_session.expire_all()
+    # One ConstructChain per batch chain, even when sequences match
+    assert db_session.query(ConstructChain).count() == 2
+    assert consumption.input_construct_id is not None
+    assert consumption.status == statuses.COMPLETED
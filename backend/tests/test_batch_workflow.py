@@ -5,7 +5,7 @@ from concurrent.futures import ThreadPoolExecutor
 from temporalio.testing import WorkflowEnvironment
 from temporalio.worker import Worker
 
-from app.activities.step_activities import execute_step, get_idle_versions, update_batch_status
+from app.activities.step_activities import execute_step, get_idle_versions, get_step_options, update_batch_status
 from app.core.config import get_settings
 from app.main import app
 from app import statuses
@@ -39,7 +39,7 @@ async def test_run_endpoint_triggers_workflow(db_session):
                 env.client,
                 task_queue=settings.temporal_task_queue,
                 workflows=[BatchWorkflow],
-                activities=[execute_step, update_batch_status, get_idle_versions],
+                activities=[execute_step, update_batch_status, get_idle_versions, get_step_options],
                 activity_executor=executor,
             )
 
@@ -12,7 +12,7 @@ from app.main import app
 from app import statuses
 from app.models import Batch, WorkflowNodeVersion
 from app.workflows.batch_workflow import BatchWorkflow
-from app.activities.step_activities import execute_step, update_batch_status, get_idle_versions
+from app.activities.step_activities import execute_step, update_batch_status, get_idle_versions, get_step_options
 from app.workflows.runner import set_client_override
 
 
@@ -30,6 +30,7 @@ async def test_run_executes_only_latest_idle_versions(db_session):
         batch_id=batch.id,
         template_version="v1",
         step_index=1,
+        version=1,
         status=statuses.COMPLETED,
         artifact_uri="/tmp/old.txt",
     )
@@ -41,6 +42,7 @@ async def test_run_executes_only_latest_idle_versions(db_session):
         batch_id=batch.id,
         template_version="v1",
         step_index=2,
+        version=1,
         status=statuses.IDLE,
         created_at=now - timedelta(seconds=5),
         updated_at=now - timedelta(seconds=5),
@@ -52,6 +54,7 @@ async def test_run_executes_only_latest_idle_versions(db_session):
         batch_id=batch.id,
         template_version="v1",
         step_index=2,
+        version=2,
         status=statuses.IDLE,
         created_at=now,
         updated_at=now,
@@ -63,6 +66,7 @@ async def test_run_executes_only_latest_idle_versions(db_session):
         batch_id=batch.id,
         template_version="v1",
         step_index=3,
+        version=1,
         status=statuses.IDLE,
     )
     db_session.add(idle_three)
@@ -88,7 +92,7 @@ async def test_run_executes_only_latest_idle_versions(db_session):
                 env.client,
                 task_queue=settings.temporal_task_queue,
                 workflows=[BatchWorkflow],
-                activities=[execute_step, update_batch_status, get_idle_versions],
+                activities=[execute_step, update_batch_status, get_idle_versions, get_step_options],
                 activity_executor=executor,
             )
             async with worker:
@@ -0,0 +1,148 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import statuses
+from app.activities.artifacts import read_plates
+from app.activities import step_activities
+from app.activities.step_activities import execute_step
+from app.models import Artifact, Batch, CurveFit, WorkflowNodeVersion
+from app.steps import bca
+from app.steps.plate import Plate
+
+STANDARD_CONCENTRATIONS = [0.0, 125.0, 250.0, 500.0, 750.0, 1000.0, 1500.0, 2000.0]
+
+
+def _four_pl(params, x):
+    a, b, c, d = params
+    return d + (a - d) / (1 + (np.asarray(x) / c) ** b)
+
+
+def test_fit_curves_batched_for_both_models():
+    truth = np.array([[0.1, 1.2, 800.0, 2.5], [0.12, 1.0, 600.0, 3.0]])
+    absorbances = np.array([_four_pl(p, STANDARD_CONCENTRATIONS) for p in truth])
+
+    fitted = bca.fit_curves(bca.FOUR_PL, STANDARD_CONCENTRATIONS, absorbances)
+    assert fitted.shape == (2, 4)
+    assert np.allclose(fitted, truth, rtol=1e-4)
+    recovered = bca.invert_curves(bca.FOUR_PL, fitted, absorbances[:, 2:5].reshape(2, 3, 1))
+    assert np.allclose(recovered.reshape(2, 3), [[250.0, 500.0, 750.0]] * 2, rtol=1e-4)
+
+    quadratic = np.array([[0.1, 2e-3, -3e-7], [0.2, 1.5e-3, -2e-7]])
+    x = np.asarray(STANDARD_CONCENTRATIONS)
+    absorbances = np.array([q0 + q1 * x + q2 * x * x for q0, q1, q2 in quadratic])
+    fitted = bca.fit_curves(bca.QUADRATIC, STANDARD_CONCENTRATIONS, absorbances)
+    assert np.allclose(fitted, quadratic)
+    recovered = bca.invert_curves(bca.QUADRATIC, fitted, absorbances[:, 3:4].reshape(2, 1, 1))
+    assert np.allclose(recovered.ravel(), [500.0, 500.0])
+
+    with pytest.raises(ValueError):
+        bca.fit_curves("cubic", STANDARD_CONCENTRATIONS, absorbances)
+
+
+def test_normalization_volumes_flags_dilute_samples():
+    conc = np.array([[[1000.0], [100.0], [np.nan]]])
+    sample, diluent, insufficient = bca.normalization_volumes(conc, 200.0, 100.0)
+    assert sample[0, 0, 0] == pytest.approx(20.0)
+    assert diluent[0, 0, 0] == pytest.approx(80.0)
+    assert sample[0, 1, 0] == 100.0 and insufficient[0, 1, 0]
+    assert np.isnan(sample[0, 2, 0]) and not insufficient[0, 2, 0]
+
+
+def test_below_blank_wells_are_insufficient_and_left_out_of_the_worklist():
+    plate = Plate.from_column(["Ab1", "Ab2", "Ab3"], values=[1000.0, -40.0, 0.0], name="purified")
+    sample, diluent, insufficient = bca.normalization_volumes(plate.values[np.newaxis], 200.0, 100.0)
+    assert insufficient[0, :3, 0].tolist() == [False, True, True]
+    assert np.isnan(sample[0, 1:3, 0]).all() and np.isnan(diluent[0, 1:3, 0]).all()
+
+    transfers = bca.normalization_worklist([plate], sample, diluent)
+    assert {t.sample for t in transfers} == {"Ab1"}
+    assert all(0 < t.volume <= 100.0 for t in transfers)
+
+
+def _bca_version(batch_id, version):
+    x = np.asarray(STANDARD_CONCENTRATIONS)
+    standards = (0.1 + 2e-3 * x - 3e-7 * x * x).tolist()
+    return WorkflowNodeVersion(
+        batch_id=batch_id,
+        template_version="v1",
+        step_index=3,
+        version=version,
+        status=statuses.IDLE,
+        params={
+            "operation": "bca_normalization",
+            "model": "quadratic",
+            "layouts": [{"name": "purified", "samples": ["Ab1", "Ab2"]}],
+            "standards": {"concentrations": STANDARD_CONCENTRATIONS, "absorbances": [standards]},
+            "absorbances": [[standards[5], standards[2]]],
+            "target_concentration": 250.0,
+            "final_volume": 100.0,
+        },
+    )
+
+
+def test_execute_step_reuses_cached_curve_fits(db_session):
+    batch = Batch(name="BCA Batch")
+    db_session.add(batch)
+    db_session.commit()
+
+    first, second = _bca_version(batch.id, 1), _bca_version(batch.id, 2)
+    # Identical params would be a step-result cache hit; force recomputation
+    second.params = {**second.params, "cache": False}
+    db_session.add_all([first, second])
+    db_session.commit()
+
+    uri = execute_step(batch.id, 3, first.id)
+    execute_step(batch.id, 3, second.id)
+
+    [plate] = read_plates(uri)
+    assert plate.value_at("A1") == pytest.approx(1000.0)
+    assert plate.value_at("B1") == pytest.approx(250.0)
+    assert db_session.query(CurveFit).count() == 1
+
+    reports = {}
+    for nv in (first, second):
+        artifacts = db_session.query(Artifact).filter(Artifact.node_version_id == nv.id).all()
+        assert sorted(a.content_type for a in artifacts) == [
+            "application/json",
+            "application/vnd.antibody.plates",
+            "text/csv",
+        ]
+        by_type = {a.content_type: a.uri for a in artifacts}
+        with open(by_type["application/json"], encoding="utf-8") as handle:
+            reports[nv.id] = json.load(handle)
+        with open(by_type["text/csv"], encoding="utf-8") as handle:
+            worklist = handle.read().splitlines()
+    assert reports[first.id]["cached_curves"] == 0
+    assert reports[second.id]["cached_curves"] == 1
+    assert worklist[0].startswith("Source_label,Source_position")
+    assert "purified,A1,norm-1,A1,25.00,Ab1" in worklist
+    assert "purified,B1,norm-1,B1,100.00,Ab2" in worklist
+
+
+def test_curve_fit_stored_concurrently_is_used(db_session, monkeypatch):
+    batch = Batch(name="BCA Race")
+    db_session.add(batch)
+    db_session.commit()
+    nv = _bca_version(batch.id, 1)
+    db_session.add(nv)
+    db_session.commit()
+    fit_curves = bca.fit_curves
+
+    def fit_while_another_run_stores(model, concentrations, absorbances):
+        # Another BCA run finishes fitting the same standards first
+        fitted = fit_curves(model, concentrations, absorbances)
+        digest = bca.curve_digests(model, np.asarray(concentrations), absorbances)[0]
+        db_session.add(CurveFit(digest=digest, model=model, params=fitted[0].tolist()))
+        db_session.commit()
+        return fitted
+
+    monkeypatch.setattr(step_activities.bca, "fit_curves", fit_while_another_run_stores)
+    uri = execute_step(batch.id, 3, nv.id)
+
+    [plate] = read_plates(uri)
+    assert plate.value_at("A1") == pytest.approx(1000.0)
+    db_session.expire_all()
+    assert db_session.get(WorkflowNodeVersion, nv.id).status == statuses.COMPLETED
+    assert db_session.query(CurveFit).count() == 1
@@ -0,0 +1,88 @@
+import uuid
+
+import httpx
+import pytest
+from openpyxl import Workbook
+
+from app.main import app
+from app import statuses
+from app.models import Artifact, Batch, Chain, LineageEdge, WorkflowNodeVersion
+
+
+def _fasta(count: int) -> bytes:
+    return "".join(f">Ab{i}_H description\nQVQLVQSG\nAEVKKPG\n" for i in range(count)).encode()
+
+
+@pytest.mark.anyio
+async def test_fasta_import_creates_one_version_for_all_chains(db_session):
+    batch = Batch(name="Library Batch")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.refresh(batch)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(f"/api/batches/{batch.id}/chains/import", content=_fasta(2500))
+    assert resp.status_code == 201
+    payload = resp.json()
+    assert payload["version"] == 1
+    assert payload["status"] == statuses.COMPLETED
+    assert payload["params"] == {
+        "import": {"format": "fasta", "chains": 2500, "duplicate_sequences": 2499}
+    }
+
+    chains = db_session.query(Chain).all()
+    assert len(chains) == 2500
+    assert {c.node_version_id for c in chains} == {uuid.UUID(payload["id"])}
+    assert chains[0].sequence == "QVQLVQSGAEVKKPG"
+
+    upload_edge = db_session.query(LineageEdge).filter(LineageEdge.relation == "upload").one()
+    artifact = db_session.get(Artifact, upload_edge.target_artifact_id)
+    assert artifact.content_type == "text/x-fasta"
+
+
+@pytest.mark.anyio
+async def test_invalid_records_reject_whole_import(db_session):
+    batch = Batch(name="Bad Library")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.refresh(batch)
+
+    body = _fasta(1500) + b">broken\nQVQ-LV1\n>empty\n"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(f"/api/batches/{batch.id}/chains/import", content=body)
+    assert resp.status_code == 422
+    detail = resp.json()["detail"]
+    assert detail["invalid_records"] == 2
+    assert [(e["record"], e["error"]) for e in detail["errors"]] == [
+        (1501, "invalid residues"),
+        (1502, "empty sequence"),
+    ]
+    assert db_session.query(Chain).count() == 0
+    assert db_session.query(WorkflowNodeVersion).count() == 0
+
+
+@pytest.mark.anyio
+async def test_xlsx_import_expands_heavy_and_light(db_session, tmp_path):
+    batch = Batch(name="XLSX Library")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.refresh(batch)
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "VH", "VL"])
+    sheet.append(["Ab1", "qvql vqsg", "DIQMTQ"])
+    sheet.append(["Ab2", "EVQLVE", "DIQMTQ"])
+    path = tmp_path / "library.xlsx"
+    workbook.save(path)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            f"/api/batches/{batch.id}/chains/import?format=xlsx", content=path.read_bytes()
+        )
+    assert resp.status_code == 201
+    names = {c.name: c.sequence for c in db_session.query(Chain).all()}
+    assert names == {"Ab1_H": "QVQLVQSG", "Ab1_L": "DIQMTQ", "Ab2_H": "EVQLVE", "Ab2_L": "DIQMTQ"}
@@ -0,0 +1,106 @@
+import httpx
+import pytest
+
+from app import statuses
+from app.activities.step_activities import execute_step
+from app.main import app
+from app.models import Batch, Chain, Construct, ConstructChain, LineageEdge, WorkflowNodeVersion
+from app.steps.chain_library import sequence_digest
+
+
+def test_sequence_digest_ignores_case_and_whitespace():
+    assert sequence_digest("qvql vqsg\n") == sequence_digest("QVQLVQSG")
+    assert sequence_digest("QVQLVQSG") != sequence_digest("QVQLVQSA")
+    assert sequence_digest("") is None
+    assert sequence_digest(None) is None
+
+
+async def _import(client, batch_id, body: bytes):
+    resp = await client.post(f"/api/batches/{batch_id}/chains/import", content=body)
+    assert resp.status_code == 201
+    return resp.json()
+
+
+@pytest.mark.anyio
+async def test_reuse_counts_across_batches(db_session):
+    first = Batch(name="Library A")
+    second = Batch(name="Library B")
+    db_session.add_all([first, second])
+    db_session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await _import(client, first.id, b">Ab1_H\nQVQLVQSG\n>Ab2_H\nqvqlvqsg\n>Ab3_L\nDIQMTQSP\n")
+        payload = await _import(client, second.id, b">Ab9_H\nQVQLVQSG\n>Ab10_L\nEIVLTQSP\n")
+        assert payload["params"]["import"]["duplicate_sequences"] == 1
+
+        resp = await client.get("/api/chains/reuse")
+        assert resp.status_code == 200
+        sequences = resp.json()["sequences"]
+        assert sequences == [
+            {
+                "sequence_digest": sequence_digest("QVQLVQSG"),
+                "chain_count": 3,
+                "batch_count": 2,
+                "example_name": "Ab1_H",
+            }
+        ]
+
+        resp = await client.get("/api/chains/reuse", params={"min_count": 1, "batch_id": str(second.id)})
+        counts = {item["example_name"]: item["chain_count"] for item in resp.json()["sequences"]}
+        assert counts == {"Ab1_H": 3, "Ab10_L": 1}
+
+    assert db_session.query(Chain).filter(Chain.sequence_digest.is_(None)).count() == 0
+
+
+@pytest.mark.anyio
+async def test_reuse_of_unnamed_chains(db_session):
+    batch = Batch(name="Unnamed")
+    db_session.add(batch)
+    db_session.flush()
+    node = WorkflowNodeVersion(
+        batch_id=batch.id, template_version="v1", step_index=1, version=1, status=statuses.COMPLETED
+    )
+    db_session.add(node)
+    db_session.flush()
+    digest = sequence_digest("QVQLVQSG")
+    db_session.add_all(
+        Chain(node_version_id=node.id, sequence="QVQLVQSG", sequence_digest=digest) for _ in range(2)
+    )
+    db_session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/chains/reuse")
+    assert resp.status_code == 200
+    assert resp.json()["sequences"][0]["example_name"] is None
+
+
+def test_construct_links_every_chain_even_with_shared_sequences(db_session):
+    batch = Batch(name="Construct")
+    db_session.add(batch)
+    db_session.flush()
+    chain_step, construct_step = (
+        WorkflowNodeVersion(
+            batch_id=batch.id, template_version="v1", step_index=i, version=1, status=status, params=params
+        )
+        for i, status, params in (
+            (1, statuses.COMPLETED, None),
+            (2, statuses.IDLE, {"operation": "construct"}),
+        )
+    )
+    db_session.add_all([chain_step, construct_step])
+    db_session.flush()
+    digest = sequence_digest("QVQLVQSG")
+    db_session.add_all(
+        Chain(node_version_id=chain_step.id, name=name, sequence="QVQLVQSG", sequence_digest=digest)
+        for name in ("Ab1_H", "Ab2_H")
+    )
+    db_session.commit()
+
+    execute_step(batch.id, 2, construct_step.id)
+
+    [construct] = db_session.query(Construct).all()
+    assert db_session.query(ConstructChain).filter_by(construct_id=construct.id).count() == 2
+    derive = db_session.query(LineageEdge).filter_by(target_construct_id=construct.id, relation="derive")
+    assert derive.count() == 2
@@ -0,0 +1,86 @@
+import json
+import random
+import time
+
+from app import statuses
+from app.activities.artifacts import write_plates
+from app.activities.step_activities import execute_step
+from app.models import Artifact, Batch, WorkflowNodeVersion
+from app.steps import cherrypick
+from app.steps.plate import Plate
+
+
+def _source_plates(count: int) -> list[Plate]:
+    return [
+        Plate.from_column([f"S{p}-{w}" for w in range(96)], name=f"src-{p}") for p in range(count)
+    ]
+
+
+def test_aligned_column_becomes_single_pass():
+    source = _source_plates(1)
+    destination = Plate.from_column([f"S0-{w}" for w in range(8, 16)], name="cherry-H")
+    plan = cherrypick.plan_cherry_pick(source, [destination], volume=10.0)
+
+    assert len(plan.passes) == 1
+    assert [t.source_position for t in plan.transfers] == [f"{r}2" for r in "ABCDEFGH"]
+    assert [t.destination_position for t in plan.transfers] == [f"{r}1" for r in "ABCDEFGH"]
+    assert plan.predicted_seconds < plan.naive_seconds
+    assert plan.missing == []
+
+
+def test_optimizer_groups_by_source_plate_and_row():
+    sources = _source_plates(3)
+    picks = [f"S{p}-{w}" for w in range(0, 96, 5) for p in range(3)] + ["unknown"]
+    destinations = cherrypick.assign_destinations(picks)
+    plan = cherrypick.plan_cherry_pick(sources, destinations, volume=5.0)
+
+    assert plan.missing == ["unknown"]
+    assert len(plan.transfers) == len(picks) - 1
+    source_order = [t.source_label for t in plan.transfers]
+    assert source_order == sorted(source_order)
+    for moves in plan.passes:
+        assert len({(m.source_plate, m.source_col) for m in moves}) == 1
+        assert len({m.source_row for m in moves}) == len(moves) <= cherrypick.CHANNELS
+
+
+def test_thousands_of_transfers_plan_under_a_second():
+    sources = _source_plates(12)
+    names = [f"S{p}-{w}" for p in range(12) for w in range(96)]
+    random.Random(7).shuffle(names)
+    destinations = [
+        Plate.from_column(names[start : start + 384], size=384, name=f"dest-{start // 384}")
+        for start in range(0, len(names), 384)
+    ]
+
+    started = time.perf_counter()
+    plan = cherrypick.plan_cherry_pick(sources, destinations, volume=2.0)
+    assert time.perf_counter() - started < 1.0
+    assert len(plan.transfers) == 12 * 96
+    assert len(plan.passes) <= 12 * 12 * 2
+
+
+def test_execute_step_writes_cherrypick_worklist(db_session):
+    batch = Batch(name="Cherry Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id, template_version="v1", step_index=3, version=1, status=statuses.IDLE
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    source_uri = write_plates(batch.id, nv.id, "clones", _source_plates(2))
+    nv.params = {"operation": "cherrypick_plan", "source_uri": source_uri, "picks": ["S1-3", "S0-3"]}
+    db_session.commit()
+
+    uri = execute_step(batch.id, 3, nv.id)
+
+    with open(uri, encoding="utf-8") as handle:
+        rows = handle.read().splitlines()
+    assert rows[1:] == ["src-0,D1,cherry-H,B1,10.00,S0-3", "src-1,D1,cherry-H,A1,10.00,S1-3"]
+    report = next(
+        a for a in db_session.query(Artifact).filter(Artifact.node_version_id == nv.id)
+        if a.content_type == "application/json"
+    )
+    with open(report.uri, encoding="utf-8") as handle:
+        assert json.load(handle)["passes"] == 2
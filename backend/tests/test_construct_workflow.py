@@ -10,7 +10,10 @@ from app.activities.step_activities import (
     create_node_version,
     execute_step,
     get_idle_versions,
+    get_step_options,
     get_latest_version_for_step,
+    step_outputs_changed,
+    carry_forward_version,
     get_template_step_indices,
     update_batch_status,
 )
@@ -69,9 +72,12 @@ async def test_construct_created_and_preserved_on_rollback(db_session):
                     execute_step,
                     update_batch_status,
                     get_idle_versions,
+                    get_step_options,
                     create_node_version,
                     get_template_step_indices,
                     get_latest_version_for_step,
+                    step_outputs_changed,
+                    carry_forward_version,
                 ],
                 activity_executor=executor,
             )
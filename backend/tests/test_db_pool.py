@@ -0,0 +1,82 @@
+import threading
+import time
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import Settings
+from app.db.pool import InstrumentedQueuePool, engine_options, instrument, pool_stats
+from app.main import app
+
+
+def _engine(tmp_path, **overrides):
+    settings = Settings(
+        database_url=f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        db_pool_size=1,
+        db_max_overflow=0,
+        **overrides,
+    )
+    engine = create_engine(settings.database_url, **engine_options(settings))
+    instrument(engine)
+    return engine
+
+
+def test_engine_options_follow_settings():
+    memory = engine_options(Settings(database_url="sqlite+pysqlite:///:memory:"))
+    assert memory["poolclass"] is StaticPool
+
+    postgres = engine_options(
+        Settings(
+            database_url="postgresql+psycopg://u:p@db/antibody",
+            db_pool_size=4,
+            db_max_overflow=2,
+            db_statement_timeout_ms=5000,
+        )
+    )
+    assert postgres["poolclass"] is InstrumentedQueuePool
+    assert (postgres["pool_size"], postgres["max_overflow"], postgres["pool_pre_ping"]) == (4, 2, True)
+    assert postgres["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_pool_records_checkout_wait(tmp_path):
+    engine = _engine(tmp_path)
+    held = engine.connect()
+
+    def release():
+        time.sleep(0.1)
+        held.close()
+
+    releaser = threading.Thread(target=release)
+    releaser.start()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert pool_stats(engine)["in_use"] == 1
+    releaser.join()
+
+    stats = pool_stats(engine)
+    assert stats["size"] == 1 and stats["in_use"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["in_use_peak"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+    engine.dispose()
+
+
+def test_pool_counts_checkout_timeouts(tmp_path):
+    engine = _engine(tmp_path, db_pool_timeout=0.05)
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    assert pool_stats(engine)["timeouts"] == 1
+    engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_pool_stats_endpoint():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/db/pool")
+    assert resp.status_code == 200
+    assert resp.json() == {"pool": "StaticPool"}
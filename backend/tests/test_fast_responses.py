@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+from app import statuses
+from app.main import app
+from app.models import Batch, LineageEdge, WorkflowNodeVersion
+from app.schemas.lineage import LineageResponse
+from app.schemas.version_list import NodeVersionListResponse
+
+
+def _chain_of_versions(db_session, count):
+    batch = Batch(name="Fast Responses")
+    db_session.add(batch)
+    db_session.flush()
+    nodes = [
+        WorkflowNodeVersion(
+            batch_id=batch.id,
+            template_version="v1",
+            step_index=1,
+            version=version,
+            status=statuses.COMPLETED,
+            params={"version": version},
+        )
+        for version in range(1, count + 1)
+    ]
+    db_session.add_all(nodes)
+    db_session.flush()
+    db_session.add_all(
+        LineageEdge(source_node_version_id=upstream.id, target_node_version_id=node.id, relation="rollback")
+        for upstream, node in zip(nodes, nodes[1:])
+    )
+    db_session.commit()
+    return batch, nodes
+
+
+@pytest.mark.anyio
+async def test_fast_path_payloads_validate_against_response_models(db_session):
+    batch, nodes = _chain_of_versions(db_session, 4)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        versions = await client.get(f"/api/batches/{batch.id}/steps/1/versions")
+        lineage = await client.get(f"/api/lineage/node_version/{nodes[-1].id}")
+
+    listing = NodeVersionListResponse.model_validate_json(versions.content)
+    assert [v.version for v in listing.versions] == [4, 3, 2, 1]
+    assert listing.versions[0].created_at == nodes[-1].created_at
+    # Re-encoding through the models changes nothing
+    assert versions.json() == listing.model_dump(mode="json")
+
+    graph = LineageResponse.model_validate_json(lineage.content)
+    assert [edge.depth for edge in graph.edges] == [1, 2, 3]
+    assert lineage.json() == graph.model_dump(mode="json")
+
+
+@pytest.mark.anyio
+async def test_large_responses_are_gzipped(db_session):
+    batch, nodes = _chain_of_versions(db_session, 30)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        large = await client.get(f"/api/lineage/node_version/{nodes[-1].id}", params={"depth": 30})
+        small = await client.get("/health")
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert len(large.json()["edges"]) == 29
+    assert "content-encoding" not in small.headers
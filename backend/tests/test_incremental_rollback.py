@@ -0,0 +1,123 @@
+from app import statuses
+from app.activities.step_activities import (
+    carry_forward_version,
+    create_node_version,
+    execute_step,
+    get_step_options,
+    step_outputs_changed,
+)
+from app.activities.sample_index import search_samples
+from app.models import Artifact, Batch, LineageEdge, WorkflowNodeVersion
+
+PARAMS = {
+    "operation": "qubit_concentration",
+    "layouts": [{"name": "sheet1", "samples": ["H1_H", "H1_L"]}],
+    "readings": [[250.0, 450.0]],
+    "curve": {"slope": 0.02, "intercept": 0.0},
+}
+
+
+def _version(db_session, batch, version, step_index=3, params=None) -> WorkflowNodeVersion:
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=step_index,
+        version=version,
+        status=statuses.IDLE,
+        params=params,
+    )
+    db_session.add(nv)
+    db_session.commit()
+    return nv
+
+
+def _batch(db_session) -> Batch:
+    batch = Batch(name="Incremental Batch")
+    db_session.add(batch)
+    db_session.commit()
+    return batch
+
+
+def test_identical_outputs_stop_propagation(db_session):
+    batch = _batch(db_session)
+    parent = _version(db_session, batch, 1, params=PARAMS)
+    execute_step(batch.id, 3, parent.id)
+
+    recomputed = _version(db_session, batch, 2, params={**PARAMS, "cache": False})
+    execute_step(batch.id, 3, recomputed.id, parent.id)
+    assert step_outputs_changed(recomputed.id, parent.id) is False
+
+    reused = _version(db_session, batch, 3, params=PARAMS)
+    execute_step(batch.id, 3, reused.id, recomputed.id)
+    assert step_outputs_changed(reused.id, recomputed.id) is False
+
+    changed = _version(db_session, batch, 4, params={**PARAMS, "readings": [[250.0, 460.0]]})
+    execute_step(batch.id, 3, changed.id, reused.id)
+    assert step_outputs_changed(str(changed.id), str(reused.id)) is True
+    assert step_outputs_changed(changed.id, None) is True
+
+
+def test_domain_row_handlers_always_count_as_changed(db_session):
+    batch = _batch(db_session)
+    parent = _version(db_session, batch, 1, step_index=1, params={"sequence": "AAA"})
+    child = _version(db_session, batch, 2, step_index=1, params={"sequence": "AAA"})
+    execute_step(batch.id, 1, parent.id)
+    execute_step(batch.id, 1, child.id, parent.id)
+    assert step_outputs_changed(child.id, parent.id) is True
+
+
+def test_carried_version_references_parent_outputs(db_session):
+    batch = _batch(db_session)
+    parent = _version(db_session, batch, 1, params=PARAMS)
+    uri = execute_step(batch.id, 3, parent.id)
+
+    carried_id = carry_forward_version(batch.id, 3, parent.id)
+    db_session.expire_all()
+    carried = db_session.get(WorkflowNodeVersion, carried_id)
+    assert (carried.version, carried.status, carried.artifact_uri) == (2, statuses.COMPLETED, uri)
+    assert carried.params == PARAMS
+    edge = db_session.query(LineageEdge).filter(LineageEdge.target_node_version_id == carried.id).one()
+    assert (edge.source_node_version_id, edge.relation) == (parent.id, "carry")
+    parent_artifacts = {a.id for a in db_session.query(Artifact).filter(Artifact.node_version_id == parent.id)}
+    linked = db_session.query(LineageEdge.target_artifact_id).filter(
+        LineageEdge.source_node_version_id == carried.id, LineageEdge.relation == "reuse"
+    )
+    assert {artifact_id for (artifact_id,) in linked} == parent_artifacts
+    assert {hit.node_version_id for hit in search_samples(db_session, "H1_", batch_id=batch.id)} == {
+        parent.id,
+        carried.id,
+    }
+
+    # Outputs of a carried version resolve to the version it carries
+    again = _version(db_session, batch, 3, params={**PARAMS, "cache": False})
+    execute_step(batch.id, 3, again.id, carried.id)
+    assert step_outputs_changed(again.id, carried.id) is False
+
+
+def test_rollback_version_keeps_the_step_configuration(db_session):
+    batch = _batch(db_session)
+    parent = _version(db_session, batch, 1, params=PARAMS)
+    uri = execute_step(batch.id, 3, parent.id)
+
+    # The activities the rollback loop runs for a re-executed step
+    rerun_id = create_node_version(batch.id, 3, parent.id, "rollback")
+    db_session.expire_all()
+    rerun = db_session.get(WorkflowNodeVersion, rerun_id)
+    assert (rerun.params, rerun.template_version, rerun.version) == (PARAMS, "v1", 2)
+    assert get_step_options(rerun_id) == {"resource_class": "cpu", "heartbeats": False}
+    assert execute_step(batch.id, 3, rerun_id, parent.id) == uri
+    assert step_outputs_changed(rerun_id, parent.id) is False
+
+
+def test_only_completed_versions_are_carried_forward(db_session):
+    batch = _batch(db_session)
+    completed = _version(db_session, batch, 1, params=PARAMS)
+    execute_step(batch.id, 3, completed.id)
+    pending_edit = _version(db_session, batch, 2, params={**PARAMS, "readings": [[250.0, 460.0]]})
+    interrupted = _version(db_session, batch, 1, step_index=2, params=PARAMS)
+    interrupted.status = statuses.RUNNING
+    db_session.commit()
+
+    assert carry_forward_version(batch.id, 3, pending_edit.id) is None
+    assert carry_forward_version(batch.id, 2, interrupted.id) is None
+    assert db_session.query(WorkflowNodeVersion).filter(WorkflowNodeVersion.batch_id == batch.id).count() == 3
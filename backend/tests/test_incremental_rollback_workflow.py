@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from app import statuses
+from app.activities.step_activities import (
+    execute_step,
+    get_idle_versions,
+    get_step_options,
+    update_batch_status,
+    create_node_version,
+    get_template_step_indices,
+    get_latest_version_for_step,
+    step_outputs_changed,
+    carry_forward_version,
+)
+from app.activities.sample_index import search_samples
+from app.core.config import get_settings
+from app.main import app
+from app.models import Artifact, Batch, LineageEdge, StepResultCache, WorkflowNodeVersion
+from app.workflows.batch_workflow import BatchWorkflow
+from app.workflows.runner import set_client_override
+
+PARAMS = {
+    "operation": "qubit_concentration",
+    "layouts": [{"name": "sheet1", "samples": ["H1_H", "H1_L"]}],
+    "readings": [[250.0, 450.0]],
+    "curve": {"slope": 0.02, "intercept": 0.0},
+}
+
+
+async def _rollback(batch_id, from_step_index: int) -> None:
+    settings = get_settings()
+    env = await WorkflowEnvironment.start_time_skipping()
+    try:
+        async with env:
+            set_client_override(env.client)
+            executor = ThreadPoolExecutor()
+            worker = Worker(
+                env.client,
+                task_queue=settings.temporal_task_queue,
+                workflows=[BatchWorkflow],
+                activities=[
+                    execute_step,
+                    update_batch_status,
+                    get_idle_versions,
+                    get_step_options,
+                    create_node_version,
+                    get_template_step_indices,
+                    get_latest_version_for_step,
+                    step_outputs_changed,
+                    carry_forward_version,
+                ],
+                activity_executor=executor,
+            )
+
+            async with worker:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    resp = await client.post(
+                        f"/api/batches/{batch_id}/rollback", json={"from_step_index": from_step_index}
+                    )
+                    assert resp.status_code == 200
+
+                handle = env.client.get_workflow_handle(f"batch-workflow-{batch_id}")
+                await handle.result()
+
+            executor.shutdown(wait=True)
+    finally:
+        set_client_override(None)
+
+
+def _completed_batch(db_session) -> tuple[Batch, dict[int, WorkflowNodeVersion]]:
+    batch = Batch(name="Incremental Rollback")
+    db_session.add(batch)
+    db_session.commit()
+    completed = {}
+    for step_index in (1, 2, 3):
+        nv = WorkflowNodeVersion(
+            batch_id=batch.id,
+            template_version="v1",
+            step_index=step_index,
+            version=1,
+            status=statuses.IDLE,
+            params=PARAMS,
+        )
+        db_session.add(nv)
+        db_session.commit()
+        execute_step(batch.id, step_index, nv.id)
+        completed[step_index] = nv
+    batch.status = statuses.COMPLETED
+    db_session.commit()
+    return batch, completed
+
+
+def _versions(db_session, batch, step_index: int) -> list[WorkflowNodeVersion]:
+    return (
+        db_session.query(WorkflowNodeVersion)
+        .filter(WorkflowNodeVersion.batch_id == batch.id, WorkflowNodeVersion.step_index == step_index)
+        .order_by(WorkflowNodeVersion.version)
+        .all()
+    )
+
+
+@pytest.mark.anyio
+async def test_unchanged_rerun_carries_later_steps_forward(db_session):
+    batch, completed = _completed_batch(db_session)
+    # A params edit on step 3 that has not run yet
+    pending_edit = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=3,
+        version=2,
+        status=statuses.IDLE,
+        params={**PARAMS, "readings": [[250.0, 460.0]]},
+    )
+    db_session.add(pending_edit)
+    db_session.commit()
+
+    await _rollback(batch.id, 1)
+    db_session.expire_all()
+
+    # Step 1 re-ran with its own configuration and reproduced its outputs
+    old_step1, new_step1 = _versions(db_session, batch, 1)
+    assert (new_step1.status, new_step1.params) == (statuses.COMPLETED, PARAMS)
+    assert new_step1.artifact_uri == completed[1].artifact_uri
+
+    # So step 2 was carried forward instead of recomputed
+    old_step2, carried = _versions(db_session, batch, 2)
+    assert (carried.status, carried.artifact_uri) == (statuses.COMPLETED, old_step2.artifact_uri)
+    relations = {
+        relation
+        for (relation,) in db_session.query(LineageEdge.relation).filter(
+            LineageEdge.target_node_version_id == carried.id
+        )
+    }
+    assert relations == {"carry"}
+
+    # Step 3's latest version is an unexecuted edit; it is executed, not carried
+    step3 = _versions(db_session, batch, 3)
+    assert [v.status for v in step3] == [statuses.COMPLETED, statuses.IDLE, statuses.COMPLETED]
+    assert step3[-1].params == pending_edit.params
+    assert step3[-1].artifact_uri not in (None, completed[3].artifact_uri)
+    edge = (
+        db_session.query(LineageEdge)
+        .filter(LineageEdge.target_node_version_id == step3[-1].id, LineageEdge.relation == "rollback")
+        .one()
+    )
+    assert edge.source_node_version_id == pending_edit.id
+
+
+@pytest.mark.anyio
+async def test_rolled_back_step_with_unchanged_inputs_reuses_outputs(db_session):
+    batch = Batch(name="Memoized Rollback")
+    db_session.add(batch)
+    db_session.commit()
+    parent = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=3,
+        version=1,
+        status=statuses.IDLE,
+        params=PARAMS,
+    )
+    db_session.add(parent)
+    db_session.commit()
+    uri = execute_step(batch.id, 3, parent.id)
+    batch.status = statuses.COMPLETED
+    db_session.commit()
+
+    await _rollback(batch.id, 3)
+    db_session.expire_all()
+
+    _, rerun = _versions(db_session, batch, 3)
+    assert (rerun.status, rerun.artifact_uri) == (statuses.COMPLETED, uri)
+    assert db_session.query(StepResultCache).one().hit_count == 1
+    # Served from the cache: no new artifacts, reuse edges to the parent's
+    assert db_session.query(Artifact).filter(Artifact.node_version_id == rerun.id).count() == 0
+    parent_artifacts = {a.id for a in db_session.query(Artifact).filter(Artifact.node_version_id == parent.id)}
+    reused = db_session.query(LineageEdge.target_artifact_id).filter(
+        LineageEdge.source_node_version_id == rerun.id, LineageEdge.relation == "reuse"
+    )
+    assert {artifact_id for (artifact_id,) in reused} == parent_artifacts
+    assert rerun.id in {hit.node_version_id for hit in search_samples(db_session, "H1_", batch_id=batch.id)}
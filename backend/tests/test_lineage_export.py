@@ -0,0 +1,96 @@
+import json
+
+import httpx
+import pyarrow as pa
+import pytest
+
+from app import statuses
+from app.activities import lineage_export
+from app.main import app
+from app.models import Artifact, Batch, Chain, Construct, LineageEdge, WorkflowNodeVersion
+
+
+def _seed(db_session):
+    batch = Batch(name="Lineage Export")
+    other = Batch(name="Other")
+    db_session.add_all([batch, other])
+    db_session.flush()
+    v1, v2, foreign = (
+        WorkflowNodeVersion(batch_id=b.id, template_version="v1", step_index=1, version=n, status=statuses.COMPLETED)
+        for b, n in ((batch, 1), (batch, 2), (other, 1))
+    )
+    db_session.add_all([v1, v2, foreign])
+    db_session.flush()
+    construct = Construct(node_version_id=v2.id, name="pAB-1")
+    db_session.add_all(
+        [
+            Artifact(node_version_id=v1.id, uri="file:///a.txt"),
+            Chain(node_version_id=v1.id, name="H1", sequence="QVQL"),
+            Chain(node_version_id=v1.id, name="L1", sequence="DIQM"),
+            Chain(node_version_id=foreign.id, name="X1", sequence="EVQL"),
+            construct,
+        ]
+    )
+    db_session.flush()
+    db_session.add_all(
+        [
+            LineageEdge(source_node_version_id=v1.id, target_node_version_id=v2.id, relation="rollback"),
+            LineageEdge(source_node_version_id=v1.id, target_construct_id=construct.id, relation="assembled_from"),
+            LineageEdge(source_node_version_id=foreign.id, target_node_version_id=foreign.id, relation="rollback"),
+        ]
+    )
+    db_session.commit()
+    return batch
+
+
+@pytest.mark.anyio
+async def test_ndjson_export_streams_only_the_batch(db_session):
+    batch = _seed(db_session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/api/batches/{batch.id}/lineage/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == lineage_export.NDJSON_MEDIA_TYPE
+
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    counts = {entity: sum(row["type"] == entity for row in rows) for entity in lineage_export.ENTITIES}
+    assert counts == {"node_version": 2, "artifact": 1, "chain": 2, "construct": 1, "edge": 2}
+    assert all(row["batch_id"] == str(batch.id) for row in rows if row["type"] == "node_version")
+    assert {row["relation"] for row in rows if row["type"] == "edge"} == {"rollback", "assembled_from"}
+
+
+def test_export_is_produced_one_fetch_at_a_time(db_session):
+    batch = _seed(db_session)
+
+    chunks = list(lineage_export.ndjson(batch.id, ["chain", "edge"], chunk_size=1))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [1, 1, 1, 1]
+
+
+@pytest.mark.anyio
+async def test_arrow_export_needs_one_entity(db_session):
+    batch = _seed(db_session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/api/batches/{batch.id}/lineage/export", params={"format": "arrow"})
+        missing = await client.get("/api/batches/00000000-0000-0000-0000-000000000000/lineage/export")
+    assert resp.status_code == 400
+    assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_arrow_export_round_trips(db_session):
+    batch = _seed(db_session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            f"/api/batches/{batch.id}/lineage/export", params={"format": "arrow", "entity": "chain"}
+        )
+    assert resp.status_code == 200
+
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert sorted(table.column("name").to_pylist()) == ["H1", "L1"]
+    assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
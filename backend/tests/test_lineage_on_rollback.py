@@ -10,9 +10,12 @@ from app.activities.step_activities import (
     execute_step,
     update_batch_status,
     get_idle_versions,
+    get_step_options,
     create_node_version,
     get_template_step_indices,
     get_latest_version_for_step,
+    step_outputs_changed,
+    carry_forward_version,
 )
 from app.core.config import get_settings
 from app.main import app
@@ -53,9 +56,12 @@ async def test_rollback_creates_lineage_edge(db_session):
                     execute_step,
                     update_batch_status,
                     get_idle_versions,
+                    get_step_options,
                     create_node_version,
                     get_template_step_indices,
                     get_latest_version_for_step,
+                    step_outputs_changed,
+                    carry_forward_version,
                 ],
                 activity_executor=executor,
             )
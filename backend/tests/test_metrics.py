@@ -0,0 +1,141 @@
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import metrics, statuses
+from app.activities.step_activities import execute_step
+from app.db.bulk import bulk_insert
+from app.main import app
+from app.models import Batch, WorkflowNodeVersion
+
+VERSIONS_ROUTE = "/api/batches/{batch_id}/steps/{step_index}/versions"
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_route_latency_and_db_usage(db_session):
+    batch = Batch(name="Metrics Batch")
+    db_session.add(batch)
+    db_session.commit()
+    before = _sample("http_request_db_queries_count", route=VERSIONS_ROUTE)
+    queries_before = _sample("http_request_db_queries_sum", route=VERSIONS_ROUTE)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/api/batches/{batch.id}/steps/1/versions")
+        assert resp.status_code == 200
+        metrics = await client.get("/metrics")
+
+    assert metrics.status_code == 200
+    assert "text/plain" in metrics.headers["content-type"]
+    # Labelled by route template, not by the batch id in the path
+    assert f'route="{VERSIONS_ROUTE}"' in metrics.text
+    assert str(batch.id) not in metrics.text
+    assert _sample("http_request_db_queries_count", route=VERSIONS_ROUTE) == before + 1
+    assert _sample("http_request_db_queries_sum", route=VERSIONS_ROUTE) >= queries_before + 2
+
+
+@pytest.mark.anyio
+async def test_metrics_middleware_records_status_of_unmatched_and_failing_requests():
+    failing = FastAPI()
+    failing.add_middleware(metrics.MetricsMiddleware)
+
+    @failing.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    not_found = _sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+    errors = _sample("http_request_duration_seconds_count", method="GET", route="/boom", status="500")
+    transport = httpx.ASGITransport(app=failing, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/missing")).status_code == 404
+        assert (await client.get("/boom")).status_code == 500
+
+    assert _sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == (
+        not_found + 1
+    )
+    assert _sample("http_request_duration_seconds_count", method="GET", route="/boom", status="500") == errors + 1
+    assert metrics.MetricsMiddleware in [m.cls for m in app.user_middleware]
+
+
+def test_step_activity_metrics(db_session):
+    batch = Batch(name="Metrics Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=1,
+        version=1,
+        status=statuses.IDLE,
+        params={"sequence": "QVQL"},
+    )
+    db_session.add(nv)
+    db_session.commit()
+    completed = _sample("step_activity_total", step_index="1", outcome="completed")
+    skipped = _sample("step_activity_total", step_index="1", outcome="skipped")
+    rows = _sample("step_rows_written_total", step_index="1")
+
+    execute_step(batch.id, 1, nv.id)
+    execute_step(batch.id, 1, nv.id)
+
+    assert _sample("step_activity_total", step_index="1", outcome="completed") == completed + 1
+    assert _sample("step_activity_total", step_index="1", outcome="skipped") == skipped + 1
+    # Artifact, lineage edge, chain and sample index rows
+    assert _sample("step_rows_written_total", step_index="1") >= rows + 3
+    assert _sample("step_activity_duration_seconds_count", step_index="1", outcome="completed") >= 1
+
+
+def test_failed_statements_do_not_leave_start_times_behind():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert conn.info.get("metrics_started") == []
+    engine.dispose()
+
+
+def test_multiprocess_registry_aggregates_child_processes(tmp_path, monkeypatch):
+    # A child process records a sample the way a --mode cpu handler process would
+    child = "from app import metrics; metrics.record_artifact_bytes(1234)"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    subprocess.run([sys.executable, "-c", child], env=env, check=True)
+
+    assert metrics.registry() is REGISTRY
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert metrics.registry().get_sample_value("artifact_bytes_written_total") == 1234
+    assert b"artifact_bytes_written_total 1234.0" in metrics.generate_latest()
+
+
+def test_bulk_inserts_count_their_rows():
+    engine = create_engine("sqlite://")
+    table = Table("bulk_rows", MetaData(), Column("value", Integer))
+    table.metadata.create_all(engine)
+    rows = _sample("step_rows_written_total", step_index="7")
+    queries = _sample("db_queries_total")
+
+    # executemany is seen by the cursor events
+    with metrics.track_step(7), Session(engine) as session:
+        bulk_insert(session, table, [{"value": i} for i in range(25)])
+        session.commit()
+    assert _sample("step_rows_written_total", step_index="7") == rows + 25
+
+    # COPY on the driver connection is recorded by bulk_insert itself
+    with metrics.track_step(7):
+        metrics.record_bulk_insert(40, 0.01)
+    assert _sample("step_rows_written_total", step_index="7") == rows + 65
+    assert _sample("db_queries_total") >= queries + 2
+    engine.dispose()
@@ -7,7 +7,7 @@ from temporalio.testing import WorkflowEnvironment
 from temporalio.worker import Worker
 
 from app import statuses
-from app.activities.step_activities import execute_step, get_idle_versions, update_batch_status
+from app.activities.step_activities import execute_step, get_idle_versions, get_step_options, update_batch_status
 from app.core.config import get_settings
 from app.main import app
 from app.models import Batch, WorkflowNodeVersion
@@ -108,7 +108,7 @@ async def test_run_executes_only_latest_idle_version_after_params_update(db_sess
                 env.client,
                 task_queue=settings.temporal_task_queue,
                 workflows=[BatchWorkflow],
-                activities=[execute_step, update_batch_status, get_idle_versions],
+                activities=[execute_step, update_batch_status, get_idle_versions, get_step_options],
                 activity_executor=executor,
             )
             async with worker:
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from app.steps.plate import Plate, dumps_plates, loads_plates, parse_well, well_name
+
+
+def _column_plate(count: int, size: int = 96, prefix: str = "S") -> Plate:
+    return Plate.from_column([f"{prefix}{i}" for i in range(count)], size=size)
+
+
+def test_from_column_fills_column_first_and_round_trips():
+    plate = _column_plate(10)
+    assert plate.shape == (8, 12)
+    assert plate.sample_at("A1") == "S0"
+    assert plate.sample_at("H1") == "S7"
+    assert plate.sample_at("A2") == "S8"
+    assert plate.sample_at("C2") is None
+    assert plate.to_column()[:10] == [f"S{i}" for i in range(10)]
+    assert len(plate) == 10
+
+    row_plate = Plate.from_column(["X", "Y"], order="row")
+    assert row_plate.sample_at("A2") == "Y"
+
+
+def test_reshape_and_transpose_preserve_order():
+    plate = Plate.from_column([f"S{i}" for i in range(16)], size=16)
+    assert plate.shape == (4, 4)
+    assert plate.transpose().sample_at("A2") == "S1"
+
+    wide = _column_plate(96).reshape(12, 8)
+    assert wide.to_column() == _column_plate(96).to_column()
+    with pytest.raises(ValueError):
+        _column_plate(4).reshape(5, 5)
+
+
+def test_stamp_quadrants_into_384():
+    quadrants = [_column_plate(96, prefix=f"Q{q}-") for q in range(4)]
+    dest = Plate.empty(384)
+    for q, source in enumerate(quadrants):
+        dest = dest.stamp(source, row_offset=q // 2, col_offset=q % 2, row_step=2, col_step=2)
+
+    assert len(dest) == 384
+    assert dest.sample_at("A1") == "Q0-0"
+    assert dest.sample_at("A2") == "Q1-0"
+    assert dest.sample_at("B1") == "Q2-0"
+    assert dest.sample_at("P24") == "Q3-95"
+    with pytest.raises(ValueError):
+        dest.stamp(quadrants[0])
+
+
+def test_merge_and_lookup_many():
+    left = Plate.from_grid([["A", None, None, None], ["B", None, None, None]] + [[None] * 4] * 2)
+    right = Plate.from_column(["A", None, None, None, None, "C"], size=16)
+
+    merged = left.merge(right)
+    assert merged.lookup_many(["A", "C", "missing"]) == {"A": ["A1"], "C": ["B2"]}
+    assert merged.lookup("B") == ["B1"]
+
+    conflicting = Plate.from_column(["Z"], size=16)
+    with pytest.raises(ValueError):
+        merged.merge(conflicting)
+
+
+def test_binary_serialization_round_trip():
+    plate = Plate.from_column(
+        ["H1_H", "H1_L", None, "H2_H"],
+        values=[1.5, None, None, 42.0],
+        name="sheet1",
+    )
+    restored = Plate.from_bytes(plate.to_bytes())
+    assert restored == plate
+    assert restored.value_at("A1") == 1.5
+    assert restored.value_at("B1") is None
+    assert len(Plate.from_column(["S"] * 96).to_bytes()) < 96 * 3
+
+    plates = loads_plates(dumps_plates([plate, _column_plate(3, size=384)]))
+    assert [p.size for p in plates] == [96, 384]
+    assert plates[0] == plate
+    assert np.array_equal(plates[1].codes, _column_plate(3, size=384).codes)
+
+
+def test_well_name_helpers():
+    assert well_name(7, 11) == "H12"
+    assert parse_well("p24") == (15, 23)
+    with pytest.raises(ValueError):
+        parse_well("Z1")
@@ -0,0 +1,188 @@
+import json
+
+import httpx
+import pytest
+from openpyxl import Workbook
+
+from app import statuses
+from app.activities import progress
+from app.activities.artifacts import read_plates
+from app.activities.step_activities import execute_step
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import Artifact, Batch, LineageEdge, StepCheckpoint, WorkflowNodeVersion
+from app.steps import primer_ingest
+
+ROWS = "ABCDEFGH"
+
+
+def _write_grid(sheet, top: int, left: int, cell) -> None:
+    for col in range(12):
+        sheet.cell(row=top, column=left + col + 1, value=col + 1)
+    for r, label in enumerate(ROWS):
+        sheet.cell(row=top + r + 1, column=left, value=label)
+        for col in range(12):
+            sheet.cell(row=top + r + 1, column=left + col + 1, value=cell(r, col))
+
+
+def _workbook(path, sheets: dict[str, int]) -> None:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, count in sheets.items():
+        sheet = workbook.create_sheet(name)
+        sheet.cell(row=1, column=1, value=f"Order {name}")
+        names = lambda r, c: f"{name}-P{c * 8 + r}" if c * 8 + r < count else None  # noqa: E731
+        conc = lambda r, c: 100.0 + c * 8 + r if c * 8 + r < count else None  # noqa: E731
+        _write_grid(sheet, 3, 2, names)
+        _write_grid(sheet, 14, 2, conc)
+    workbook.save(path)
+
+
+def test_scan_grids_finds_both_tables_in_one_pass():
+    header = (None, "", *range(1, 13))
+    rows = [("title",), header] + [(None, label, *[f"{label}{c}" for c in range(12)]) for label in ROWS]
+    rows += [(), (None, None, *[str(i) for i in range(1, 13)])]
+    rows += [(None, label, *[1.5] * 12) for label in ROWS]
+
+    grids = primer_ingest.scan_grids(rows)
+    assert len(grids) == 2
+    plate = primer_ingest.plate_from_grids(grids, "s1")
+    assert plate.sample_at("B3") == "B2"
+    assert plate.value_at("H12") == 1.5
+
+
+def test_ingest_workbook_reads_every_sheet(tmp_path):
+    path = tmp_path / "primers.xlsx"
+    _workbook(path, {"S1": 96, "S2": 10, "S3": 40})
+
+    plates = primer_ingest.ingest_workbook(str(path))
+    assert [p.name for p in plates] == ["S1", "S2", "S3"]
+    assert [len(p) for p in plates] == [96, 10, 40]
+    assert plates[1].sample_at("B2") == "S2-P9"
+    assert plates[1].value_at("B2") == 109.0
+
+
+def test_execute_step_creates_artifact_per_sheet(db_session, tmp_path):
+    path = tmp_path / "upload.xlsx"
+    _workbook(path, {"Plate A": 12, "Plate B": 3})
+
+    batch = Batch(name="Primer Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=2,
+        version=1,
+        status=statuses.IDLE,
+        params={"operation": "primer_ingest", "upload_uri": str(path)},
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    manifest_uri = execute_step(batch.id, 2, nv.id)
+
+    with open(manifest_uri, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    assert [s["sheet"] for s in manifest["sheets"]] == ["Plate A", "Plate B"]
+    assert read_plates(manifest["sheets"][1]["uri"])[0].to_column()[:4] == [
+        "Plate B-P0", "Plate B-P1", "Plate B-P2", None,
+    ]
+
+    edges = db_session.query(LineageEdge).filter(LineageEdge.source_node_version_id == nv.id).all()
+    assert sorted(e.relation for e in edges) == ["artifact", "artifact", "artifact", "upload"]
+    upload = db_session.get(Artifact, next(e.target_artifact_id for e in edges if e.relation == "upload"))
+    assert upload.uri == str(path)
+    assert str(upload.id) == manifest["upload_artifact_id"]
+
+
+@pytest.mark.anyio
+async def test_failed_ingest_resumes_from_last_checkpoint(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "upload.xlsx"
+    _workbook(path, {"S1": 4, "S2": 5, "S3": 6, "S4": 7})
+
+    batch = Batch(name="Primer Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=2,
+        version=1,
+        status=statuses.IDLE,
+        params={"operation": "primer_ingest", "upload_uri": str(path), "chunk_sheets": 2},
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    read_sheets = primer_ingest.read_sheets
+    calls = []
+
+    def failing_read_sheets(upload_uri, names):
+        calls.append(list(names))
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return read_sheets(upload_uri, names)
+
+    monkeypatch.setattr(primer_ingest, "read_sheets", failing_read_sheets)
+    with pytest.raises(RuntimeError):
+        execute_step(batch.id, 2, nv.id)
+    db_session.expire_all()
+    assert nv.status == statuses.RUNNING
+    assert (nv.progress_done, nv.progress_total) == (2, 4)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/api/node-versions/{nv.id}/progress")
+        assert resp.status_code == 200
+        assert resp.json()["done"] == 2 and resp.json()["total"] == 4
+
+    manifest_uri = execute_step(batch.id, 2, nv.id)
+    # The retry reads only the chunk that had not been checkpointed
+    assert calls == [["S1", "S2"], ["S3", "S4"], ["S3", "S4"]]
+
+    with open(manifest_uri, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    assert [s["sheet"] for s in manifest["sheets"]] == ["S1", "S2", "S3", "S4"]
+    artifacts = db_session.query(Artifact).filter(Artifact.node_version_id == nv.id).all()
+    assert len(artifacts) == 6  # upload, four sheets, manifest
+    db_session.expire_all()
+    assert nv.status == statuses.COMPLETED
+    assert db_session.query(StepCheckpoint).filter(StepCheckpoint.node_version_id == nv.id).count() == 0
+
+
+def test_superseded_attempt_cannot_commit(db_session, tmp_path):
+    path = tmp_path / "upload.xlsx"
+    _workbook(path, {"S1": 4, "S2": 5})
+    batch = Batch(name="Overlapping Attempts")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=2,
+        version=1,
+        status=statuses.IDLE,
+        params={"operation": "primer_ingest", "upload_uri": str(path), "chunk_sheets": 1},
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    with SessionLocal() as stale:
+        stale_nv = stale.get(WorkflowNodeVersion, nv.id)
+        assert progress.claim(stale, stale_nv, "run-1/7", 1)
+
+        # The retry takes over; an older attempt of the same activity cannot take it back
+        with SessionLocal() as retry:
+            assert progress.claim(retry, retry.get(WorkflowNodeVersion, nv.id), "run-1/7", 2)
+        with SessionLocal() as late:
+            assert not progress.claim(late, late.get(WorkflowNodeVersion, nv.id), "run-1/7", 1)
+
+        with pytest.raises(progress.StepSuperseded):
+            progress.save_checkpoint(stale, stale_nv, 1, {"sheets": []}, 1, 2)
+    assert db_session.query(StepCheckpoint).count() == 0
+
+    # A new execution (a direct call here) takes over and completes
+    execute_step(batch.id, 2, nv.id)
+    db_session.expire_all()
+    assert nv.status == statuses.COMPLETED
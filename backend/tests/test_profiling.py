@@ -0,0 +1,119 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import profiling, statuses
+from app.activities.step_activities import execute_step
+from app.api.router import api_router
+from app.core.config import get_settings
+from app.main import app
+from app.models import Batch, WorkflowNodeVersion
+
+TOKEN = "s3cret"
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def slow_endpoint():
+    _busy(0.1)
+    return {"ok": True}
+
+
+@pytest.fixture()
+def profiling_on(monkeypatch, tmp_path):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profiling_token", TOKEN)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_interval", 0.001)
+    return settings
+
+
+def _profiled_app() -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(profiling.http_middleware)
+    app.get("/slow")(slow_endpoint)
+    app.include_router(api_router)
+    return app
+
+
+@pytest.mark.anyio
+async def test_request_is_profiled_only_with_token(profiling_on):
+    transport = httpx.ASGITransport(app=_profiled_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        plain = await client.get("/slow")
+        assert profiling.PROFILE_ID_HEADER not in plain.headers
+        wrong = await client.get("/slow", headers={profiling.TOKEN_HEADER: "nope"})
+        assert profiling.PROFILE_ID_HEADER not in wrong.headers
+
+        resp = await client.get("/slow", params={"profile": TOKEN}, headers={"X-Request-ID": "req-1"})
+        assert resp.json() == {"ok": True}
+        assert resp.headers[profiling.PROFILE_ID_HEADER] == "req-1"
+
+        forbidden = await client.get("/api/profiles/req-1")
+        assert forbidden.status_code == 403
+        stored = await client.get("/api/profiles/req-1", headers={profiling.TOKEN_HEADER: TOKEN})
+    assert stored.status_code == 200
+    # The sync endpoint ran in a threadpool thread and was still sampled
+    busy_lines = [line for line in stored.text.splitlines() if "test_profiling:_busy" in line]
+    assert busy_lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stored.text.splitlines())
+
+
+@pytest.mark.anyio
+async def test_unusable_request_id_gets_a_generated_profile_id(profiling_on):
+    transport = httpx.ASGITransport(app=_profiled_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/slow", params={"profile": TOKEN}, headers={"X-Request-ID": "trace/abc:1"})
+        assert resp.status_code == 200
+        assert resp.json() == {"ok": True}
+        profile_id = resp.headers[profiling.PROFILE_ID_HEADER]
+        assert profile_id != "trace/abc:1"
+        stored = await client.get(f"/api/profiles/{profile_id}", headers={profiling.TOKEN_HEADER: TOKEN})
+    assert stored.status_code == 200
+    assert profiling.profile_path(profiling_on, profile_id).is_file()
+
+
+@pytest.mark.anyio
+async def test_profiling_is_off_without_configured_token():
+    assert get_settings().profiling_token is None
+    assert profiling.http_middleware not in [m.kwargs.get("dispatch") for m in app.user_middleware]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/profiles/req-1", headers={profiling.TOKEN_HEADER: "anything"})
+    assert resp.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_batch_activities_are_profiled_when_enabled(db_session, profiling_on, tmp_path):
+    batch = Batch(name="Profiled Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=1,
+        version=1,
+        status=statuses.IDLE,
+        params={"sequence": "QVQL"},
+    )
+    db_session.add(nv)
+    db_session.commit()
+    batch_id, nv_id = batch.id, nv.id
+
+    transport = httpx.ASGITransport(app=_profiled_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.put(
+            f"/api/batches/{batch_id}/profiling",
+            json={"enabled": True},
+            headers={profiling.TOKEN_HEADER: TOKEN},
+        )
+        assert resp.json() == {"batch_id": str(batch_id), "profiling": True}
+
+    execute_step(batch_id, 1, nv_id)
+    assert (tmp_path / f"{nv_id}.folded").is_file()
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import statuses
+from app.activities.artifacts import read_plates
+from app.activities.step_activities import execute_step
+from app.models import Artifact, Batch, LineageEdge, WorkflowNodeVersion
+from app.steps import qubit
+from app.steps.plate import Plate
+
+
+def test_quantify_plates_vectorized_over_plates():
+    curve = qubit.fit_standard_curve([0.0, 10.0, 20.0], [100.0, 1100.0, 2100.0])
+    assert np.isclose(curve.slope, 0.01)
+    assert np.isclose(curve.intercept, -1.0)
+
+    layouts = [Plate.from_column(["P1", "P2", "P3"]), Plate.from_column(["Q1"])]
+    readings = qubit.stack_readings([[600.0, 50.0, 3000.0], [1100.0, None, 900.0]])
+    plates, flags = qubit.quantify_plates(layouts, readings, curve, dilution_factor=2.0)
+
+    assert plates[0].value_at("A1") == pytest.approx(10.0)
+    assert plates[1].value_at("A1") == pytest.approx(20.0)
+    assert plates[1].value_at("B1") is None
+    assert flags[0, 1, 0] & qubit.QC_BELOW_RANGE
+    assert flags[0, 2, 0] & qubit.QC_ABOVE_RANGE
+    assert flags[1, 2, 0] & qubit.QC_EMPTY_WELL_SIGNAL
+    report = qubit.qc_report(plates, flags)
+    assert [(r["well"], r["sample"]) for r in report] == [("B1", "P2"), ("C1", "P3"), ("C1", None)]
+
+
+def test_parse_asc_reads_first_column():
+    text = "Reading\n120.5\t1\n\n98,2\n"
+    assert qubit.parse_asc(text).tolist() == [120.5, 98.0]
+
+
+def test_execute_step_records_concentration_artifacts(db_session):
+    batch = Batch(name="Qubit Batch")
+    db_session.add(batch)
+    db_session.commit()
+
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=3,
+        version=1,
+        status=statuses.IDLE,
+        params={
+            "operation": "qubit_concentration",
+            "layouts": [{"name": "sheet1", "samples": ["H1_H", "H1_L"]}],
+            "readings": [[250.0, 450.0]],
+            "curve": {"slope": 0.02, "intercept": 0.0},
+        },
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    uri = execute_step(batch.id, 3, nv.id)
+
+    db_session.expire_all()
+    nv = db_session.get(WorkflowNodeVersion, nv.id)
+    assert nv.status == statuses.COMPLETED
+    assert nv.artifact_uri == uri
+
+    [plate] = read_plates(uri)
+    assert plate.name == "sheet1"
+    assert plate.value_at("A1") == 5.0
+    assert plate.value_at("B1") == 9.0
+
+    artifacts = db_session.query(Artifact).filter(Artifact.node_version_id == nv.id).all()
+    assert sorted(a.content_type for a in artifacts) == ["application/json", "application/vnd.antibody.plates"]
+    report_uri = next(a.uri for a in artifacts if a.content_type == "application/json")
+    with open(report_uri, encoding="utf-8") as handle:
+        assert json.load(handle)["plates"] == ["sheet1"]
+
+    edges = db_session.query(LineageEdge).filter(LineageEdge.source_node_version_id == nv.id).all()
+    assert {e.relation for e in edges} == {"artifact"}
+    assert {e.target_artifact_id for e in edges} == {a.id for a in artifacts}
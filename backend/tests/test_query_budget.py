@@ -0,0 +1,73 @@
+import logging
+
+import httpx
+import pytest
+
+from app import statuses
+from app.core.config import get_settings
+from app.db import query_budget as budgets
+from app.main import app
+from app.models import Batch, LineageEdge, WorkflowNodeVersion
+
+
+def _version_chain(db_session, count: int) -> tuple[Batch, list[WorkflowNodeVersion]]:
+    batch = Batch(name="Budget Batch")
+    db_session.add(batch)
+    db_session.commit()
+    versions = [
+        WorkflowNodeVersion(
+            batch_id=batch.id, template_version="v1", step_index=1, version=i + 1, status=statuses.COMPLETED
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(versions)
+    db_session.flush()
+    db_session.add_all(
+        LineageEdge(source_node_version_id=a.id, target_node_version_id=b.id, relation="rollback")
+        for a, b in zip(versions, versions[1:])
+    )
+    db_session.commit()
+    return batch, versions
+
+
+def test_limit_raises_or_logs_when_budget_is_exceeded(db_session, monkeypatch, caplog):
+    @budgets.limit(1)
+    def two_queries():
+        db_session.query(Batch).all()
+        db_session.query(WorkflowNodeVersion).all()
+
+    with pytest.raises(budgets.QueryBudgetExceeded, match="executed 2 SQL statements, budget is 1"):
+        two_queries()
+
+    monkeypatch.setattr(get_settings(), "query_budget_mode", "log")
+    with caplog.at_level(logging.WARNING, logger=budgets.__name__):
+        two_queries()
+    assert "budget is 1" in caplog.text
+
+
+def test_budget_may_depend_on_arguments(db_session):
+    @budgets.limit(lambda n: n)
+    def n_queries(n: int):
+        for _ in range(n):
+            db_session.query(Batch).all()
+
+    n_queries(3)
+    assert n_queries.query_budget(n=3) == 3
+
+
+@pytest.mark.anyio
+async def test_version_list_and_lineage_queries_do_not_grow_with_versions(db_session, query_budget):
+    batch, versions = _version_chain(db_session, 8)
+    batch_id, last_id = batch.id, versions[-1].id
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with query_budget(3):
+            resp = await client.get(f"/api/batches/{batch_id}/steps/1/versions")
+        assert resp.status_code == 200
+        assert sum(len(v["lineage"]) for v in resp.json()["versions"]) == 7
+
+        with query_budget(1 + 2 * 10):
+            resp = await client.get(f"/api/lineage/node_version/{last_id}", params={"depth": 10})
+        assert resp.status_code == 200
+        assert [edge["depth"] for edge in resp.json()["edges"]] == list(range(1, 8))
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from app import resources, statuses
+from app.activities.step_activities import (
+    execute_step,
+    get_idle_versions,
+    get_step_options,
+    update_batch_status,
+)
+from app.core.config import Settings, get_settings
+from app.models import Batch, WorkflowNodeVersion
+from app.workers import batch_worker
+from app.workflows.batch_workflow import BatchWorkflow
+
+
+def test_resource_task_queues_derive_from_base_queue():
+    settings = Settings(temporal_task_queue="batches")
+    assert settings.resource_task_queues() == {
+        "cpu": "batches-cpu",
+        "db": "batches-db",
+    }
+
+
+def test_split_worker_modes_require_routing():
+    unrouted = Settings()
+    batch_worker.check_mode("all", unrouted)
+    for mode in ("workflow", resources.CPU, resources.DB):
+        with pytest.raises(ValueError, match="ROUTE_BY_RESOURCE"):
+            batch_worker.check_mode(mode, unrouted)
+        batch_worker.check_mode(mode, Settings(temporal_route_by_resource=True))
+    # Every worker mode serves a queue some handler can be routed to
+    assert batch_worker.MODES == ("all", "workflow", resources.CPU, resources.DB)
+
+
+def test_step_resource_class_follows_handler(db_session):
+    batch = Batch(name="Routing Batch")
+    db_session.add(batch)
+    db_session.commit()
+    legacy = WorkflowNodeVersion(batch_id=batch.id, template_version="v1", step_index=1, status=statuses.IDLE)
+    cpu = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=2,
+        status=statuses.IDLE,
+        params={"operation": "bca_normalization"},
+    )
+    db_session.add_all([legacy, cpu])
+    db_session.commit()
+
+    # Only handlers that report progress while running get a heartbeat timeout
+    assert get_step_options(legacy.id) == {"resource_class": resources.DB, "heartbeats": False}
+    assert get_step_options(str(cpu.id)) == {"resource_class": resources.CPU, "heartbeats": False}
+
+
+@pytest.mark.anyio
+async def test_workflow_routes_activities_by_resource_class(db_session):
+    settings = get_settings()
+    batch = Batch(name="Routed Batch")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.add_all(
+        [
+            WorkflowNodeVersion(batch_id=batch.id, template_version="v1", step_index=i, status=statuses.IDLE)
+            for i in [1, 2, 3]
+        ]
+    )
+    db_session.commit()
+    queues = settings.resource_task_queues()
+
+    env = await WorkflowEnvironment.start_time_skipping()
+    async with env:
+        executor = ThreadPoolExecutor()
+        workflow_worker = Worker(env.client, task_queue=settings.temporal_task_queue, workflows=[BatchWorkflow])
+        db_worker = Worker(
+            env.client,
+            task_queue=queues[resources.DB],
+            activities=[execute_step, update_batch_status, get_idle_versions, get_step_options],
+            activity_executor=executor,
+        )
+        async with workflow_worker, db_worker:
+            await env.client.execute_workflow(
+                BatchWorkflow.run,
+                args=[str(batch.id), False, queues],
+                id=f"routed-{batch.id}",
+                task_queue=settings.temporal_task_queue,
+            )
+        executor.shutdown(wait=True)
+
+    db_session.expire_all()
+    versions = db_session.query(WorkflowNodeVersion).filter(WorkflowNodeVersion.batch_id == batch.id).all()
+    assert all(v.status == statuses.COMPLETED for v in versions)
+    assert db_session.get(Batch, batch.id).status == statuses.COMPLETED
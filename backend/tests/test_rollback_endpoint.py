@@ -10,10 +10,13 @@ from app import statuses
 from app.activities.step_activities import (
     execute_step,
     get_idle_versions,
+    get_step_options,
     update_batch_status,
     create_node_version,
     get_template_step_indices,
     get_latest_version_for_step,
+    step_outputs_changed,
+    carry_forward_version,
 )
 from app.core.config import get_settings
 from app.main import app
@@ -65,9 +68,12 @@ async def test_rollback_creates_new_versions(db_session):
                     execute_step,
                     update_batch_status,
                     get_idle_versions,
+                    get_step_options,
                     create_node_version,
                     get_template_step_indices,
                     get_latest_version_for_step,
+                    step_outputs_changed,
+                    carry_forward_version,
                 ],
                 activity_executor=executor,
             )
@@ -0,0 +1,72 @@
+import httpx
+import pytest
+
+from app import statuses
+from app.activities.sample_index import index_names, index_plates, search_samples
+from app.main import app
+from app.models import Batch, SampleTrigram, WorkflowNodeVersion
+from app.steps.ngram import trigrams
+from app.steps.plate import Plate
+
+
+def _node(db_session, name: str) -> WorkflowNodeVersion:
+    batch = Batch(name=name)
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=1,
+        version=1,
+        status=statuses.COMPLETED,
+    )
+    db_session.add(nv)
+    db_session.commit()
+    return nv
+
+
+def test_trigrams_are_case_insensitive():
+    assert trigrams("AbC1") == {"abc", "bc1"}
+    assert trigrams("ab") == set()
+
+
+def test_search_uses_trigram_postings(db_session):
+    nv = _node(db_session, "Search Batch")
+    plate = Plate.from_column(["mAb-101_H", "mAb-101_L", "mAb-202_H", None, "ctrl_50%"], name="P1")
+    assert index_plates(db_session, nv, [plate]) == 4
+    index_names(db_session, nv, ["mAb-101_H", None], "chain")
+    db_session.commit()
+
+    assert db_session.query(SampleTrigram).count() > 0
+    hits = search_samples(db_session, "MAB-101")
+    assert sorted((h.kind, h.plate, h.well) for h in hits) == [
+        ("chain", None, None),
+        ("well", "P1", "A1"),
+        ("well", "P1", "B1"),
+    ]
+    assert [h.name for h in search_samples(db_session, "_h")] == ["mAb-101_H", "mAb-101_H", "mAb-202_H"]
+    assert [h.well for h in search_samples(db_session, "50%")] == ["E1"]
+    assert search_samples(db_session, "101_x") == []
+
+
+@pytest.mark.anyio
+async def test_search_endpoint_groups_wells_per_plate(db_session):
+    first = _node(db_session, "Batch One")
+    second = _node(db_session, "Batch Two")
+    index_plates(db_session, first, [Plate.from_column(["AB12-1", "AB12-2", "XY9-1"], name="clones")])
+    index_plates(db_session, second, [Plate.from_column(["ZZ1", "ab12-7"], name="rescreen")])
+    db_session.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/samples/search", params={"q": "ab12"})
+        assert resp.status_code == 200
+        payload = resp.json()
+        assert len(payload["hits"]) == 3
+        highlights = {p["plate"]: p["wells"] for p in payload["plates"]}
+        assert highlights == {"clones": ["A1", "B1"], "rescreen": ["B1"]}
+
+        resp = await client.get(
+            "/api/samples/search", params={"q": "ab12", "batch_id": str(second.batch_id)}
+        )
+        assert [h["name"] for h in resp.json()["hits"]] == ["ab12-7"]
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.main import create_app
+
+PROBE = """
+import sys
+import app.main
+from app.db import session
+print(",".join(m for m in ("temporalio", "openpyxl", "psycopg") if m in sys.modules))
+print(session.get_engine.cache_info().currsize)
+"""
+
+
+def test_importing_the_app_defers_heavy_modules_and_the_engine():
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    deferred, engines = result.stdout.split("\n")[:2]
+    assert deferred == ""
+    assert engines == "0"
+
+
+@pytest.mark.anyio
+async def test_create_app_builds_an_independent_app():
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/health")
+    assert resp.json() == {"status": "ok"}
+    assert any(getattr(route, "path", None) == "/api/step-cache/stats" for route in app.routes)
@@ -0,0 +1,106 @@
+import pytest
+
+from app import statuses
+from app.activities import handlers
+from app.activities.step_activities import execute_step
+from app.models import Artifact, Batch, Chain, Construct, WorkflowNodeVersion, WorkflowTemplateStep
+
+
+def _version(db_session, batch, step_index, params=None) -> WorkflowNodeVersion:
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=step_index,
+        version=1,
+        status=statuses.IDLE,
+        params=params,
+    )
+    db_session.add(nv)
+    db_session.commit()
+    return nv
+
+
+def test_registered_handlers_declare_resources():
+    registry = handlers.registered_handlers()
+    for name in (*handlers.LEGACY_STEP_HANDLERS.values(), handlers.DEFAULT_HANDLER, "bca_normalization"):
+        assert name in registry
+    assert registry["bca_normalization"].resource_class == handlers.CPU
+    assert registry["primer_ingest"].describe() == {
+        "name": "primer_ingest",
+        "version": "1",
+        "resource_class": handlers.CPU,
+        "memoizable": True,
+        "heartbeats": True,
+        "inputs": ["upload"],
+        "outputs": [
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "application/vnd.antibody.plates",
+            "application/json",
+        ],
+    }
+
+    class Duplicate(handlers.StepHandler):
+        name = "chain"
+
+        def run(self, session, node_version, parent_version=None):
+            return None
+
+    with pytest.raises(ValueError):
+        handlers.register(Duplicate)
+
+
+def test_handlers_must_implement_run():
+    class Unfinished(handlers.StepHandler):
+        name = "unfinished"
+
+    with pytest.raises(TypeError, match="run"):
+        handlers.register(Unfinished)
+    with pytest.raises(TypeError):
+        Unfinished()
+    assert "unfinished" not in handlers.registered_handlers()
+
+
+def test_template_handler_overrides_step_index_default(db_session):
+    batch = Batch(name="Handler Batch")
+    db_session.add(batch)
+    db_session.commit()
+    template_step = (
+        db_session.query(WorkflowTemplateStep)
+        .filter(WorkflowTemplateStep.template_version == "v1", WorkflowTemplateStep.step_index == 2)
+        .one()
+    )
+    template_step.handler = "chain"
+    db_session.commit()
+
+    nv = _version(db_session, batch, 2, {"sequence": "QVQ"})
+    assert handlers.handler_name_for(db_session, nv) == "chain"
+    execute_step(batch.id, 2, nv.id)
+
+    db_session.expire_all()
+    assert db_session.get(WorkflowNodeVersion, nv.id).status == statuses.COMPLETED
+    assert db_session.query(Chain).filter(Chain.node_version_id == nv.id).one().sequence == "QVQ"
+    assert db_session.query(Construct).count() == 0
+
+
+def test_steps_without_handler_complete_without_artifact(db_session):
+    batch = Batch(name="Noop Batch")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.add(WorkflowTemplateStep(template_version="v1", step_index=4, name="Step 4"))
+    db_session.commit()
+    nv = _version(db_session, batch, 4)
+
+    assert execute_step(batch.id, 4, nv.id) == ""
+    db_session.expire_all()
+    assert db_session.get(WorkflowNodeVersion, nv.id).status == statuses.COMPLETED
+    assert db_session.query(Artifact).count() == 0
+
+
+def test_unknown_operation_is_rejected(db_session):
+    batch = Batch(name="Unknown Batch")
+    db_session.add(batch)
+    db_session.commit()
+    nv = _version(db_session, batch, 1, {"operation": "does_not_exist"})
+
+    with pytest.raises(ValueError, match="does_not_exist"):
+        execute_step(batch.id, 1, nv.id)
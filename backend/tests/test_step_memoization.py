@@ -0,0 +1,85 @@
+import httpx
+import pytest
+
+from app import statuses
+from app.activities.step_activities import execute_step
+from app.main import app
+from app.models import Artifact, Batch, LineageEdge, StepResultCache, WorkflowNodeVersion
+
+READINGS = "Reading\n250\n450\n"
+
+
+def _qubit_version(db_session, batch_name: str, reading_uri: str, **extra) -> WorkflowNodeVersion:
+    batch = Batch(name=batch_name)
+    db_session.add(batch)
+    db_session.commit()
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=3,
+        version=1,
+        status=statuses.IDLE,
+        params={
+            "operation": "qubit_concentration",
+            "layouts": [{"name": "sheet1", "samples": ["H1_H", "H1_L"]}],
+            "reading_uris": [reading_uri],
+            "curve": {"slope": 0.02, "intercept": 0.0},
+            **extra,
+        },
+    )
+    db_session.add(nv)
+    db_session.commit()
+    return nv
+
+
+def _readings(tmp_path, name: str, text: str = READINGS) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.anyio
+async def test_identical_inputs_in_another_batch_reuse_outputs(db_session, tmp_path):
+    first = _qubit_version(db_session, "First", _readings(tmp_path, "a.csv"))
+    uri = execute_step(first.batch_id, 3, first.id)
+    artifacts = db_session.query(Artifact).filter(Artifact.node_version_id == first.id).all()
+    assert all(a.digest for a in artifacts)
+
+    # Same content under a different path still hits the cache
+    second = _qubit_version(db_session, "Second", _readings(tmp_path, "b.csv"))
+    assert execute_step(second.batch_id, 3, second.id) == uri
+
+    db_session.expire_all()
+    assert db_session.get(WorkflowNodeVersion, second.id).status == statuses.COMPLETED
+    assert db_session.query(Artifact).filter(Artifact.node_version_id == second.id).count() == 0
+    reuse = db_session.query(LineageEdge).filter(LineageEdge.relation == "reuse").all()
+    assert {(e.source_node_version_id, e.target_node_version_id) for e in reuse if e.target_node_version_id} == {
+        (first.id, second.id)
+    }
+    assert {e.target_artifact_id for e in reuse if e.target_artifact_id} == {a.id for a in artifacts}
+    assert db_session.query(StepResultCache).one().hit_count == 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/step-cache/stats")
+        assert resp.json() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+        # The reusing batch's samples are searchable under its own node version
+        resp = await client.get("/api/samples/search", params={"q": "H1_", "batch_id": str(second.batch_id)})
+    hits = resp.json()["hits"]
+    assert sorted((h["name"], h["well"]) for h in hits) == [("H1_H", "A1"), ("H1_L", "B1")]
+    assert {h["node_version_id"] for h in hits} == {str(second.id)}
+
+
+def test_changed_input_or_opt_out_recomputes(db_session, tmp_path):
+    first = _qubit_version(db_session, "First", _readings(tmp_path, "a.csv"))
+    first_uri = execute_step(first.batch_id, 3, first.id)
+
+    changed = _qubit_version(db_session, "Changed", _readings(tmp_path, "c.csv", READINGS.replace("450", "460")))
+    assert execute_step(changed.batch_id, 3, changed.id) != first_uri
+
+    opted_out = _qubit_version(db_session, "Opt out", _readings(tmp_path, "d.csv"), cache=False)
+    assert execute_step(opted_out.batch_id, 3, opted_out.id) != first_uri
+
+    assert db_session.query(StepResultCache).count() == 2
+    assert db_session.query(LineageEdge).filter(LineageEdge.relation == "reuse").count() == 0
@@ -0,0 +1,93 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app import tracing
+from app.api.router import api_router
+from app.core.config import Settings
+from app.db.session import engine
+from app.models import Batch
+from app.workflows import runner
+
+
+class _FakeHandle:
+    id = "batch-workflow-fake"
+
+    async def result(self):
+        return None
+
+
+class _FakeClient:
+    def __init__(self):
+        self.started = []
+
+    async def start_workflow(self, *args, **kwargs):
+        self.started.append(kwargs["id"])
+        return _FakeHandle()
+
+
+def test_tracing_is_disabled_by_default():
+    assert tracing.build_provider(Settings(), "test") is None
+    assert tracing.temporal_interceptors(Settings()) == []
+    with pytest.raises(ValueError):
+        tracing.build_provider(Settings(tracing_exporter="zipkin"), "test")
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    provider = tracing.build_provider(Settings(tracing_exporter="file", tracing_file=str(path)), "test")
+    with provider.get_tracer("test").start_as_current_span("outer"):
+        with provider.get_tracer("test").start_as_current_span("inner"):
+            pass
+    provider.force_flush()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["inner", "outer"]
+    assert spans[0]["parent_id"] == spans[1]["context"]["span_id"]
+
+
+@pytest.mark.anyio
+async def test_request_runner_and_sql_spans_share_a_trace(db_session, monkeypatch):
+    batch = Batch(name="Traced Batch")
+    db_session.add(batch)
+    db_session.commit()
+    batch_id = batch.id
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("app"))
+    client = _FakeClient()
+    runner.set_client_override(client)
+
+    traced = FastAPI()
+    traced.include_router(api_router)
+    FastAPIInstrumentor.instrument_app(traced, tracer_provider=provider)
+    instrumentor = SQLAlchemyInstrumentor()
+    instrumentor.instrument(engine=engine, tracer_provider=provider)
+    try:
+        transport = httpx.ASGITransport(app=traced)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            resp = await http.post(f"/api/batches/{batch_id}/run")
+        assert resp.status_code == 200
+    finally:
+        instrumentor.uninstrument()
+        runner.set_client_override(None)
+
+    spans = exporter.get_finished_spans()
+    by_name = {span.name: span for span in spans}
+    route = by_name["POST /api/batches/{batch_id}/run"]
+    start = by_name["start_batch_workflow"]
+    assert client.started == [f"batch-workflow-{batch_id}"]
+    assert start.attributes["batch.id"] == str(batch_id)
+    assert start.parent.span_id == route.context.span_id
+    batch_lookups = [span for span in spans if "FROM batch" in span.attributes.get("db.statement", "")]
+    assert batch_lookups
+    assert all(span.context.trace_id == route.context.trace_id for span in batch_lookups)
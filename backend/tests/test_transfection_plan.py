@@ -0,0 +1,110 @@
+import time
+
+from app import statuses
+from app.activities.artifacts import read_plates, write_plates
+from app.activities.step_activities import execute_step
+from app.models import Batch, Chain, Construct, LineageEdge, WorkflowNodeVersion
+from app.steps import pairing
+from app.steps.plate import Plate
+
+
+def test_match_pairs_reuses_chains_and_reports_missing():
+    stock = Plate.from_column(["H1-1", "L1-2", "H2-1"], values=[100.0, 50.0, None], name="plasmids")
+    index = pairing.index_plasmids([stock])
+    pairs = [
+        pairing.Pair("Ab1", "H1", "L1"),
+        pairing.Pair("Ab2", "H2", "L1"),
+        pairing.Pair("Ab3", "H3", "L9"),
+    ]
+    result = pairing.match_pairs(pairs, index)
+
+    assert [pair.antibody for pair, _, _ in result.matched] == ["Ab1", "Ab2"]
+    assert result.missing == [{"antibody": "Ab3", "missing": ["H3", "L9"]}]
+
+    plates = pairing.transfection_plates(["Ab1", "Ab2"])
+    transfers = pairing.transfection_worklist(result.matched, plates, 1000.0, default_volume=4.0)
+    assert [(t.sample, t.source_position, t.destination_position, t.volume) for t in transfers] == [
+        ("H1", "A1", "A1", 5.0),
+        ("H2", "C1", "B1", 4.0),
+        ("L1", "B1", "A1", 10.0),
+        ("L1", "B1", "B1", 10.0),
+    ]
+
+    cells = pairing.cell_plates(plates[0])
+    assert [c.shape for c in cells] == [(4, 6)] * 4
+    assert cells[0].sample_at("B1") == "Ab2"
+
+
+def test_pairing_scales_linearly_to_tens_of_thousands():
+    count = 30000
+    chains = [f"H{i % 500}" for i in range(count)] + [f"L{i % 700}" for i in range(count)]
+    plates = [
+        Plate.from_column(names, size=384, name=f"stock-{i}")
+        for i, names in enumerate(
+            [sorted(set(chains))[start : start + 384] for start in range(0, 1200, 384)]
+        )
+    ]
+    pairs = [pairing.Pair(f"Ab{i}", f"H{i % 500}", f"L{i % 700}") for i in range(count)]
+
+    started = time.perf_counter()
+    result = pairing.match_pairs(pairs, pairing.index_plasmids(plates))
+    plan = pairing.transfection_plates([pair.antibody for pair, _, _ in result.matched])
+    pairing.transfection_worklist(result.matched, plan, 1000.0)
+    assert time.perf_counter() - started < 5.0
+    assert len(result.matched) == count
+    assert len(plan) == (count + 95) // 96
+
+
+def test_execute_step_plans_transfection_with_lineage(db_session):
+    batch = Batch(name="Transfection Batch")
+    db_session.add(batch)
+    db_session.commit()
+
+    sources = []
+    for i, name in enumerate(["H1", "L1"], start=1):
+        nv = WorkflowNodeVersion(
+            batch_id=batch.id, template_version="v1", step_index=1, version=i, status=statuses.COMPLETED
+        )
+        db_session.add(nv)
+        db_session.flush()
+        db_session.add(Chain(node_version_id=nv.id, name=name, sequence="QVQL"))
+        sources.append(nv)
+    construct_nv = WorkflowNodeVersion(
+        batch_id=batch.id, template_version="v1", step_index=2, version=1, status=statuses.COMPLETED
+    )
+    db_session.add(construct_nv)
+    db_session.flush()
+    db_session.add(Construct(node_version_id=construct_nv.id, name="Ab1"))
+    db_session.commit()
+
+    plasmid_uri = write_plates(
+        batch.id, construct_nv.id, "plasmids", [Plate.from_column(["H1-3", "L1-1"], values=[200.0, 100.0])]
+    )
+    nv = WorkflowNodeVersion(
+        batch_id=batch.id,
+        template_version="v1",
+        step_index=3,
+        version=1,
+        status=statuses.IDLE,
+        params={
+            "operation": "transfection_plan",
+            "pairs": [
+                {"antibody": "Ab1", "chain_H": "H1", "chain_L": "L1"},
+                {"antibody": "Ab2", "chain_H": "H1", "chain_L": "L7"},
+            ],
+            "plasmid_uri": plasmid_uri,
+        },
+    )
+    db_session.add(nv)
+    db_session.commit()
+
+    uri = execute_step(batch.id, 3, nv.id)
+
+    [plate] = read_plates(uri)
+    assert plate.to_column()[:2] == ["Ab1", None]
+    input_edges = (
+        db_session.query(LineageEdge)
+        .filter(LineageEdge.target_node_version_id == nv.id, LineageEdge.relation == "input")
+        .all()
+    )
+    assert {e.source_node_version_id for e in input_edges} == {s.id for s in sources} | {construct_nv.id}
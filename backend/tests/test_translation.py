@@ -0,0 +1,71 @@
+import itertools
+
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.steps import translation
+
+_TABLE = {
+    "".join(codon): amino
+    for codon, amino in zip(itertools.product("ACGT", repeat=3), translation.STANDARD_CODE)
+}
+_COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+
+
+def _reference(sequence: str, frame: int) -> str:
+    sequence = "".join(sequence.split()).upper().replace("U", "T")
+    if frame < 0:
+        sequence = sequence.translate(_COMPLEMENT)[::-1]
+    sequence = sequence[abs(frame) - 1 :]
+    return "".join(_TABLE.get(sequence[i : i + 3], "X") for i in range(0, len(sequence) - 2, 3))
+
+
+def test_known_codons():
+    assert translation.translate_one("ATGTGGTAA") == "MW*"
+    assert translation.translate_one("augNNNggc") == "MXG"
+    assert translation.translate_one("TTACCAT", frame=-1) == "MV"
+
+
+def test_all_frames_match_per_codon_reference():
+    rng = np.random.default_rng(3)
+    sequences = [
+        "".join(rng.choice(list("ACGTN acgt\n"), size=int(rng.integers(0, 60))))
+        for _ in range(400)
+    ]
+    result = translation.translate(sequences, translation.FRAMES)
+    for frame in translation.FRAMES:
+        assert result[frame] == [_reference(sequence, frame) for sequence in sequences]
+
+
+def test_encode_drops_whitespace_and_keeps_offsets():
+    codes, offsets = translation.encode(["AC GT", "", "u\nx"])
+    assert codes.dtype == np.uint8
+    assert codes.tolist() == [0, 1, 2, 3, 3, 4]
+    assert offsets.tolist() == [0, 4, 4, 6]
+
+
+def test_unknown_frame_rejected():
+    with pytest.raises(ValueError):
+        translation.translate(["ATG"], (4,))
+
+
+@pytest.mark.anyio
+async def test_translate_endpoint():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/api/translate",
+            json={"sequences": ["ATGGCC", "TTTAAA"], "names": ["s1", "s2"], "frames": [1, -1]},
+        )
+        assert resp.status_code == 200
+        payload = resp.json()
+        assert payload["frames"] == [1, -1]
+        assert payload["results"] == [
+            {"name": "s1", "proteins": {"1": "MA", "-1": "GH"}},
+            {"name": "s2", "proteins": {"1": "FK", "-1": "FK"}},
+        ]
+
+        resp = await client.post("/api/translate", json={"sequences": ["ATG"], "names": []})
+        assert resp.status_code == 400
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app import statuses
+from app.activities.versions import allocate_version
+from app.db.base import Base
+from app.models import Batch, WorkflowNodeVersion
+
+WORKERS = 8
+EDITS_PER_WORKER = 25
+
+
+def _node_version(batch_id, version: int) -> WorkflowNodeVersion:
+    return WorkflowNodeVersion(
+        batch_id=batch_id, template_version="v1", step_index=1, version=version, status=statuses.IDLE
+    )
+
+
+def test_allocation_continues_after_existing_versions(db_session):
+    batch = Batch(name="Counter Batch")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.add_all([_node_version(batch.id, 1), _node_version(batch.id, 2)])
+    db_session.commit()
+
+    assert allocate_version(db_session, batch.id, 1) == 3
+    assert allocate_version(db_session, batch.id, 1) == 4
+    assert allocate_version(db_session, batch.id, 2) == 1
+    db_session.commit()
+
+    # Versions inserted behind the counter's back are still skipped
+    db_session.add(_node_version(batch.id, 9))
+    db_session.commit()
+    assert allocate_version(db_session, batch.id, 1) == 10
+
+
+def test_duplicate_versions_are_rejected(db_session):
+    batch = Batch(name="Counter Batch")
+    db_session.add(batch)
+    db_session.commit()
+    db_session.add_all([_node_version(batch.id, 1), _node_version(batch.id, 1)])
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+
+
+def test_concurrent_edits_get_distinct_versions(tmp_path):
+    # A file database so every thread has its own connection and transactions contend
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'versions.db'}", connect_args={"timeout": 30}
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        batch = Batch(name="Concurrent Batch")
+        session.add(batch)
+        session.commit()
+        batch_id = batch.id
+
+    def edit(_worker: int) -> list[int]:
+        allocated = []
+        for _ in range(EDITS_PER_WORKER):
+            with Session() as session:
+                version = allocate_version(session, batch_id, 1)
+                session.add(_node_version(batch_id, version))
+                session.commit()
+                allocated.append(version)
+        return allocated
+
+    with ThreadPoolExecutor(WORKERS) as executor:
+        allocated = [v for versions in executor.map(edit, range(WORKERS)) for v in versions]
+
+    total = WORKERS * EDITS_PER_WORKER
+    assert sorted(allocated) == list(range(1, total + 1))
+    with Session() as session:
+        assert session.query(WorkflowNodeVersion).count() == total
+    engine.dispose()
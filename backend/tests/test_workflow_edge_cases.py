@@ -10,6 +10,7 @@ from app import statuses
 from app.activities.step_activities import (
     execute_step,
     get_idle_versions,
+    get_step_options,
     update_batch_status,
 )
 from app.core.config import get_settings
@@ -75,7 +76,7 @@ async def test_run_with_no_idle_versions_completes(db_session):
                 env.client,
                 task_queue=settings.temporal_task_queue,
                 workflows=[BatchWorkflow],
-                activities=[execute_step, update_batch_status, get_idle_versions],
+                activities=[execute_step, update_batch_status, get_idle_versions, get_step_options],
                 activity_executor=executor,
             )
 